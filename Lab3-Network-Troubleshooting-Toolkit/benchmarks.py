@@ -0,0 +1,141 @@
+import glob
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from output_parser import parse_ping, parse_traceroute
+from result_store import ResultStore
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Benchmark: a year of daily results for a fleet, then typical queries
+def bench_result_store(hosts=5000, days=365):
+    """
+    Load `days` daily runs for `hosts` targets into a fresh store and time
+    history queries, latest-value lookups and a diffing ingest.
+    """
+    print(f"\n--- Result Store: {hosts} hosts x {days} days ---")
+    path = os.path.join(tempfile.mkdtemp(), "bench_results.db")
+    store = ResultStore(path)
+    rng = random.Random(42)
+    start_ts = time.time() - days * 86400
+    targets = [f"10.{i // 65536}.{(i // 256) % 256}.{i % 256}" for i in range(hosts)]
+
+    started = time.perf_counter()
+    for day in range(days):
+        ts = start_ts + day * 86400
+        for target in targets:
+            store.ingest(target, {
+                'ping': {'status': 'reachable',
+                         'avg_response_time': f"{rng.uniform(1, 40):.1f}ms",
+                         'packet_loss': '0%'},
+                'dns': {'status': 'success', 'ip_address': target},
+                'ports': {'port_range': '22,80,443,3389',
+                          'open_ports': [{'port': 22}, {'port': 443}]}
+            }, timestamp=ts, commit=False)
+        store.commit()
+    load_time = time.perf_counter() - started
+    rows = store.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+    print(f"Loaded {rows} facts in {load_time:.1f}s ({rows / load_time:,.0f} facts/s)")
+
+    def timed(label, func, repeat=100):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            result = func()
+        elapsed = (time.perf_counter() - t0) / repeat
+        print(f"{label:<45} {elapsed * 1000:8.2f} ms  ({len(result)} rows)")
+
+    timed("Full history for one target", lambda: store.history(rng.choice(targets)))
+    timed("Ping latency history for one target",
+          lambda: store.history(rng.choice(targets), 'ping', 'avg_ms'))
+    timed("Last 30 days for one target",
+          lambda: store.history(rng.choice(targets), since=time.time() - 30 * 86400))
+    timed("Latest values for all hosts", lambda: store.latest(test_type='ping'), repeat=5)
+
+    sample = targets[:1000]
+    t0 = time.perf_counter()
+    for target in sample:
+        store.ingest(target, {'ping': {'status': 'reachable', 'avg_response_time': '90ms',
+                                       'packet_loss': '0%'}}, commit=False)
+    store.commit()
+    per_run = (time.perf_counter() - t0) / len(sample)
+    print(f"{'Ingest + diff against last run':<45} {per_run * 1000:8.2f} ms/run")
+
+    store.close()
+    print(f"Database size: {os.path.getsize(path) / (1024**2):.1f} MB")
+
+# Inline per-call regexes the toolkit used before output_parser existed
+def _legacy_ping_stats(output):
+    loss_match = re.search(r'(\d+)% packet loss', output)
+    time_match = re.search(r'avg = ([\d.]+)', output)
+    return (loss_match.group(1) if loss_match else "Unknown",
+            time_match.group(1) if time_match else "Unknown")
+
+# Benchmark: bulk re-parsing of captured ping/traceroute logs
+def bench_parsers(copies=20000):
+    """
+    Parse every fixture in fixtures/ `copies` times and report throughput.
+    """
+    print(f"\n--- Output Parsers: fixture corpus x {copies} ---")
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.txt"))):
+        with open(path, newline='') as f:
+            corpus[os.path.basename(path)] = f.read()
+
+    pings = [text for name, text in corpus.items() if name.startswith('ping_')]
+    traces = [text for name, text in corpus.items() if name.startswith('trace')]
+
+    def timed(label, func, outputs):
+        total_bytes = sum(len(text) for text in outputs) * copies
+        t0 = time.perf_counter()
+        for _ in range(copies):
+            for text in outputs:
+                func(text)
+        elapsed = time.perf_counter() - t0
+        count = len(outputs) * copies
+        print(f"{label:<32} {count / elapsed:12,.0f} outputs/s  "
+              f"{total_bytes / elapsed / (1024**2):7.1f} MB/s")
+
+    timed("parse_ping (all formats)", parse_ping, pings)
+    timed("legacy inline regex (summary)", _legacy_ping_stats, pings)
+    timed("parse_traceroute", parse_traceroute, traces)
+
+# Benchmark: interpreter start-up for short command-line runs
+def bench_startup(repeat=20):
+    """
+    Time a fresh `import network_toolkit` and `network_toolkit.py --help`,
+    against importing every module the toolkit used to load up front.
+    """
+    print(f"\n--- Start-up: median of {repeat} fresh interpreters ---")
+    here = os.path.dirname(os.path.abspath(__file__))
+    eager = "import network_toolkit, probe_scheduler, output_parser, subprocess, platform"
+
+    def timed(label, command):
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            subprocess.run(command, cwd=here, stdout=subprocess.DEVNULL, check=True)
+            samples.append(time.perf_counter() - t0)
+        print(f"{label:<45} {statistics.median(samples) * 1000:8.1f} ms")
+
+    timed("python -c pass (interpreter only)", [sys.executable, "-c", "pass"])
+    timed("Eager imports (before)", [sys.executable, "-c", eager])
+    timed("import network_toolkit", [sys.executable, "-c", "import network_toolkit"])
+    timed("network_toolkit.py --help", [sys.executable, "network_toolkit.py", "--help"])
+
+BENCHMARKS = {
+    'store': bench_result_store,
+    'parsers': bench_parsers,
+    'startup': bench_startup,
+}
+
+if __name__ == "__main__":
+    # Usage: python benchmarks.py [name ...]  (runs everything by default)
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
@@ -1,52 +1,113 @@
 import socket
-import subprocess
-import platform
 import sys
 import json
 from datetime import datetime
-import re
+
+# Probe pacing shared by ping, traceroute, DNS and port tests.
+# Rates are probes per second; tune these to stay under IDS/firewall limits.
+# Port probes are single TCP connects, so one host gets them faster than pings.
+PROBE_RATE = 100
+PER_TARGET_RATE = 20
+PER_TARGET_PORT_RATE = 100
+PROBE_JITTER = 0.1
+MAX_IN_FLIGHT = 50
+
+# Well-known ports checked by scans and reports
+COMMON_PORTS = {
+    20: 'FTP Data',
+    21: 'FTP Control',
+    22: 'SSH',
+    23: 'Telnet',
+    25: 'SMTP',
+    53: 'DNS',
+    80: 'HTTP',
+    110: 'POP3',
+    143: 'IMAP',
+    443: 'HTTPS',
+    445: 'SMB',
+    3306: 'MySQL',
+    3389: 'RDP',
+    5432: 'PostgreSQL',
+    8080: 'HTTP-Alt'
+}
+REPORT_PORTS = "80,443,22,21,25,3389"
+
+# Probe scheduler and result history (created on first use, so short
+# command-line runs only import what their command needs)
+_scheduler = None
+_store = None
+
+# Function to replace the shared probe scheduler
+def configure_scheduler(rate=PROBE_RATE, per_target_rate=PER_TARGET_RATE,
+                        jitter=PROBE_JITTER, max_in_flight=MAX_IN_FLIGHT,
+                        port_rate=PER_TARGET_PORT_RATE):
+    """
+    Swap in a scheduler with different pacing limits
+    """
+    global _scheduler
+    from probe_scheduler import ProbeScheduler
+    _scheduler = ProbeScheduler(rate=rate, per_target_rate=per_target_rate,
+                                jitter=jitter, max_in_flight=max_in_flight,
+                                port_rate=port_rate)
+    return _scheduler
+
+# Function to get the shared probe scheduler
+def get_scheduler():
+    """Create the scheduler with the default limits on first use"""
+    if _scheduler is None:
+        return configure_scheduler()
+    return _scheduler
+
+# Function to get the shared result store
+def get_store():
+    """Open the result store on first use"""
+    global _store
+    if _store is None:
+        # Imported here so commands that don't store results skip sqlite3
+        from result_store import ResultStore, RESULTS_DB
+        _store = ResultStore(RESULTS_DB)
+    return _store
+
+# Function to store results and return what changed since the last run
+def record_results(target, tests, commit=True):
+    """
+    Save a run's results to the history database and return the diff
+    """
+    _run_id, changes = get_store().ingest(target, tests, commit=commit)
+    return changes
 
 # Function to ping a host
 def ping_host(host, count=4):
     """
     Ping a host and return results
     """
-    print(f"\n--- Pinging {host} ---")
+    import platform
+    import subprocess
+    from output_parser import parse_ping
     
     # Determine ping command based on OS
     param = '-n' if platform.system().lower() == 'windows' else '-c'
     command = ['ping', param, str(count), host]
     
     try:
-        output = subprocess.run(command, capture_output=True, text=True, timeout=30)
+        output = get_scheduler().run(host, subprocess.run, command, cost=count,
+                               capture_output=True, text=True, timeout=30)
         
         if output.returncode == 0:
-            print(f"SUCCESS: {host} is reachable")
-            print(output.stdout)
-            
             # Parse statistics
-            if platform.system().lower() == 'windows':
-                # Windows format
-                loss_match = re.search(r'(\d+)% loss', output.stdout)
-                time_match = re.search(r'Average = (\d+)ms', output.stdout)
-            else:
-                # Linux/Mac format
-                loss_match = re.search(r'(\d+)% packet loss', output.stdout)
-                time_match = re.search(r'avg = ([\d.]+)', output.stdout)
-            
-            packet_loss = loss_match.group(1) if loss_match else "Unknown"
-            avg_time = time_match.group(1) if time_match else "Unknown"
+            stats = parse_ping(output.stdout)
+            packet_loss = f"{stats['loss_percent']:g}" if stats['loss_percent'] is not None else "Unknown"
+            avg_time = f"{stats['avg_ms']:g}" if stats['avg_ms'] is not None else "Unknown"
             
             return {
                 'host': host,
                 'status': 'reachable',
                 'packet_loss': packet_loss + '%',
                 'avg_response_time': avg_time + 'ms',
+                'rtts_ms': stats['rtts_ms'],
                 'output': output.stdout
             }
         else:
-            print(f"FAILED: {host} is unreachable")
-            print(output.stdout)
             return {
                 'host': host,
                 'status': 'unreachable',
@@ -54,13 +115,11 @@ def ping_host(host, count=4):
             }
     
     except subprocess.TimeoutExpired:
-        print(f"TIMEOUT: {host} did not respond in time")
         return {
             'host': host,
             'status': 'timeout'
         }
     except Exception as e:
-        print(f"ERROR: {str(e)}")
         return {
             'host': host,
             'status': 'error',
@@ -72,7 +131,9 @@ def traceroute(host):
     """
     Perform traceroute to a host
     """
-    print(f"\n--- Traceroute to {host} ---")
+    import platform
+    import subprocess
+    from output_parser import parse_traceroute
     
     # Determine traceroute command based on OS
     if platform.system().lower() == 'windows':
@@ -81,81 +142,72 @@ def traceroute(host):
         command = ['traceroute', host]
     
     try:
-        print("This may take a moment...\n")
-        output = subprocess.run(command, capture_output=True, text=True, timeout=60)
-        print(output.stdout)
+        output = get_scheduler().run(host, subprocess.run, command,
+                               capture_output=True, text=True, timeout=60)
         
         return {
             'host': host,
+            'status': 'completed',
+            'hops': parse_traceroute(output.stdout),
             'output': output.stdout
         }
     
     except subprocess.TimeoutExpired:
-        print("TIMEOUT: Traceroute took too long")
         return {
             'host': host,
             'status': 'timeout'
         }
     except Exception as e:
-        print(f"ERROR: {str(e)}")
         return {
             'host': host,
             'status': 'error',
             'error': str(e)
         }
-    
+
 # Function to perform DNS lookup
 def dns_lookup(target):
     """
     Perform DNS lookup (forward or reverse)
     """
-    print(f"\n--- DNS Lookup for {target} ---")
-    
     try:
         # Try forward lookup (hostname to IP)
         try:
-            ip_address = socket.gethostbyname(target)
+            ip_address = get_scheduler().run(target, socket.gethostbyname, target)
             hostname = socket.getfqdn(target)
-            print(f"Hostname: {hostname}")
-            print(f"IP Address: {ip_address}")
             
             # Try reverse lookup
             try:
-                reverse_name = socket.gethostbyaddr(ip_address)
-                print(f"Reverse DNS: {reverse_name}")
-            except:
-                print("Reverse DNS: Not available")
+                reverse_name = socket.gethostbyaddr(ip_address)[0]
+            except (socket.herror, socket.gaierror, OSError):
+                reverse_name = None
             
             return {
                 'target': target,
                 'hostname': hostname,
                 'ip_address': ip_address,
+                'reverse_dns': reverse_name,
                 'status': 'success'
             }
         
         except socket.gaierror:
             # Maybe it's an IP address, try reverse lookup
             try:
-                hostname = socket.gethostbyaddr(target)
-                print(f"IP Address: {target}")
-                print(f"Hostname: {hostname}")
-                print(f"Aliases: {', '.join(hostname) if hostname else 'None'}")
+                hostname, aliases, _addresses = get_scheduler().run(target, socket.gethostbyaddr, target)
                 
                 return {
                     'target': target,
                     'hostname': hostname,
+                    'aliases': aliases,
                     'ip_address': target,
                     'status': 'success'
                 }
-            except:
-                print(f"FAILED: Could not resolve {target}")
+            except (socket.herror, socket.gaierror, OSError):
                 return {
                     'target': target,
                     'status': 'failed'
                 }
     
     except Exception as e:
-        print(f"ERROR: {str(e)}")
         return {
             'target': target,
             'status': 'error',
@@ -168,12 +220,10 @@ def scan_port(host, port, timeout=1):
     Check if a specific port is open on a host
     """
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = sock.connect_ex((host, port))
-        sock.close()
-        return result == 0
-    except:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            return get_scheduler().run(host, sock.connect_ex, (host, port), port=True) == 0
+    except OSError:
         return False
 
 # Function to scan multiple ports
@@ -181,55 +231,22 @@ def port_scanner(host, port_range):
     """
     Scan a range of ports on a host
     """
-    print(f"\n--- Port Scan: {host} ---")
+    from output_parser import parse_ports
     
-    # Parse port range
-    if '-' in port_range:
-        start_port, end_port = map(int, port_range.split('-'))
-    else:
-        start_port = end_port = int(port_range)
-    
-    print(f"Scanning ports {start_port} to {end_port}...")
-    print("This may take a moment...\n")
-    
-    open_ports = []
-    common_ports = {
-        20: 'FTP Data',
-        21: 'FTP Control',
-        22: 'SSH',
-        23: 'Telnet',
-        25: 'SMTP',
-        53: 'DNS',
-        80: 'HTTP',
-        110: 'POP3',
-        143: 'IMAP',
-        443: 'HTTPS',
-        445: 'SMB',
-        3306: 'MySQL',
-        3389: 'RDP',
-        5432: 'PostgreSQL',
-        8080: 'HTTP-Alt'
-    }
+    ports = parse_ports(port_range)
+    scheduler = get_scheduler()
+    scheduler.reset_stats()
+    results = scheduler.run_many((scan_port, (host, port)) for port in ports)
     
-    for port in range(start_port, end_port + 1):
-        if scan_port(host, port):
-            service = common_ports.get(port, 'Unknown')
-            print(f"Port {port} is OPEN - {service}")
-            open_ports.append({'port': port, 'service': service})
-        
-        # Show progress for large scans
-        if (port - start_port + 1) % 20 == 0:
-            print(f"Scanned {port - start_port + 1} ports...")
-    
-    if not open_ports:
-        print("No open ports found in the specified range.")
-    else:
-        print(f"\nTotal open ports found: {len(open_ports)}")
+    open_ports = [{'port': port, 'service': COMMON_PORTS.get(port, 'Unknown')}
+                  for port, is_open in zip(ports, results) if is_open]
     
     return {
         'host': host,
         'port_range': port_range,
-        'open_ports': open_ports
+        'ports_scanned': len(ports),
+        'open_ports': open_ports,
+        'rate': scheduler.summary()
     }
 
 # Function to generate comprehensive network report
@@ -237,70 +254,213 @@ def generate_network_report(host):
     """
     Generate a comprehensive network diagnostics report
     """
-    print(f"\n{'='*60}")
-    print(f"NETWORK DIAGNOSTICS REPORT")
-    print(f"{'='*60}")
-    print(f"Target: {host}")
-    print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"{'='*60}\n")
-    
     report = {
         'target': host,
         'timestamp': datetime.now().isoformat(),
         'tests': {}
     }
+    from output_parser import parse_ports
+    
+    scheduler = get_scheduler()
+    scheduler.reset_stats()
     
     # DNS Lookup
-    print("1. DNS LOOKUP")
-    print("-" * 60)
-    dns_result = dns_lookup(host)
-    report['tests']['dns'] = dns_result
+    report['tests']['dns'] = dns_lookup(host)
     
     # Ping Test
-    print("\n2. PING TEST")
-    print("-" * 60)
-    ping_result = ping_host(host, count=4)
-    report['tests']['ping'] = ping_result
+    report['tests']['ping'] = ping_host(host, count=4)
     
     # Common Port Scan
-    print("\n3. COMMON PORTS SCAN")
-    print("-" * 60)
-    common_ports = "80,443,22,21,25,3389"
-    ports_to_scan = [80, 443, 22, 21, 25, 3389]
-    
-    open_ports = []
-    port_names = {
-        80: 'HTTP',
-        443: 'HTTPS',
-        22: 'SSH',
-        21: 'FTP',
-        25: 'SMTP',
-        3389: 'RDP'
+    ports_to_scan = parse_ports(REPORT_PORTS)
+    port_results = scheduler.run_many((scan_port, (host, port)) for port in ports_to_scan)
+    report['tests']['ports'] = {
+        'port_range': REPORT_PORTS,
+        'scanned': [{'port': port, 'service': COMMON_PORTS.get(port, 'Unknown'), 'open': is_open}
+                    for port, is_open in zip(ports_to_scan, port_results)],
+        'open_ports': [{'port': port, 'service': COMMON_PORTS.get(port, 'Unknown')}
+                       for port, is_open in zip(ports_to_scan, port_results) if is_open]
+    }
+    report['rate'] = scheduler.summary()
+    
+    return report
+
+# Function to save a report to a JSON file
+def save_report(report):
+    """
+    Write a network report to a timestamped JSON file
+    """
+    filename = f"network_report_{report['target']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filename, 'w') as f:
+        json.dump(report, f, indent=4)
+    return filename
+
+# Function to ping multiple hosts
+def batch_ping(hosts, count=2):
+    """
+    Ping multiple hosts concurrently and summarize the results
+    """
+    scheduler = get_scheduler()
+    scheduler.reset_stats()
+    results = scheduler.run_many((ping_host, (host, count)) for host in hosts)
+    reachable = sum(1 for r in results if r.get('status') == 'reachable')
+    
+    return {
+        'results': results,
+        'total': len(hosts),
+        'reachable': reachable,
+        'unreachable': len(hosts) - reachable,
+        'rate': scheduler.summary()
     }
+
+# Function to expand hosts and CIDR ranges into a host list
+def expand_targets(targets):
+    """
+    Expand hostnames, IPs and CIDR networks (e.g. 10.0.0.0/24) into hosts
+    """
+    hosts = []
+    for target in targets:
+        target = target.strip()
+        if not target:
+            continue
+        if '/' in target:
+            import ipaddress
+            network = ipaddress.ip_network(target, strict=False)
+            hosts.extend(str(ip) for ip in (network.hosts() if network.num_addresses > 1 else network))
+        else:
+            hosts.append(target)
+    return hosts
+
+# Function to sweep networks for live hosts
+def ping_sweep(targets, count=1):
+    """
+    Ping every host in the given hosts/CIDR ranges and list the live ones
+    """
+    summary = batch_ping(expand_targets(targets), count=count)
+    summary['alive'] = [r['host'] for r in summary['results'] if r.get('status') == 'reachable']
+    return summary
+
+# Function to print a probe rate summary
+def print_rate_summary(rate):
+    print(f"Probes sent: {rate['probes']} in {rate['elapsed_seconds']}s")
+    print(f"Configured rate: {rate['configured_rate']}/s "
+          f"(per target: {rate['per_target_rate']}/s, ports: {rate['port_rate']}/s)")
+    print(f"Achieved rate: {rate['achieved_rate']}/s")
+
+# Function to print a change list
+def print_changes(changes):
+    """
+    Print the changes found since the previous run
+    """
+    if not changes:
+        print("No changes since last run.")
+        return
+    print(f"Changes since last run ({len(changes)}):")
+    for change in changes:
+        old = change['old'] if change['old'] is not None else '-'
+        print(f"  [{change['test']}] {change['key']}: {change['change']} ({old} -> {change['new']})")
+
+# Function to print ping results
+def print_ping_result(result):
+    host = result['host']
+    print(f"\n--- Pinging {host} ---")
+    
+    if result['status'] == 'reachable':
+        print(f"SUCCESS: {host} is reachable")
+        print(result['output'])
+    elif result['status'] == 'unreachable':
+        print(f"FAILED: {host} is unreachable")
+        print(result['output'])
+    elif result['status'] == 'timeout':
+        print(f"TIMEOUT: {host} did not respond in time")
+    else:
+        print(f"ERROR: {result['error']}")
+
+# Function to print traceroute results
+def print_traceroute_result(result):
+    print(f"\n--- Traceroute to {result['host']} ---")
     
-    for port in ports_to_scan:
-        if scan_port(host, port):
-            service = port_names.get(port, 'Unknown')
-            print(f"Port {port} ({service}): OPEN")
-            open_ports.append({'port': port, 'service': service})
+    if result['status'] == 'completed':
+        print(result['output'])
+    elif result['status'] == 'timeout':
+        print("TIMEOUT: Traceroute took too long")
+    else:
+        print(f"ERROR: {result['error']}")
+
+# Function to print DNS results
+def print_dns_result(result):
+    print(f"\n--- DNS Lookup for {result['target']} ---")
+    
+    if result['status'] == 'success':
+        print(f"Hostname: {result['hostname']}")
+        print(f"IP Address: {result['ip_address']}")
+        if 'aliases' in result:
+            print(f"Aliases: {', '.join(result['aliases']) if result['aliases'] else 'None'}")
         else:
-            print(f"Port {port} ({port_names.get(port, 'Unknown')}): CLOSED")
+            print(f"Reverse DNS: {result['reverse_dns'] or 'Not available'}")
+    elif result['status'] == 'failed':
+        print(f"FAILED: Could not resolve {result['target']}")
+    else:
+        print(f"ERROR: {result['error']}")
+
+# Function to print port scan results
+def print_port_scan(result):
+    print(f"\n--- Port Scan: {result['host']} ---")
+    print(f"Scanned {result['ports_scanned']} ports ({result['port_range']})\n")
     
-    report['tests']['ports'] = {'open_ports': open_ports}
+    for entry in result['open_ports']:
+        print(f"Port {entry['port']} is OPEN - {entry['service']}")
     
+    if not result['open_ports']:
+        print("No open ports found in the specified range.")
+    else:
+        print(f"\nTotal open ports found: {len(result['open_ports'])}")
+    
+    print()
+    print_rate_summary(result['rate'])
+
+# Function to print a network report
+def print_network_report(report):
     print(f"\n{'='*60}")
-    print("REPORT COMPLETE")
+    print(f"NETWORK DIAGNOSTICS REPORT")
+    print(f"{'='*60}")
+    print(f"Target: {report['target']}")
+    print(f"Timestamp: {report['timestamp'][:19].replace('T', ' ')}")
     print(f"{'='*60}\n")
     
-    # Ask to save report
-    save = input("Save report to file? (y/n): ").strip().lower()
-    if save == 'y':
-        filename = f"network_report_{host}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        with open(filename, 'w') as f:
-            json.dump(report, f, indent=4)
-        print(f"\nReport saved to: {filename}")
+    print("1. DNS LOOKUP")
+    print("-" * 60)
+    print_dns_result(report['tests']['dns'])
+    
+    print("\n2. PING TEST")
+    print("-" * 60)
+    print_ping_result(report['tests']['ping'])
     
-    return report
+    print("\n3. COMMON PORTS SCAN")
+    print("-" * 60)
+    for entry in report['tests']['ports']['scanned']:
+        state = 'OPEN' if entry['open'] else 'CLOSED'
+        print(f"Port {entry['port']} ({entry['service']}): {state}")
+    
+    print(f"\n{'='*60}")
+    print_rate_summary(report['rate'])
+    if 'changes' in report:
+        print_changes(report['changes'])
+    print("REPORT COMPLETE")
+    print(f"{'='*60}\n")
+
+# Function to print a batch ping or sweep summary
+def print_batch_summary(summary):
+    print("\n" + "="*50)
+    print("BATCH PING SUMMARY")
+    print("="*50)
+    for result in summary['results']:
+        print(f"  {result['host']}: {result['status'].upper()}")
+    print("-"*50)
+    print(f"Total hosts: {summary['total']}")
+    print(f"Reachable: {summary['reachable']}")
+    print(f"Unreachable: {summary['unreachable']}")
+    print_rate_summary(summary['rate'])
+    print("="*50)
 
 # Main menu
 def show_menu():
@@ -313,11 +473,22 @@ def show_menu():
     print("4. Port Scanner")
     print("5. Generate Network Report")
     print("6. Batch Ping (Multiple Hosts)")
-    print("7. Exit")
+    print("7. View Result History")
+    print("8. Exit")
     print("-"*50)
 
-# Batch ping function
-def batch_ping():
+# Function to save results and print the diff (interactive menu)
+def record_and_show(target, tests):
+    try:
+        changes = record_results(target, tests)
+    except Exception as e:
+        print(f"WARNING: Could not save results - {str(e)}")
+        return []
+    print_changes(changes)
+    return changes
+
+# Batch ping menu
+def batch_ping_menu():
     """
     Ping multiple hosts
     """
@@ -326,50 +497,71 @@ def batch_ping():
     print("Example: google.com, 8.8.8.8, github.com")
     
     hosts_input = input("\nEnter hosts: ").strip()
-    hosts = [h.strip() for h in hosts_input.split(',')]
+    hosts = [h.strip() for h in hosts_input.split(',') if h.strip()]
     
-    results = []
     print(f"\nPinging {len(hosts)} hosts...\n")
+    summary = batch_ping(hosts, count=2)
     
-    for host in hosts:
-        result = ping_host(host, count=2)
-        results.append(result)
-        print()
+    for result in summary['results']:
+        print_ping_result(result)
+        record_and_show(result['host'], {'ping': result})
     
-    # Summary
-    print("\n" + "="*50)
-    print("BATCH PING SUMMARY")
-    print("="*50)
-    reachable = sum(1 for r in results if r.get('status') == 'reachable')
-    print(f"Total hosts: {len(hosts)}")
-    print(f"Reachable: {reachable}")
-    print(f"Unreachable: {len(hosts) - reachable}")
-    print("="*50)
+    print_batch_summary(summary)
+
+# Function to view stored results for a target
+def view_history(target, limit=20):
+    """
+    Show the latest stored values and recent history for a target
+    """
+    store = get_store()
+    latest = store.latest(target)
+    
+    print(f"\n--- Result History: {target} ---")
+    if not latest:
+        print("No stored results for this target.")
+        return
+    
+    print("\nLatest Values:")
+    for fact in sorted(latest, key=lambda f: (f['test'], f['key'])):
+        when = datetime.fromtimestamp(fact['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+        print(f"  [{fact['test']}] {fact['key']}: {fact['value']} ({when})")
+    
+    print(f"\nRecent Results (last {limit}):")
+    for fact in store.history(target, limit=limit):
+        when = datetime.fromtimestamp(fact['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+        print(f"  {when} [{fact['test']}] {fact['key']}: {fact['value']}")
 
-# Main program
+# Interactive program
 def main():
     while True:
         show_menu()
-        choice = input("\nSelect an option (1-7): ").strip()
+        choice = input("\nSelect an option (1-8): ").strip()
         
         if choice == '1':
             host = input("\nEnter hostname or IP address: ").strip()
             if host:
-                ping_host(host)
+                result = ping_host(host)
+                print_ping_result(result)
+                record_and_show(host, {'ping': result})
             else:
                 print("Invalid input")
         
         elif choice == '2':
             host = input("\nEnter hostname or IP address: ").strip()
             if host:
-                traceroute(host)
+                print("This may take a moment...")
+                result = traceroute(host)
+                print_traceroute_result(result)
+                record_and_show(host, {'traceroute': result})
             else:
                 print("Invalid input")
         
         elif choice == '3':
             target = input("\nEnter hostname or IP address: ").strip()
             if target:
-                dns_lookup(target)
+                result = dns_lookup(target)
+                print_dns_result(result)
+                record_and_show(target, {'dns': result})
             else:
                 print("Invalid input")
         
@@ -377,29 +569,215 @@ def main():
             host = input("\nEnter hostname or IP address: ").strip()
             port_range = input("Enter port or range (e.g., 80 or 20-100): ").strip()
             if host and port_range:
-                port_scanner(host, port_range)
+                try:
+                    print("Scanning... This may take a moment...")
+                    result = port_scanner(host, port_range)
+                except ValueError:
+                    print("Invalid port range")
+                else:
+                    print_port_scan(result)
+                    record_and_show(host, {'ports': result})
             else:
                 print("Invalid input")
         
         elif choice == '5':
             host = input("\nEnter hostname or IP address: ").strip()
             if host:
-                generate_network_report(host)
+                print("Running diagnostics... This may take a moment...")
+                report = generate_network_report(host)
+                try:
+                    report['changes'] = record_results(host, report['tests'])
+                except Exception as e:
+                    print(f"WARNING: Could not save results - {str(e)}")
+                print_network_report(report)
+                
+                # Ask to save report
+                save = input("Save report to file? (y/n): ").strip().lower()
+                if save == 'y':
+                    print(f"\nReport saved to: {save_report(report)}")
             else:
                 print("Invalid input")
         
         elif choice == '6':
-            batch_ping()
+            batch_ping_menu()
         
         elif choice == '7':
+            target = input("\nEnter hostname or IP address: ").strip()
+            if target:
+                view_history(target)
+            else:
+                print("Invalid input")
+        
+        elif choice == '8':
             print("\nThank you for using Network Troubleshooting Toolkit!")
             print("Exiting...\n")
             break
         
         else:
-            print("\nInvalid option. Please select 1-7.")
+            print("\nInvalid option. Please select 1-8.")
         
         input("\nPress Enter to continue...")
 
+# Function to drop raw command output from results unless asked for
+def _strip_output(value):
+    if isinstance(value, dict):
+        return {k: _strip_output(v) for k, v in value.items() if k != 'output'}
+    if isinstance(value, list):
+        return [_strip_output(v) for v in value]
+    return value
+
+# Function to build the command-line parser
+def build_parser():
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog='network_toolkit.py',
+        description="Network troubleshooting toolkit. Run without arguments for the interactive menu.")
+    parser.add_argument('--format', choices=['text', 'json', 'jsonl'], default='text',
+                        help="output format (default: text)")
+    parser.add_argument('--raw', action='store_true',
+                        help="include raw ping/traceroute output in JSON results")
+    parser.add_argument('--no-store', action='store_true',
+                        help="don't save results to the history database")
+    parser.add_argument('--rate', type=float, default=PROBE_RATE,
+                        help=f"global probes per second (default: {PROBE_RATE})")
+    parser.add_argument('--per-target-rate', type=float, default=PER_TARGET_RATE,
+                        help=f"probes per second per target (default: {PER_TARGET_RATE})")
+    parser.add_argument('--port-rate', type=float, default=PER_TARGET_PORT_RATE,
+                        help=f"port probes per second per target (default: {PER_TARGET_PORT_RATE})")
+    parser.add_argument('--max-in-flight', type=int, default=MAX_IN_FLIGHT,
+                        help=f"maximum concurrent probes (default: {MAX_IN_FLIGHT})")
+    
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    p = sub.add_parser('ping', help="ping one or more hosts")
+    p.add_argument('hosts', nargs='+')
+    p.add_argument('-c', '--count', type=int, default=4)
+    
+    p = sub.add_parser('trace', help="traceroute to a host")
+    p.add_argument('host')
+    
+    p = sub.add_parser('dns', help="forward/reverse DNS lookup")
+    p.add_argument('targets', nargs='+')
+    
+    p = sub.add_parser('scan', help="scan ports on a host")
+    p.add_argument('host')
+    p.add_argument('ports', help="port spec, e.g. 22 or 20-100 or 22,80,8000-8080")
+    
+    p = sub.add_parser('report', help="DNS, ping and common-port report for a host")
+    p.add_argument('host')
+    p.add_argument('--save', action='store_true', help="also write the report to a JSON file")
+    
+    p = sub.add_parser('sweep', help="ping sweep over hosts and CIDR ranges")
+    p.add_argument('targets', nargs='+', help="hosts or networks, e.g. 10.0.0.0/24")
+    p.add_argument('-c', '--count', type=int, default=1)
+    
+    return parser
+
+# Non-interactive entry point
+def cli(argv):
+    """
+    Run one toolkit command and return the process exit code
+    (0 = success, 1 = a target failed, 2 = bad arguments)
+    """
+    args = build_parser().parse_args(argv)
+    configure_scheduler(rate=args.rate or None, per_target_rate=args.per_target_rate or None,
+                        max_in_flight=args.max_in_flight, port_rate=args.port_rate or None)
+    
+    # Each command yields (target, test type, result) records
+    records = []
+    ok = True
+    
+    if args.command == 'ping':
+        summary = batch_ping(args.hosts, count=args.count)
+        records = [(r['host'], 'ping', r) for r in summary['results']]
+        ok = summary['unreachable'] == 0
+    elif args.command == 'trace':
+        result = traceroute(args.host)
+        records = [(args.host, 'traceroute', result)]
+        ok = result['status'] == 'completed'
+    elif args.command == 'dns':
+        results = [dns_lookup(target) for target in args.targets]
+        records = [(r['target'], 'dns', r) for r in results]
+        ok = all(r['status'] == 'success' for r in results)
+    elif args.command == 'scan':
+        try:
+            result = port_scanner(args.host, args.ports)
+        except ValueError:
+            print(f"Invalid port spec: {args.ports}", file=sys.stderr)
+            return 2
+        records = [(args.host, 'ports', result)]
+    elif args.command == 'report':
+        report = generate_network_report(args.host)
+        records = [(args.host, 'report', report)]
+        ok = report['tests']['ping']['status'] == 'reachable'
+    elif args.command == 'sweep':
+        try:
+            summary = ping_sweep(args.targets, count=args.count)
+        except ValueError as e:
+            print(f"Invalid target: {e}", file=sys.stderr)
+            return 2
+        records = [(r['host'], 'ping', r) for r in summary['results']]
+    
+    # Save to history and attach the diff to each result
+    if not args.no_store:
+        try:
+            for target, test_type, result in records:
+                tests = result['tests'] if test_type == 'report' else {test_type: result}
+                result['changes'] = record_results(target, tests, commit=False)
+            get_store().commit()
+        except Exception as e:
+            print(f"WARNING: Could not save results - {str(e)}", file=sys.stderr)
+    
+    if args.command == 'report' and args.save:
+        filename = save_report(report)
+        if args.format == 'text':
+            print(f"Report saved to: {filename}")
+    
+    if args.format == 'text':
+        if args.command in ('ping', 'sweep'):
+            for result in summary['results']:
+                if args.command == 'ping' or result['status'] == 'reachable':
+                    print_ping_result(result)
+                if result.get('changes'):
+                    print_changes(result['changes'])
+            print_batch_summary(summary)
+        elif args.command == 'trace':
+            print_traceroute_result(result)
+        elif args.command == 'dns':
+            for result in results:
+                print_dns_result(result)
+                if 'changes' in result:
+                    print_changes(result['changes'])
+        elif args.command == 'scan':
+            print_port_scan(result)
+        elif args.command == 'report':
+            print_network_report(report)
+        if args.command in ('trace', 'scan') and 'changes' in result:
+            print_changes(result['changes'])
+        return 0 if ok else 1
+    
+    if args.command in ('ping', 'sweep'):
+        payload = summary
+    elif args.command == 'dns':
+        payload = results
+    elif args.command == 'report':
+        payload = report
+    else:
+        payload = result
+    if not args.raw:
+        payload = _strip_output(payload)
+    
+    if args.format == 'json':
+        print(json.dumps(payload, indent=4))
+    else:
+        # JSON Lines: one record per target result
+        for _target, _test_type, record in records:
+            print(json.dumps(record if args.raw else _strip_output(record)))
+    
+    return 0 if ok else 1
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        sys.exit(cli(sys.argv[1:]))
+    main()
@@ -0,0 +1,184 @@
+import re
+
+# Ping output formats, checked in order. Each entry has:
+#   detect  - pattern that identifies the format
+#   reply   - one match per successful reply: (seq, rtt), or rtt on Windows
+#   counts  - transmitted/received/loss from the statistics block
+#   summary - min/avg/max[/mdev] line (optional in the output)
+#   header  - target name and address
+PING_FORMATS = [
+    ('windows', {
+        'detect': re.compile(r'^Pinging |^Reply from ', re.M),
+        'reply': re.compile(r'^Reply from [^:]+: bytes=\d+ time[=<]([\d.]+)ms', re.M),
+        'counts': re.compile(r'Sent = (\d+), Received = (\d+), Lost = \d+ \((\d+)% loss\)'),
+        'summary': re.compile(r'Minimum = (\d+)ms, Maximum = (\d+)ms, Average = (\d+)ms'),
+        'header': re.compile(r'^Pinging (\S+) (?:\[([^\]]+)\] )?with', re.M),
+    }),
+    ('iputils', {
+        'detect': re.compile(r'bytes of data\.'),
+        'reply': re.compile(r'icmp_seq=(\d+) .*?time=([\d.]+) ms'),
+        'counts': re.compile(r'(\d+) packets transmitted, (\d+) received, .*?([\d.]+)% packet loss'),
+        'summary': re.compile(r'rtt min/avg/max/mdev = ([\d.]+)/([\d.]+)/([\d.]+)/([\d.]+) ms'),
+        'header': re.compile(r'^PING (\S+) \(([^)]+)\)', re.M),
+    }),
+    ('busybox', {
+        'detect': re.compile(r' seq=\d+ ttl='),
+        'reply': re.compile(r' seq=(\d+) .*?time=([\d.]+) ms'),
+        'counts': re.compile(r'(\d+) packets transmitted, (\d+) packets received, ([\d.]+)% packet loss'),
+        'summary': re.compile(r'round-trip min/avg/max = ([\d.]+)/([\d.]+)/([\d.]+) ms'),
+        'header': re.compile(r'^PING (\S+) \(([^)]+)\)', re.M),
+    }),
+    ('bsd', {
+        'detect': re.compile(r'data bytes'),
+        'reply': re.compile(r'icmp_seq=(\d+) .*?time=([\d.]+) ms'),
+        'counts': re.compile(r'(\d+) packets transmitted, (\d+) packets received, .*?([\d.]+)% packet loss'),
+        'summary': re.compile(r'round-trip min/avg/max/(?:stddev|std-dev) = ([\d.]+)/([\d.]+)/([\d.]+)/([\d.]+) ms'),
+        'header': re.compile(r'^PING (\S+) \(([^)]+)\)', re.M),
+    }),
+]
+
+# Traceroute hop lines. Unix traceroute prints "N  name (ip)  1.2 ms ...",
+# Windows tracert prints "N  <1 ms  2 ms  * name [ip]".
+_TRACERT_HOP = re.compile(
+    r'^[ \t]*(\d+)[ \t]+((?:(?:<?[\d.]+ ms|\*)[ \t]+)+)(.*?)[ \t\r]*$', re.M)
+_TRACERT_RTT = re.compile(r'<?([\d.]+) ms|\*')
+_TRACERT_HOST = re.compile(r'^(\S+) \[([^\]]+)\]$')
+_UNIX_HOP = re.compile(r'^[ \t]*(\d+)[ \t]+(.*?)[ \t\r]*$', re.M)
+_UNIX_TOKEN = re.compile(r'(\S+) \(([^)]+)\)|([\d.]+) ms|(\*)|(\d{1,3}(?:\.\d{1,3}){3}|[0-9a-fA-F:]+:[0-9a-fA-F:]+)')
+_TRACERT_DETECT = re.compile(r'^Tracing route to ', re.M)
+
+_PING_PATTERNS = dict(PING_FORMATS)
+
+# Function to find which ping format produced some output
+def detect_ping_format(output):
+    """Return the name of the matching ping format, or None"""
+    for name, patterns in PING_FORMATS:
+        if patterns['detect'].search(output):
+            return name
+    return None
+
+# Function to parse ping output
+def parse_ping(output):
+    """
+    Parse ping output from iputils, BusyBox, BSD/macOS or Windows ping.
+
+    Returns a dict with the per-reply round trip times in `rtts_ms`
+    (floats, in reply order) and the summary statistics. Statistics the
+    output didn't include are computed from the replies, or left as None.
+    """
+    fmt = detect_ping_format(output)
+    result = {
+        'format': fmt,
+        'host': None,
+        'address': None,
+        'rtts_ms': [],
+        'transmitted': None,
+        'received': None,
+        'loss_percent': None,
+        'min_ms': None,
+        'avg_ms': None,
+        'max_ms': None,
+        'mdev_ms': None
+    }
+    if fmt is None:
+        return result
+
+    patterns = _PING_PATTERNS[fmt]
+
+    header = patterns['header'].search(output)
+    if header:
+        result['host'] = header.group(1)
+        result['address'] = header.group(2) or header.group(1)
+
+    if fmt == 'windows':
+        rtts = [float(rtt) for rtt in patterns['reply'].findall(output)]
+    else:
+        rtts = [float(rtt) for _seq, rtt in patterns['reply'].findall(output)]
+    result['rtts_ms'] = rtts
+
+    counts = patterns['counts'].search(output)
+    if counts:
+        result['transmitted'] = int(counts.group(1))
+        result['received'] = int(counts.group(2))
+        result['loss_percent'] = float(counts.group(3))
+
+    summary = patterns['summary'].search(output)
+    if summary:
+        values = [float(v) for v in summary.groups()]
+        if fmt == 'windows':
+            # Windows orders the summary Minimum, Maximum, Average
+            result['min_ms'], result['max_ms'], result['avg_ms'] = values
+        else:
+            result['min_ms'], result['avg_ms'], result['max_ms'] = values[:3]
+            if len(values) > 3:
+                result['mdev_ms'] = values[3]
+    elif rtts:
+        result['min_ms'] = min(rtts)
+        result['max_ms'] = max(rtts)
+        result['avg_ms'] = round(sum(rtts) / len(rtts), 3)
+
+    return result
+
+# Function to parse traceroute/tracert output
+def parse_traceroute(output):
+    """
+    Parse traceroute (Linux, BSD/macOS, BusyBox) or Windows tracert output.
+
+    Returns a list of hops: {'hop', 'address', 'hostname', 'rtts_ms',
+    'lost'}. `address` is the first responding address for the hop (None
+    if every probe timed out); `lost` counts probes shown as '*'.
+    """
+    hops = []
+
+    if _TRACERT_DETECT.search(output):
+        for match in _TRACERT_HOP.finditer(output):
+            rtts = []
+            lost = 0
+            for rtt in _TRACERT_RTT.finditer(match.group(2)):
+                if rtt.group(1) is None:
+                    lost += 1
+                else:
+                    rtts.append(float(rtt.group(1)))
+            host = match.group(3)
+            named = _TRACERT_HOST.match(host)
+            if named:
+                hostname, address = named.group(1), named.group(2)
+            elif rtts:
+                hostname, address = host, host
+            else:
+                hostname = address = None
+            hops.append({'hop': int(match.group(1)), 'address': address,
+                         'hostname': hostname, 'rtts_ms': rtts, 'lost': lost})
+        return hops
+
+    for match in _UNIX_HOP.finditer(output):
+        address = hostname = None
+        rtts = []
+        lost = 0
+        for token in _UNIX_TOKEN.finditer(match.group(2)):
+            named, addr, rtt, star, bare = token.groups()
+            if rtt is not None:
+                rtts.append(float(rtt))
+            elif star is not None:
+                lost += 1
+            elif address is None:
+                hostname = named or bare
+                address = addr or bare
+        hops.append({'hop': int(match.group(1)), 'address': address,
+                     'hostname': hostname, 'rtts_ms': rtts, 'lost': lost})
+    return hops
+
+# Function to parse a port spec like "80", "20-100" or "80,443,8000-8080"
+def parse_ports(spec):
+    """Expand a port specification into a list of ports"""
+    ports = []
+    for part in str(spec).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = map(int, part.split('-'))
+            ports.extend(range(start, end + 1))
+        else:
+            ports.append(int(part))
+    return ports
@@ -0,0 +1,143 @@
+import random
+import threading
+import time
+
+# Token bucket used for both the global and the per-target limits
+class TokenBucket:
+    """
+    Token bucket that refills at `rate` tokens per second up to `burst`
+    (a tenth of a second's worth of tokens by default).
+
+    Reservations are allowed to drive the bucket negative, so a caller
+    asking for more tokens than the burst size simply waits longer
+    instead of blocking forever.
+    """
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst else max(1.0, rate / 10.0))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def reserve(self, cost, now):
+        """Take `cost` tokens and return how long the caller must wait"""
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+        self.tokens -= cost
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+# Central pacing for every probe the toolkit sends
+class ProbeScheduler:
+    """
+    Paces probes with a global and a per-target token bucket.
+
+    rate            - probes per second across all targets (None = unlimited)
+    per_target_rate - probes per second to any single target (None = unlimited)
+    port_rate       - per-target rate for TCP port probes, which are cheap
+                      enough to send faster than pings (defaults to per_target_rate)
+    burst           - bucket size for the global bucket (defaults to rate / 10)
+    jitter          - random extra delay as a fraction of the global interval
+    max_in_flight   - cap on probes running at once (backpressure for run_many)
+    """
+    def __init__(self, rate=None, per_target_rate=None, burst=None,
+                 jitter=0.1, max_in_flight=50, port_rate=None):
+        self.rate = rate
+        self.per_target_rate = per_target_rate
+        self.port_rate = port_rate or per_target_rate
+        self.burst = burst
+        self.jitter = jitter
+        self.max_in_flight = max(1, int(max_in_flight))
+        self._lock = threading.Lock()
+        self._global = TokenBucket(rate, burst) if rate else None
+        self._targets = {}
+        self._in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Start a new measurement window for the run summary"""
+        with self._lock:
+            self.probes = 0
+            self.started = None
+            self.finished = None
+
+    def _target_bucket(self, key, rate):
+        bucket = self._targets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rate)
+            self._targets[key] = bucket
+        return bucket
+
+    def acquire(self, target, cost=1, port=False):
+        """Block until `cost` probes (port probes if `port`) may be sent to `target`"""
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0
+            if self._global is not None:
+                delay = self._global.reserve(cost, now)
+            # Port probes have their own per-target bucket
+            rate = self.port_rate if port else self.per_target_rate
+            if rate:
+                bucket = self._target_bucket((target, 'port') if port else target, rate)
+                delay = max(delay, bucket.reserve(cost, now))
+            if self.jitter and self.rate:
+                delay += random.uniform(0, self.jitter / self.rate)
+            if self.started is None:
+                self.started = now
+            self.probes += cost
+
+        if delay > 0:
+            time.sleep(delay)
+
+    def run(self, target, func, *args, cost=1, port=False, **kwargs):
+        """Pace one probe, run it and record when it finished"""
+        self.acquire(target, cost, port)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.finished = time.monotonic()
+
+    def run_many(self, jobs, workers=None):
+        """
+        Run (func, args) jobs concurrently and return results in order.
+
+        The jobs are expected to pace themselves through run(); this adds
+        the concurrency and the backpressure. Submission blocks while
+        max_in_flight jobs are outstanding, so a large job list never
+        queues more work than the limits allow.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        workers = min(workers or self.max_in_flight, self.max_in_flight)
+
+        def release(_future):
+            self._in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = []
+            for func, args in jobs:
+                self._in_flight.acquire()
+                future = pool.submit(func, *args)
+                future.add_done_callback(release)
+                futures.append(future)
+            return [future.result() for future in futures]
+
+    def summary(self):
+        """Return configured vs. achieved probe rate for the current window"""
+        with self._lock:
+            if self.started is None:
+                elapsed = 0.0
+            else:
+                elapsed = (self.finished or time.monotonic()) - self.started
+            achieved = self.probes / elapsed if elapsed > 0 else 0.0
+            return {
+                'probes': self.probes,
+                'elapsed_seconds': round(elapsed, 3),
+                'configured_rate': self.rate or 'unlimited',
+                'per_target_rate': self.per_target_rate or 'unlimited',
+                'port_rate': self.port_rate or 'unlimited',
+                'achieved_rate': round(achieved, 2)
+            }
@@ -0,0 +1,239 @@
+import re
+import sqlite3
+import time
+
+from output_parser import parse_ports, parse_traceroute
+
+# Default database file for stored results
+RESULTS_DB = "network_results.db"
+
+# Latency must grow by this fraction AND this many ms to count as a regression
+LATENCY_REGRESSION_PCT = 0.5
+LATENCY_REGRESSION_MS = 5.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    target TEXT NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL,
+    target TEXT NOT NULL,
+    test_type TEXT NOT NULL,
+    key TEXT NOT NULL,
+    ts REAL NOT NULL,
+    num REAL,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_target ON results (target, test_type, ts);
+CREATE INDEX IF NOT EXISTS idx_runs_target ON runs (target, ts);
+CREATE TABLE IF NOT EXISTS latest (
+    target TEXT NOT NULL,
+    test_type TEXT NOT NULL,
+    key TEXT NOT NULL,
+    ts REAL NOT NULL,
+    num REAL,
+    text TEXT,
+    PRIMARY KEY (target, test_type, key)
+) WITHOUT ROWID;
+"""
+
+_NUMBER = re.compile(r'[\d.]+')
+
+def _number(value):
+    """Pull a float out of values like '12.5ms' or '0%'"""
+    match = _NUMBER.search(str(value)) if value is not None else None
+    try:
+        return float(match.group(0)) if match else None
+    except ValueError:
+        return None
+
+# Function to flatten one test result into (key, num, text) facts
+def extract_facts(test_type, result, previous=None):
+    """
+    Turn a toolkit result dict into the facts stored and diffed per run.
+
+    Port scans only store open ports, plus a 'closed' fact for any port
+    in the scanned range that `previous` (the last stored facts) had open.
+    """
+    facts = []
+    if result.get('status'):
+        facts.append(('status', None, result['status']))
+
+    if test_type == 'ping':
+        avg = _number(result.get('avg_response_time'))
+        loss = _number(result.get('packet_loss'))
+        if avg is not None:
+            facts.append(('avg_ms', avg, None))
+        if loss is not None:
+            facts.append(('loss_pct', loss, None))
+
+    elif test_type == 'dns':
+        if result.get('ip_address'):
+            facts.append(('ip_address', None, str(result['ip_address'])))
+        if result.get('hostname'):
+            facts.append(('hostname', None, str(result['hostname'])))
+
+    elif test_type == 'ports':
+        open_ports = {p['port'] for p in result.get('open_ports', [])}
+        for port in sorted(open_ports):
+            facts.append((f"port:{port}", None, 'open'))
+        if previous and result.get('port_range'):
+            scanned = set(parse_ports(result['port_range']))
+            for key, (_num, text) in previous.items():
+                port = int(key.split(':', 1)[1])
+                if text == 'open' and port in scanned and port not in open_ports:
+                    facts.append((key, None, 'closed'))
+
+    elif test_type == 'traceroute':
+        hops = result.get('hops')
+        if hops is None:
+            hops = parse_traceroute(result.get('output', ''))
+        path = [hop['address'] or '*' for hop in hops]
+        if path:
+            facts.append(('path', None, ' > '.join(path)))
+
+    return facts
+
+# Function to compare new facts against the previous run
+def diff_facts(test_type, previous, facts):
+    """
+    Report what changed between the last stored facts and the new ones.
+
+    `previous` maps key -> (num, text). Only keys present in the new run
+    are compared, so a partial port scan never reports unscanned ports.
+    """
+    changes = []
+    for key, num, text in facts:
+        if key not in previous:
+            if test_type == 'ports' and text == 'open':
+                changes.append({'test': test_type, 'key': key, 'change': 'opened',
+                                'old': None, 'new': text})
+            continue
+
+        old_num, old_text = previous[key]
+
+        if test_type == 'ports':
+            if text != old_text:
+                changes.append({'test': test_type, 'key': key,
+                                'change': 'opened' if text == 'open' else 'closed',
+                                'old': old_text, 'new': text})
+        elif key == 'avg_ms':
+            if (old_num is not None and num > old_num * (1 + LATENCY_REGRESSION_PCT)
+                    and num - old_num >= LATENCY_REGRESSION_MS):
+                changes.append({'test': test_type, 'key': key, 'change': 'latency regression',
+                                'old': old_num, 'new': num})
+        elif key == 'loss_pct':
+            if old_num is not None and num > old_num:
+                changes.append({'test': test_type, 'key': key, 'change': 'packet loss increased',
+                                'old': old_num, 'new': num})
+        elif text != old_text:
+            changes.append({'test': test_type, 'key': key, 'change': 'changed',
+                            'old': old_text, 'new': text})
+    return changes
+
+# SQLite-backed history of every toolkit result
+class ResultStore:
+    """
+    Stores every ping/DNS/port/traceroute result with a timestamp.
+
+    History lives in `results`, indexed by (target, test_type, ts). The
+    `latest` table keeps the most recent value of every fact, so diffing a
+    new run only reads one small indexed slice instead of the history.
+    """
+    def __init__(self, path=RESULTS_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def _previous(self, target, test_type):
+        rows = self.conn.execute(
+            "SELECT key, num, text FROM latest WHERE target = ? AND test_type = ?",
+            (target, test_type))
+        return {key: (num, text) for key, num, text in rows}
+
+    def ingest(self, target, tests, timestamp=None, commit=True):
+        """
+        Store one run of results for a target and return (run_id, changes).
+
+        `tests` maps a test type ('ping', 'dns', 'ports', 'traceroute') to
+        the dict returned by the matching toolkit function.
+        """
+        ts = timestamp if timestamp is not None else time.time()
+        cur = self.conn.execute("INSERT INTO runs (target, ts) VALUES (?, ?)", (target, ts))
+        run_id = cur.lastrowid
+        changes = []
+
+        for test_type, result in tests.items():
+            if not result:
+                continue
+            previous = self._previous(target, test_type)
+            facts = extract_facts(test_type, result, previous)
+            if previous:
+                changes.extend(diff_facts(test_type, previous, facts))
+
+            self.conn.executemany(
+                "INSERT INTO results (run_id, target, test_type, key, ts, num, text) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, target, test_type, key, ts, num, text) for key, num, text in facts])
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO latest (target, test_type, key, ts, num, text) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(target, test_type, key, ts, num, text) for key, num, text in facts])
+
+        if commit:
+            self.conn.commit()
+        return run_id, changes
+
+    def commit(self):
+        self.conn.commit()
+
+    def history(self, target, test_type=None, key=None, since=None, until=None, limit=None):
+        """Return stored facts for a target, newest first"""
+        sql = "SELECT ts, test_type, key, num, text FROM results WHERE target = ?"
+        params = [target]
+        if test_type:
+            sql += " AND test_type = ?"
+            params.append(test_type)
+        if key:
+            sql += " AND key = ?"
+            params.append(key)
+        if since is not None:
+            sql += " AND ts >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND ts < ?"
+            params.append(until)
+        sql += " ORDER BY ts DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [{'timestamp': ts, 'test': t, 'key': k, 'value': num if num is not None else text}
+                for ts, t, k, num, text in self.conn.execute(sql, params)]
+
+    def latest(self, target=None, test_type=None):
+        """Return the most recent value of every fact (optionally filtered)"""
+        sql = "SELECT target, test_type, key, ts, num, text FROM latest"
+        clauses, params = [], []
+        if target:
+            clauses.append("target = ?")
+            params.append(target)
+        if test_type:
+            clauses.append("test_type = ?")
+            params.append(test_type)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return [{'target': tgt, 'test': t, 'key': k, 'timestamp': ts,
+                 'value': num if num is not None else text}
+                for tgt, t, k, ts, num, text in self.conn.execute(sql, params)]
+
+    def targets(self):
+        """List every target with stored results"""
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT target FROM latest")]
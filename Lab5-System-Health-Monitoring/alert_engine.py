@@ -0,0 +1,226 @@
+import json
+import operator
+import re
+from collections import deque
+
+# Default rules file (JSON list of rules)
+ALERT_RULES_FILE = "alert_rules.json"
+
+_OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+_CONDITION = re.compile(r'^\s*(>=|<=|==|!=|>|<)\s*(-?[\d.]+)\s*$')
+_DURATION = re.compile(r'^\s*([\d.]+)\s*(ms|s|m|h|d)?\s*$')
+_UNITS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600, 'd': 86400, None: 1}
+
+# Function to parse durations like "30s", "2m", "1h" (plain numbers are seconds)
+def parse_duration(value):
+    if value is None:
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _DURATION.match(str(value))
+    if not match:
+        raise ValueError(f"Invalid duration: {value!r}")
+    return float(match.group(1)) * _UNITS[match.group(2)]
+
+# Function to compile a condition like "> 80" into a predicate
+def compile_condition(text):
+    match = _CONDITION.match(str(text))
+    if not match:
+        raise ValueError(f"Invalid condition: {text!r} (expected e.g. '> 80')")
+    compare = _OPERATORS[match.group(1)]
+    threshold = float(match.group(2))
+    return lambda value: compare(value, threshold)
+
+# Rolling window kept incrementally (amortized O(1) per sample)
+class RollingWindow:
+    """
+    Keeps the samples from the last `seconds` with a running sum and
+    monotonic deques, so avg/min/max/rate never rescan the window.
+    """
+    __slots__ = ('seconds', 'samples', 'total', 'lows', 'highs')
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.samples = deque()
+        self.total = 0.0
+        self.lows = deque()
+        self.highs = deque()
+
+    def add(self, ts, value):
+        self.samples.append((ts, value))
+        self.total += value
+        while self.lows and self.lows[-1][1] >= value:
+            self.lows.pop()
+        self.lows.append((ts, value))
+        while self.highs and self.highs[-1][1] <= value:
+            self.highs.pop()
+        self.highs.append((ts, value))
+
+        cutoff = ts - self.seconds
+        while self.samples and self.samples[0][0] < cutoff:
+            self.total -= self.samples.popleft()[1]
+        while self.lows[0][0] < cutoff:
+            self.lows.popleft()
+        while self.highs[0][0] < cutoff:
+            self.highs.popleft()
+
+    def avg(self):
+        return self.total / len(self.samples)
+
+    def min(self):
+        return self.lows[0][1]
+
+    def max(self):
+        return self.highs[0][1]
+
+    def rate(self):
+        """Change per minute between the oldest and newest sample"""
+        (first_ts, first), (last_ts, last) = self.samples[0], self.samples[-1]
+        if last_ts <= first_ts:
+            return 0.0
+        return (last - first) / (last_ts - first_ts) * 60
+
+# One compiled rule and its alert state
+class AlertRule:
+    """
+    A rule from the config file:
+
+    name      - unique rule name
+    metric    - metric to watch, e.g. "cpu.usage_percent"
+    condition - when to fire, e.g. "> 80"
+    type      - value (default), avg, min, max or rate (change per minute)
+    window    - rolling window for avg/min/max/rate, e.g. "5m"
+    for       - how long the condition must hold before firing, e.g. "2m"
+    clear     - hysteresis: condition that resolves a firing alert,
+                e.g. "< 70" (defaults to the fire condition being false)
+    severity  - free text, shown in notifications (default "warning")
+    """
+    STATES = ('ok', 'pending', 'firing')
+
+    def __init__(self, spec):
+        self.name = spec['name']
+        self.metric = spec['metric']
+        self.kind = spec.get('type', 'value')
+        self.severity = spec.get('severity', 'warning')
+        self.condition_text = spec['condition']
+        self.fires = compile_condition(spec['condition'])
+        self.clears = compile_condition(spec['clear']) if spec.get('clear') else None
+        self.hold = parse_duration(spec.get('for'))
+
+        if self.kind == 'value':
+            self.window = None
+        elif self.kind in ('avg', 'min', 'max', 'rate'):
+            self.window = parse_duration(spec.get('window', '5m'))
+        else:
+            raise ValueError(f"Rule {self.name}: unknown type {self.kind!r}")
+
+        self.state = 'ok'
+        self.since = None
+        self.value = None
+
+    def observe(self, ts, value):
+        """Feed the (aggregated) value; return 'firing' or 'resolved' on a transition"""
+        self.value = value
+
+        if self.state == 'firing':
+            resolved = self.clears(value) if self.clears else not self.fires(value)
+            if resolved:
+                self.state = 'ok'
+                self.since = None
+                return 'resolved'
+            return None
+
+        if not self.fires(value):
+            self.state = 'ok'
+            self.since = None
+            return None
+
+        if self.state == 'ok':
+            self.state = 'pending'
+            self.since = ts
+        if ts - self.since >= self.hold:
+            self.state = 'firing'
+            return 'firing'
+        return None
+
+# Alert engine evaluating every rule once per tick
+class AlertEngine:
+    """
+    Evaluates compiled rules against each tick of metric values.
+
+    Rules are grouped by metric once at load time, and rules watching the
+    same metric over the same window share one RollingWindow, so a tick
+    costs one O(1) update per window plus one comparison per rule. Only
+    state changes produce events: an alert is reported once when it
+    starts firing and once when it resolves.
+    """
+    def __init__(self, rules):
+        self.rules = [rule if isinstance(rule, AlertRule) else AlertRule(rule) for rule in rules]
+        names = [rule.name for rule in self.rules]
+        if len(names) != len(set(names)):
+            raise ValueError("Alert rule names must be unique")
+
+        # metric -> (windows to update, [(rule, window or None)])
+        self._by_metric = {}
+        for rule in self.rules:
+            windows, checks = self._by_metric.setdefault(rule.metric, ({}, []))
+            window = None
+            if rule.window is not None:
+                window = windows.get(rule.window)
+                if window is None:
+                    window = windows[rule.window] = RollingWindow(rule.window)
+            checks.append((rule, window))
+
+    @classmethod
+    def load(cls, path=ALERT_RULES_FILE):
+        """Build an engine from a JSON rules file"""
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def evaluate(self, values, ts):
+        """
+        Apply one tick of {metric: value} and return the transition events
+        """
+        events = []
+        for metric, (windows, checks) in self._by_metric.items():
+            value = values.get(metric)
+            if value is None:
+                continue
+            for window in windows.values():
+                window.add(ts, value)
+            for rule, window in checks:
+                observed = value if window is None else getattr(window, rule.kind)()
+                change = rule.observe(ts, observed)
+                if change is not None:
+                    events.append({
+                        'rule': rule.name,
+                        'state': change,
+                        'metric': rule.metric,
+                        'value': round(rule.value, 2),
+                        'condition': rule.condition_text,
+                        'severity': rule.severity,
+                        'timestamp': ts
+                    })
+        return events
+
+    def active(self):
+        """Rules currently firing"""
+        return [rule for rule in self.rules if rule.state == 'firing']
+
+# Function to build rules equivalent to the classic three thresholds
+def threshold_rules(cpu=80, memory=85, disk=90, hysteresis=5):
+    return [
+        {'name': 'HighCPU', 'metric': 'cpu.usage_percent', 'condition': f"> {cpu}",
+         'clear': f"< {cpu - hysteresis}"},
+        {'name': 'HighMemory', 'metric': 'memory.usage_percent', 'condition': f"> {memory}",
+         'clear': f"< {memory - hysteresis}"},
+        {'name': 'LowDiskSpace', 'metric': 'disk.usage_percent', 'condition': f"> {disk}",
+         'clear': f"< {disk - hysteresis}"},
+    ]
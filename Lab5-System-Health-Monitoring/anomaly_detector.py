@@ -0,0 +1,212 @@
+import math
+from array import array
+
+# Mean absolute deviation of a normal distribution is sigma * sqrt(2/pi),
+# so deviation / (MAD_SCALE * mad) is comparable to a z-score
+MAD_SCALE = math.sqrt(math.pi / 2)
+
+# Function to turn a half-life (in samples) into an EWMA weight
+def alpha_for(halflife):
+    return 1.0 - 0.5 ** (1.0 / halflife)
+
+# Streaming detector for one metric series
+class SeriesDetector:
+    """
+    Scores each new value against baselines learned from earlier values.
+
+    Two baselines are kept, both updated in O(1) with fixed-size state:
+
+    - EWMA: exponentially weighted mean, variance (z-score) and mean
+      absolute deviation (MAD score, less inflated by past spikes)
+    - Seasonal: one EWMA mean/variance per time-of-day slot, so a backup
+      that runs at 02:00 every night stops looking unusual
+
+    A value is anomalous when its MAD score reaches `threshold` and, once
+    its seasonal slot has seen a full season of data, the seasonal
+    z-score does too. Scores always use the baselines from before the
+    value, which is what backtest() reproduces. Variance and MAD start at
+    zero, so they are bias-corrected (divided by 1 - (1 - alpha)^updates)
+    to avoid flagging normal noise right after warmup.
+    """
+    __slots__ = ('alpha', 'seasonal_alpha', 'threshold', 'warmup', 'season', 'slots',
+                 'slot_warmup', 'count', 'mean', 'var', 'mad',
+                 'slot_mean', 'slot_var', 'slot_count')
+
+    def __init__(self, halflife=60, threshold=4.0, warmup=30, season=86400, slots=24,
+                 interval=1.0, seasonal_halflife=3):
+        """
+        halflife          - EWMA half-life in samples
+        season, slots     - seasonal period (seconds) and slots per period
+        interval          - expected seconds between samples
+        seasonal_halflife - slot baseline half-life in seasons
+        """
+        per_slot = max(1.0, season / slots / interval)
+        self.alpha = alpha_for(halflife)
+        self.seasonal_alpha = alpha_for(seasonal_halflife * per_slot)
+        self.threshold = threshold
+        self.warmup = warmup
+        self.season = season
+        self.slots = slots
+        self.slot_warmup = per_slot
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.mad = 0.0
+        self.slot_mean = array('d', bytes(8 * slots))
+        self.slot_var = array('d', bytes(8 * slots))
+        self.slot_count = array('d', bytes(8 * slots))
+
+    def update(self, value, ts):
+        """
+        Score `value` then learn from it. Returns (anomalous, mad_score,
+        zscore, seasonal_zscore); scores are None until warmed up.
+        """
+        a = self.alpha
+        mad_score = zscore = seasonal = None
+
+        if self.count == 0:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            if self.count >= self.warmup:
+                correction = 1 - (1 - a) ** (self.count - 1)
+                if self.mad > 0:
+                    mad_score = diff * correction / (MAD_SCALE * self.mad)
+                if self.var > 0:
+                    zscore = diff / math.sqrt(self.var / correction)
+            self.mean += a * diff
+            self.var = (1 - a) * (self.var + a * diff * diff)
+            self.mad = (1 - a) * self.mad + a * abs(diff)
+        self.count += 1
+
+        slot = int(ts % self.season * self.slots // self.season)
+        n = self.slot_count[slot]
+        if n == 0:
+            self.slot_mean[slot] = value
+        else:
+            b = self.seasonal_alpha
+            diff = value - self.slot_mean[slot]
+            if n >= self.slot_warmup and self.slot_var[slot] > 0:
+                correction = 1 - (1 - b) ** (n - 1)
+                seasonal = diff / math.sqrt(self.slot_var[slot] / correction)
+            self.slot_mean[slot] += b * diff
+            self.slot_var[slot] = (1 - b) * (self.slot_var[slot] + b * diff * diff)
+        self.slot_count[slot] = n + 1
+
+        anomalous = (mad_score is not None and abs(mad_score) >= self.threshold
+                     and (seasonal is None or abs(seasonal) >= self.threshold))
+        return anomalous, mad_score, zscore, seasonal
+
+# Streaming detector for every metric in a snapshot
+class AnomalyDetector:
+    """
+    Keeps one SeriesDetector per metric name and reports anomalies as a
+    metric enters the anomalous state (not on every anomalous sample).
+    """
+    def __init__(self, metrics=None, **options):
+        self.metrics = set(metrics) if metrics else None
+        self.options = options
+        self.series = {}
+        self.anomalous = set()
+
+    def observe(self, values, ts):
+        """Feed {metric: value} for one timestamp, return new anomalies"""
+        found = []
+        for metric, value in values.items():
+            if self.metrics is not None and metric not in self.metrics:
+                continue
+            detector = self.series.get(metric)
+            if detector is None:
+                detector = self.series[metric] = SeriesDetector(**self.options)
+            expected = detector.mean
+            anomalous, score, _zscore, _seasonal = detector.update(value, ts)
+            if anomalous and metric not in self.anomalous:
+                self.anomalous.add(metric)
+                found.append({'metric': metric, 'value': value, 'expected': round(expected, 2),
+                              'score': round(score, 1), 'timestamp': ts})
+            elif not anomalous:
+                self.anomalous.discard(metric)
+        return found
+
+# Function to run an EWMA recurrence over a whole array with NumPy
+def _ewma(np, x, alpha, initial):
+    """
+    Vectorized e[k] = (1 - alpha) * e[k-1] + alpha * x[k], e[-1] = initial.
+
+    Uses the closed form e[k] = d^(k+1) * e0 + alpha * d^k * cumsum(x / d^j)
+    in blocks short enough that d^-j stays far from overflow.
+    """
+    d = 1.0 - alpha
+    block = max(1, int(12 * math.log(10) / -math.log(d))) if 0 < d < 1 else len(x) or 1
+    out = np.empty(len(x))
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        powers = d ** np.arange(len(chunk))
+        out[start:start + len(chunk)] = (d * powers * initial
+                                         + alpha * powers * np.cumsum(chunk / powers))
+        initial = out[start + len(chunk) - 1]
+    return out
+
+# Function to score one series of values at once
+def _baseline_scores(np, x, alpha, warmup):
+    """
+    Return (mean, var, mad before each sample, diff, usable), with var
+    and mad bias-corrected,
+    matching SeriesDetector's update order. `usable` marks samples scored
+    after warmup.
+    """
+    n = len(x)
+    mean_after = _ewma(np, x[1:], alpha, x[0]) if n > 1 else np.empty(0)
+    mean_before = np.concatenate(([x[0], x[0]], mean_after[:-1]))[:n]
+    diff = np.zeros(n)
+    diff[1:] = x[1:] - mean_before[1:]
+    # var[k] = (1-a)*var[k-1] + a*((1-a)*diff^2), mad[k] = (1-a)*mad[k-1] + a*|diff|
+    var_after = _ewma(np, (1 - alpha) * diff[1:] ** 2, alpha, 0.0)
+    mad_after = _ewma(np, np.abs(diff[1:]), alpha, 0.0)
+    var_before = np.concatenate(([0.0, 0.0], var_after[:-1]))[:n]
+    mad_before = np.concatenate(([0.0, 0.0], mad_after[:-1]))[:n]
+    # Bias correction for starting at zero (k - 1 updates before sample k)
+    correction = 1 - (1 - alpha) ** np.maximum(np.arange(n) - 1, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        var_before = np.where(correction > 0, var_before / correction, 0.0)
+        mad_before = np.where(correction > 0, mad_before / correction, 0.0)
+    usable = np.arange(n) >= warmup
+    usable[0] = False
+    return mean_before, var_before, mad_before, diff, usable
+
+# Function to backtest the detector over stored history
+def backtest(timestamps, values, **options):
+    """
+    Vectorized (NumPy) equivalent of feeding `values` through one
+    SeriesDetector. Returns a dict of arrays: anomalous, mad_score,
+    zscore and seasonal (NaN where the streaming detector gives None).
+    """
+    import numpy as np
+
+    ts = np.asarray(timestamps, dtype=float)
+    x = np.asarray(values, dtype=float)
+    template = SeriesDetector(**options)
+    n = len(x)
+    nan = np.full(n, np.nan)
+    if n == 0:
+        return {'anomalous': np.zeros(0, dtype=bool), 'mad_score': nan, 'zscore': nan, 'seasonal': nan}
+
+    _mean, var, mad, diff, usable = _baseline_scores(np, x, template.alpha, template.warmup)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mad_score = np.where(usable & (mad > 0), diff / (MAD_SCALE * mad), np.nan)
+        zscore = np.where(usable & (var > 0), diff / np.sqrt(var), np.nan)
+
+    seasonal = nan.copy()
+    slot = (ts % template.season * template.slots // template.season).astype(int)
+    for s in np.unique(slot):
+        index = np.nonzero(slot == s)[0]
+        _mean, var_s, _mad, diff_s, _usable = _baseline_scores(
+            np, x[index], template.seasonal_alpha, 0)
+        warm = np.arange(len(index)) >= template.slot_warmup
+        with np.errstate(divide='ignore', invalid='ignore'):
+            seasonal[index] = np.where(warm & (var_s > 0), diff_s / np.sqrt(var_s), np.nan)
+
+    threshold = template.threshold
+    anomalous = (np.abs(np.nan_to_num(mad_score)) >= threshold) & ~np.isnan(mad_score)
+    anomalous &= np.isnan(seasonal) | (np.abs(np.nan_to_num(seasonal)) >= threshold)
+    return {'anomalous': anomalous, 'mad_score': mad_score, 'zscore': zscore, 'seasonal': seasonal}
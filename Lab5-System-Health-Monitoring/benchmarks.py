@@ -0,0 +1,633 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import psutil
+
+import system_monitor
+from metrics_store import MetricsStore, RESOLUTIONS, RAW_RECORD, ROLLUP_RECORD
+from process_tracker import ProcessTracker
+from alert_engine import AlertEngine
+from device_stats import DeviceCollector
+from anomaly_detector import SeriesDetector, backtest
+from exporter import MetricsExporter
+from service_watch import ServiceWatcher
+from report_archive import ReportArchive, summarize_window, SUMMARY_METRICS
+from instrumentation import Profiler
+from cgroup_stats import CgroupCollector
+
+# Collection as it worked before the background sampler
+def _legacy_health_report():
+    cpu_percent = psutil.cpu_percent(interval=1)
+    cpu_freq = psutil.cpu_freq()
+    memory = psutil.virtual_memory()
+    disk = psutil.disk_usage('/')
+    net_io = psutil.net_io_counters()
+    return {
+        'cpu': {'usage_percent': cpu_percent, 'cores': psutil.cpu_count(logical=True),
+                'frequency_mhz': cpu_freq.current if cpu_freq else 'N/A'},
+        'memory': {'usage_percent': memory.percent},
+        'disk': {'usage_percent': disk.percent},
+        'network': {'bytes_sent_mb': round(net_io.bytes_sent / (1024**2), 2)}
+    }
+
+def _timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+def _report(label, samples):
+    print(f"{label:<40} median {statistics.median(samples) * 1000:9.3f} ms"
+          f"   max {max(samples) * 1000:9.3f} ms   (n={len(samples)})")
+
+# Benchmark: end-to-end latency of building a health report
+def bench_health_report(repeat=1000):
+    """
+    Compare the old blocking collection with reads from the sampler
+    """
+    print("\n--- Health Report Latency ---")
+    _report("Before: blocking cpu_percent(interval=1)", _timed(_legacy_health_report, 3))
+
+    t0 = time.perf_counter()
+    system_monitor.get_snapshot()
+    print(f"{'Sampler first snapshot (cold start)':<40} {(time.perf_counter() - t0) * 1000:9.3f} ms")
+    _report("After: collect_health_report()", _timed(system_monitor.collect_health_report, repeat))
+    _report("One sampler tick (background thread)", _timed(system_monitor.sampler.sample, 100))
+
+# Benchmark: 1 Hz appends of many metrics into the time-series store
+def bench_metrics_store(metrics=40, hours=24):
+    """
+    Append `hours` of 1-second samples for `metrics` metrics, then time
+    range queries and report on-disk size against the retention bound.
+    """
+    print(f"\n--- Metrics Store: {metrics} metrics x {hours}h at 1 Hz ---")
+    path = tempfile.mkdtemp()
+    store = MetricsStore(path)
+    names = [f"metric_{i}" for i in range(metrics)]
+    start = int(time.time()) - hours * 3600
+
+    hourly = []
+    for hour in range(hours):
+        t0 = time.perf_counter()
+        for second in range(3600):
+            ts = start + hour * 3600 + second
+            store.append_sample({name: second % 100 for name in names}, ts)
+        hourly.append((time.perf_counter() - t0) / (3600 * metrics))
+    print(f"Append cost, first hour: {hourly[0] * 1e6:7.2f} us/value")
+    print(f"Append cost, last hour:  {hourly[-1] * 1e6:7.2f} us/value")
+    print(f"Tick cost for {metrics} metrics: {statistics.mean(hourly) * metrics * 1000:.2f} ms")
+
+    for label, span in (("Last hour (raw)", 3600), ("Last day (1m)", 86400)):
+        t0 = time.perf_counter()
+        rows = store.query(names[0], start + hours * 3600 - span, start + hours * 3600)
+        print(f"Query {label:<18} {(time.perf_counter() - t0) * 1000:8.2f} ms ({len(rows)} rows)")
+
+    store.close()
+    used = sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+    bound = 0
+    for name, (bucket, span, retention) in RESOLUTIONS.items():
+        size = RAW_RECORD.size if name == 'raw' else ROLLUP_RECORD.size
+        bound += (retention + span) // bucket * size
+    print(f"Disk used: {used / (1024**2):.1f} MB")
+    print(f"Retention bound: {bound / (1024**2):.2f} MB per metric, "
+          f"{bound * metrics / (1024**2):.0f} MB for {metrics} metrics (any run length)")
+
+# Process listing as it worked before the tracker
+def _legacy_top(n=20):
+    processes = []
+    for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+        try:
+            processes.append(proc.info)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    processes.sort(key=lambda x: x['cpu_percent'] or 0, reverse=True)
+    return processes[:n]
+
+# Benchmark: process table refresh cost on a host with many processes
+def bench_process_refresh(spawn=5000, repeat=5):
+    """
+    Start `spawn` idle processes, then time tracker refreshes and top-N
+    against the old process_iter + full sort approach.
+    """
+    print(f"\n--- Process Refresh: +{spawn} idle processes ---")
+    children = []
+    try:
+        for _ in range(spawn):
+            children.append(subprocess.Popen(['sleep', '300']))
+        print(f"Processes on host: {len(psutil.pids())}")
+
+        tracker = ProcessTracker()
+        t0 = time.perf_counter()
+        tracker.refresh()
+        print(f"{'Tracker first refresh (cold cache)':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+        _report("Tracker refresh (warm cache)", _timed(tracker.refresh, repeat))
+        _report("Tracker top 20 (refresh + nlargest)", _timed(lambda: tracker.top(20), repeat))
+        _report("Top 20 from last refresh (nlargest)", _timed(lambda: tracker.top(20, refresh=False), 100))
+        _report("Before: process_iter + sort", _timed(_legacy_top, repeat))
+
+        rss = ProcessTracker(('name', 'cpu_percent', 'memory_percent', 'memory_rss_mb', 'num_threads'))
+        rss.refresh()
+        _report("Tracker refresh, 5 fields", _timed(rss.refresh, repeat))
+    finally:
+        for child in children:
+            child.kill()
+        for child in children:
+            child.wait()
+
+# Benchmark: many agents on loopback feeding one collector process
+def bench_fleet(agents=500, batch_size=12, seconds=10):
+    """
+    Each simulated agent sends one batch per second for `seconds`. Reports
+    the collector's ingest rate and CPU per 1k samples/s.
+    """
+    import asyncio
+    import json
+    import socket
+    from fleet import encode_batch
+
+    print(f"\n--- Fleet Collector: {agents} agents x {batch_size} samples/s ---")
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+
+    here = os.path.dirname(os.path.abspath(__file__))
+    collector = subprocess.Popen(
+        [sys.executable, '-c',
+         f"from fleet import run_collector; run_collector('127.0.0.1', {port}, report_every=3600)"],
+        cwd=here, stdout=subprocess.DEVNULL)
+    time.sleep(1)
+    proc = psutil.Process(collector.pid)
+
+    async def agent(index):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        for tick in range(seconds):
+            now = time.time()
+            samples = [[now, (index + i) % 100, 50.0, 40.0, 1.0 * tick, 2.0 * tick]
+                       for i in range(batch_size)]
+            writer.write(encode_batch(f"agent-{index}", samples))
+            await writer.drain()
+            await asyncio.sleep(1)
+        writer.close()
+
+    async def stats():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'{"stats": true}\n')
+        await writer.drain()
+        line = await reader.readline()
+        writer.close()
+        return json.loads(line)
+
+    async def run():
+        cpu_before = sum(proc.cpu_times()[:2])
+        t0 = time.perf_counter()
+        await asyncio.gather(*(agent(i) for i in range(agents)))
+        await asyncio.sleep(0.5)
+        elapsed = time.perf_counter() - t0
+        cpu = sum(proc.cpu_times()[:2]) - cpu_before
+        return await stats(), elapsed, cpu
+
+    try:
+        result, elapsed, cpu = asyncio.run(run())
+    finally:
+        collector.terminate()
+        collector.wait()
+
+    rate = result['samples'] / elapsed
+    print(f"Agents seen: {result['agents']}, samples ingested: {result['samples']}")
+    print(f"Ingest rate: {rate:,.0f} samples/s")
+    print(f"Collector CPU: {cpu / elapsed * 100:.1f}% of one core "
+          f"({cpu / elapsed * 100 / (rate / 1000):.2f}% per 1k samples/s)")
+
+# Benchmark: alert rule evaluation cost per tick
+def bench_alert_rules(rule_counts=(100, 1000, 5000), ticks=600):
+    """
+    Evaluate mixed value/avg/max/rate rules with 5m windows over 40
+    metrics and report the cost of one tick and per rule.
+    """
+    print("\n--- Alert Rule Evaluation ---")
+    metrics = [f"host.metric_{i}" for i in range(40)]
+    kinds = ('value', 'avg', 'max', 'rate')
+
+    for count in rule_counts:
+        rules = []
+        for i in range(count):
+            kind = kinds[i % len(kinds)]
+            rule = {'name': f"rule-{i}", 'metric': metrics[i % len(metrics)], 'type': kind,
+                    'condition': "> 2" if kind == 'rate' else f"> {50 + i % 50}",
+                    'clear': None if kind == 'rate' else f"< {45 + i % 50}", 'for': "30s"}
+            if kind != 'value':
+                rule['window'] = "5m"
+            rules.append(rule)
+
+        t0 = time.perf_counter()
+        engine = AlertEngine(rules)
+        compile_ms = (time.perf_counter() - t0) * 1000
+
+        events = 0
+        samples = []
+        for tick in range(ticks):
+            values = {metric: 50 + 45 * ((tick // 60 + n) % 2) + (tick % 7) for n, metric in enumerate(metrics)}
+            t0 = time.perf_counter()
+            events += len(engine.evaluate(values, 1700000000 + tick))
+            samples.append(time.perf_counter() - t0)
+
+        median = statistics.median(samples)
+        print(f"{count:>5} rules: compile {compile_ms:7.1f} ms | tick median {median * 1000:7.3f} ms, "
+              f"max {max(samples) * 1000:7.3f} ms | {median / count * 1e6:5.2f} us/rule | "
+              f"{events} events, {len(engine.active())} firing")
+
+# Benchmark: full snapshot cost on a host with many mounts
+def bench_device_collection(mounts=100, repeat=200):
+    """
+    Time a full sampler tick with `mounts` cached mountpoints. The sandbox
+    rarely has that many real mounts, so the cached partition list points
+    at existing directories (one statvfs each, same as a real mount).
+    """
+    print("\n--- Per-Mount and Per-Interface Collection ---")
+    _report("Enumerate partitions (uncached)",
+            _timed(lambda: psutil.disk_partitions(all=True), repeat))
+
+    directories = ['/']
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(mounts - 1):
+            path = os.path.join(tmp, f"mnt{i}")
+            os.mkdir(path)
+            directories.append(path)
+        fake = [(path, f"/dev/fake{i}", 'ext4') for i, path in enumerate(directories)]
+
+        collector = DeviceCollector()
+        collector._partitions = fake
+        collector._partitions_at = time.monotonic()
+        collector.collect()
+        _report(f"DeviceCollector.collect() ({mounts} mounts)", _timed(collector.collect, repeat))
+
+        sampler = system_monitor.MetricsSampler()
+        sampler._devices = collector
+        sampler.sample()
+        _report(f"Full snapshot ({mounts} mounts)", _timed(sampler.sample, repeat))
+
+# Benchmark: anomaly detector throughput and memory
+def bench_anomaly_detection(samples=200000, series=10000):
+    """
+    Stream a synthetic 5-second series with a daily peak and injected
+    spikes, backtest the same data with NumPy, and measure the memory
+    each tracked series costs.
+    """
+    import random
+    print("\n--- Anomaly Detection ---")
+    rng = random.Random(1)
+    timestamps = [1700000000 + i * 5 for i in range(samples)]
+    values = []
+    for ts in timestamps:
+        hour = ts % 86400 // 3600
+        value = 30 + (20 if hour == 2 else 0) + rng.gauss(0, 3)
+        if rng.random() < 0.001:
+            value += 40
+        values.append(value)
+
+    detector = SeriesDetector(interval=5)
+    t0 = time.perf_counter()
+    flags = [detector.update(value, ts)[0] for value, ts in zip(values, timestamps)]
+    streaming = time.perf_counter() - t0
+    print(f"Streaming: {samples / streaming:12,.0f} samples/s ({sum(flags)} anomalies)")
+
+    try:
+        t0 = time.perf_counter()
+        result = backtest(timestamps, values, interval=5)
+        batch = time.perf_counter() - t0
+        mismatches = sum(1 for a, b in zip(flags, result['anomalous']) if a != bool(b))
+        print(f"Backtest:  {samples / batch:12,.0f} samples/s "
+              f"({int(result['anomalous'].sum())} anomalies, {mismatches} differ from streaming)")
+    except ImportError:
+        print("Backtest:  skipped (NumPy not installed)")
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    detectors = [SeriesDetector() for _ in range(series)]
+    for detector in detectors:
+        detector.update(1.0, 0)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"Memory:    {used / series:12,.0f} bytes per tracked series ({series} series)")
+
+# Benchmark: /metrics latency under concurrent scrapers
+def bench_exporter(scrapers=50, requests=200):
+    """
+    Run `scrapers` keep-alive clients against the exporter at once and
+    report scrape latency, with and without reusing the rendered body.
+    """
+    import http.client
+    import threading
+    print("\n--- Metrics Exporter Under Concurrent Scrapes ---")
+    system_monitor.get_snapshot()
+
+    for cache in (False, True):
+        exporter = MetricsExporter(system_monitor.get_snapshot, cache=cache)
+        server = exporter.make_server('127.0.0.1', 0)
+        port = server.server_address[1]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        latencies = []
+        lock = threading.Lock()
+
+        def scraper():
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            mine = []
+            for _ in range(requests):
+                t0 = time.perf_counter()
+                conn.request('GET', '/metrics', headers={'Accept-Encoding': 'gzip'})
+                response = conn.getresponse()
+                response.read()
+                mine.append(time.perf_counter() - t0)
+            conn.close()
+            with lock:
+                latencies.extend(mine)
+
+        threads = [threading.Thread(target=scraper) for _ in range(scrapers)]
+        t0 = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - t0
+        server.shutdown()
+        server.server_close()
+
+        latencies.sort()
+        label = "cached body" if cache else "render every scrape"
+        print(f"{label:<20} {len(latencies) / elapsed:8,.0f} scrapes/s | "
+              f"p50 {latencies[len(latencies) // 2] * 1000:7.2f} ms | "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:7.2f} ms | "
+              f"{exporter.renders} renders for {exporter.scrapes} scrapes")
+
+# Benchmark: service watch cycle with many processes and services
+def bench_service_watch(spawn=5000, services=500, churn=100, repeat=5):
+    """
+    Watch `services` services (name, cmdline and pidfile matches, some
+    with TCP probes) on a host with `spawn` extra processes, and time a
+    check cycle with and without process churn.
+    """
+    import socket
+    print(f"\n--- Service Watch: {services} services, +{spawn} processes ---")
+    children = []
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1024)
+    port = listener.getsockname()[1]
+    try:
+        for i in range(spawn):
+            children.append(subprocess.Popen(['sleep', f"600.{i}"]))
+        print(f"Processes on host: {len(psutil.pids())}")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            specs = []
+            for i in range(services):
+                kind = i % 10
+                if kind < 6:
+                    spec = {'process': 'sleep' if i % 2 else f"missing-{i}"}
+                elif kind < 9:
+                    spec = {'cmdline': rf"^sleep 600\.{i}$"}
+                else:
+                    pidfile = os.path.join(tmp, f"{i}.pid")
+                    with open(pidfile, 'w') as f:
+                        f.write(str(children[i].pid))
+                    spec = {'pidfile': pidfile}
+                if i % 5 == 0:
+                    spec['tcp'] = f"127.0.0.1:{port}"
+                spec['name'] = f"service-{i}"
+                specs.append(spec)
+
+            t0 = time.perf_counter()
+            watcher = ServiceWatcher(specs)
+            watcher.check(probe=False)
+            print(f"{'Index build + first check (cold)':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+            _report("Check cycle, no churn", _timed(lambda: watcher.check(probe=False), repeat))
+            _report("Before: process_iter name set", _timed(
+                lambda: {p.info['name'] for p in psutil.process_iter(['name'])}, repeat))
+
+            def churn_cycle():
+                for _ in range(churn):
+                    old = children.pop()
+                    old.kill()
+                    old.wait()
+                    children.append(subprocess.Popen(['sleep', '600']))
+                t0 = time.perf_counter()
+                watcher.check(probe=False)
+                return time.perf_counter() - t0
+            samples = [churn_cycle() for _ in range(repeat)]
+            _report(f"Check cycle, {churn} starts + {churn} exits", samples)
+
+            probes = sum(1 for spec in specs if 'tcp' in spec)
+            _report(f"Check cycle + {probes} TCP probes", _timed(lambda: watcher.check(probe='all'), repeat))
+            healthy = sum(1 for status in watcher.check(probe=False) if status['healthy'])
+            print(f"Healthy services: {healthy}/{services}")
+    finally:
+        listener.close()
+        for child in children:
+            child.kill()
+        for child in children:
+            child.wait()
+
+# Benchmark: month-long summary from stored samples and archived reports
+def bench_month_summary(days=30, reports_per_day=96):
+    """
+    Fill a store with `days` of 1-minute and 1-hour rollups for the
+    summary metrics and an archive with `reports_per_day` reports a day,
+    then time a month summary from each.
+    """
+    from datetime import datetime, timedelta
+    print(f"\n--- {days}-Day Summary ---")
+    end = int(time.time()) // 3600 * 3600
+    start = end - days * 86400
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MetricsStore(os.path.join(tmp, 'metrics'))
+        t0 = time.perf_counter()
+        for metric in SUMMARY_METRICS:
+            for ts in range(start, end, 60):
+                value = 40.0 + (ts // 60) % 30
+                store._write(metric, '1m', ts, ROLLUP_RECORD.pack(ts, value, value - 5, value + 5))
+            for ts in range(start, end, 3600):
+                store._write(metric, '1h', ts, ROLLUP_RECORD.pack(ts, 54.5, 35.0, 74.0))
+        store.flush()
+        print(f"{'Generate rollups':<40} {time.perf_counter() - t0:9.2f} s")
+
+        t0 = time.perf_counter()
+        summary = summarize_window(store, start, end)
+        elapsed = time.perf_counter() - t0
+        print(f"{'Summary from 1h rollups':<40} {elapsed * 1000:9.1f} ms "
+              f"({sum(m['points'] for m in summary['metrics'].values())} records)")
+
+        t0 = time.perf_counter()
+        for metric in SUMMARY_METRICS:
+            store.query(metric, start, end, resolution='1m')
+        print(f"{'Same window from 1m rollups':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+        store.close()
+
+        archive = ReportArchive(os.path.join(tmp, 'reports'))
+        report = system_monitor.collect_health_report()
+        first = datetime.fromtimestamp(start)
+        t0 = time.perf_counter()
+        for i in range(days * reports_per_day):
+            when = first + timedelta(seconds=i * 86400 // reports_per_day)
+            report['timestamp'] = when.strftime('%Y-%m-%d %H:%M:%S')
+            archive.append(report, when)
+        count = days * reports_per_day
+        print(f"{'Archive ' + str(count) + ' reports':<40} {(time.perf_counter() - t0) * 1000 / count:9.3f} ms/report")
+
+        size = sum(os.path.getsize(os.path.join(archive.path, n)) for n in os.listdir(archive.path))
+        print(f"{'Archive size':<40} {size / 1024:9.1f} KB in {len(archive.days())} files "
+              f"({size / count:.0f} bytes/report)")
+        t0 = time.perf_counter()
+        read = sum(1 for _ in archive.reports(first, datetime.fromtimestamp(end)))
+        print(f"{'Read back ' + str(read) + ' reports':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+
+# Benchmark: cost of the monitor's self-instrumentation
+def bench_instrumentation(rounds=2000):
+    """
+    Time sampler ticks with instrumentation off, timing only (the
+    default) and timing plus syscall counts (--profile). The three take
+    turns tick by tick, so drift on the host affects them alike; each
+    overhead is the median of the per-round differences from "off",
+    with the middle half of those differences as its spread. Sections
+    per tick times the calibrated cost of a section bounds the overhead.
+    """
+    print("\n--- Self-Instrumentation Overhead ---")
+    configs = (("off", False, False), ("timing (default)", True, False),
+               ("timing + syscalls (--profile)", True, True))
+    samplers = []
+    for _label, enabled, syscalls in configs:
+        profiler = Profiler(enabled=enabled, count_syscalls=syscalls)
+        sampler = system_monitor.MetricsSampler(profiler=profiler)
+        sampler.sample()
+        samplers.append((profiler, sampler))
+
+    times = [[] for _ in configs]
+    for _ in range(rounds):
+        for samples, (_profiler, sampler) in zip(times, samplers):
+            t0 = time.perf_counter()
+            sampler.sample()
+            samples.append(time.perf_counter() - t0)
+
+    off = times[0]
+    for (label, enabled, _syscalls), (profiler, _sampler), samples in zip(configs, samplers, times):
+        extra = ""
+        if enabled:
+            deltas = sorted((t - base) * 1e6 for t, base in zip(samples, off))
+            low, mid, high = (deltas[len(deltas) * q // 4] for q in (1, 2, 3))
+            sections = sum(s['calls'] for s in profiler.stats().values()) / (rounds + 1)
+            per_section = profiler.calibrate()
+            extra = (f" | {mid:+.0f} us ({mid / (statistics.median(off) * 1e6) * 100:+.1f}%), "
+                     f"middle half {low:+.0f} to {high:+.0f} us | bound {sections:.0f} sections"
+                     f" x {per_section / 1000:.2f} us = {sections * per_section / 1000:.1f} us")
+        print(f"{label:<30} median {statistics.median(samples) * 1000:7.3f} ms{extra}")
+
+# Function to write a container-style cgroup tree for the benchmark
+def _write_cgroup_fixture(root, version):
+    """Return the path of a fake /proc/self/cgroup for a tree under `root`"""
+    if version == 2:
+        files = {
+            'cgroup.controllers': 'cpuset cpu io memory pids\n',
+            'app/cpu.max': '150000 100000\n',
+            'app/cpu.stat': 'usage_usec 8123456\nuser_usec 6000000\nsystem_usec 2123456\n'
+                            'nr_periods 5000\nnr_throttled 120\nthrottled_usec 912000\n',
+            'app/memory.current': '536870912\n',
+            'app/memory.max': '1073741824\n',
+            'app/memory.stat': ''.join(f'stat_{i} {i}\n' for i in range(30)) + 'inactive_file 67108864\n',
+            'app/io.stat': '8:0 rbytes=1048576 wbytes=4194304 rios=10 wios=40 dbytes=0 dios=0\n',
+            'app/cpu.pressure': 'some avg10=1.25 avg60=0.80 avg300=0.40 total=123456\n'
+                                'full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n',
+            'app/memory.pressure': 'some avg10=0.00 avg60=0.00 avg300=0.00 total=0\n'
+                                   'full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n',
+            'app/io.pressure': 'some avg10=0.50 avg60=0.10 avg300=0.00 total=4567\n'
+                               'full avg10=0.20 avg60=0.00 avg300=0.00 total=1234\n',
+        }
+        proc = '0::/app\n'
+    else:
+        files = {
+            'cpu/app/cpu.cfs_quota_us': '150000\n',
+            'cpu/app/cpu.cfs_period_us': '100000\n',
+            'cpu/app/cpu.stat': 'nr_periods 5000\nnr_throttled 120\nthrottled_time 912000000\n',
+            'cpuacct/app/cpuacct.usage': '8123456000\n',
+            'memory/app/memory.usage_in_bytes': '536870912\n',
+            'memory/app/memory.limit_in_bytes': '1073741824\n',
+            'memory/app/memory.stat': ''.join(f'stat_{i} {i}\n' for i in range(30))
+                                      + 'total_inactive_file 67108864\n',
+            'blkio/app/blkio.throttle.io_service_bytes': '8:0 Read 1048576\n8:0 Write 4194304\n'
+                                                         '8:0 Total 5242880\nTotal 5242880\n',
+        }
+        proc = '4:memory:/app\n3:blkio:/app\n2:cpu,cpuacct:/app\n1:name=systemd:/app\n'
+    for name, content in files.items():
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+    if version == 1:
+        os.makedirs(os.path.join(root, 'cpuacct'), exist_ok=True)
+    proc_path = os.path.join(root, 'proc_self_cgroup')
+    with open(proc_path, 'w') as f:
+        f.write(proc)
+    return proc_path
+
+# Benchmark: cgroup collection against the psutil host-wide calls
+def bench_cgroup(repeat=20000):
+    """
+    Time one container CPU+memory sample from fixture v1 and v2 trees,
+    reading through cached descriptors versus opening every file each
+    time, and compare with the psutil calls it replaces.
+    """
+    print("\n--- Container (cgroup) Collection ---")
+    for version in (2, 1):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = os.path.join(tmp, 'cgroup')
+            proc_path = _write_cgroup_fixture(root, version)
+            collector = CgroupCollector.detect(root, proc_path, host_memory=8 * 1024**3)
+            collector.sample()
+            _report(f"cgroup v{version}: cached fds (pread)", _timed(collector.sample, repeat))
+            paths = [os.path.join(dirpath, name) for dirpath, _dirs, names in os.walk(root)
+                     for name in names if name != 'proc_self_cgroup']
+
+            def reopen_all():
+                for path in paths:
+                    with open(path, 'rb') as f:
+                        f.read()
+            _report(f"cgroup v{version}: open/read/close per file", _timed(reopen_all, repeat))
+            collector.close()
+
+    live = CgroupCollector.detect(host_memory=psutil.virtual_memory().total)
+    if live is not None:
+        live.sample()
+        _report(f"This host (cgroup v{live.version})", _timed(live.sample, repeat))
+        live.close()
+
+    def host_wide():
+        psutil.cpu_times()
+        psutil.virtual_memory()
+    _report("psutil cpu_times + virtual_memory", _timed(host_wide, repeat))
+
+BENCHMARKS = {
+    'report': bench_health_report,
+    'store': bench_metrics_store,
+    'processes': bench_process_refresh,
+    'fleet': bench_fleet,
+    'alerts': bench_alert_rules,
+    'devices': bench_device_collection,
+    'anomalies': bench_anomaly_detection,
+    'exporter': bench_exporter,
+    'services': bench_service_watch,
+    'summary': bench_month_summary,
+    'instrumentation': bench_instrumentation,
+    'cgroup': bench_cgroup,
+}
+
+if __name__ == "__main__":
+    # Usage: python benchmarks.py [name ...]  (runs everything by default)
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
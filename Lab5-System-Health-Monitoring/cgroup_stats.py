@@ -0,0 +1,263 @@
+import os
+import time
+
+# Where the cgroup filesystem is mounted
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# v1 reports "no memory limit" as a huge page-aligned number
+_V1_UNLIMITED = 1 << 62
+
+# Open file re-read in place with pread (no open/close per sample)
+class _CachedFile:
+    __slots__ = ('fd',)
+
+    def __init__(self, path):
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self):
+        return os.pread(self.fd, 65536, 0)
+
+    def close(self):
+        os.close(self.fd)
+
+# Function to parse "key value" lines into a dict of ints
+def _key_values(data):
+    values = {}
+    for line in data.split(b'\n'):
+        parts = line.split()
+        if len(parts) == 2:
+            try:
+                values[parts[0]] = int(parts[1])
+            except ValueError:
+                pass
+    return values
+
+# Function to read avg10 of the "some" line from a PSI file
+def _pressure(data):
+    for line in data.split(b'\n'):
+        if line.startswith(b'some '):
+            for field in line.split()[1:]:
+                if field.startswith(b'avg10='):
+                    return float(field[6:])
+    return None
+
+# Function to find this process's cgroup directories
+def find_cgroup(root=CGROUP_ROOT, proc_cgroup='/proc/self/cgroup'):
+    """
+    Return (2, {'unified': dir}) for cgroup v2, (1, {controller: dir})
+    for v1, or None when there is no cgroup filesystem. Inside a
+    container the path in /proc/self/cgroup may not exist under the
+    mount (the container sees its own cgroup as the root), in which case
+    the mount root is used.
+    """
+    try:
+        with open(proc_cgroup, 'r') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+
+    def resolve(mount, path):
+        candidate = os.path.join(mount, path.lstrip('/'))
+        return candidate if os.path.isdir(candidate) else mount
+
+    paths = {}
+    for line in lines:
+        hierarchy, controllers, path = line.split(':', 2)
+        if hierarchy == '0' and controllers == '':
+            if os.path.exists(os.path.join(root, 'cgroup.controllers')):
+                return 2, {'unified': resolve(root, path)}
+            continue
+        for controller in controllers.split(','):
+            if controller in ('cpu', 'cpuacct', 'memory', 'blkio'):
+                mount = os.path.join(root, controller)
+                if os.path.isdir(mount):
+                    paths[controller] = resolve(mount, path)
+    return (1, paths) if paths else None
+
+# Container-aware CPU, memory and IO collector
+class CgroupCollector:
+    """
+    Reads CPU, memory, pressure (PSI) and IO for this process's cgroup,
+    so a container reports its own usage against its own limits rather
+    than the host's.
+
+    Works with cgroup v2 (unified) and v1 (per-controller) layouts. Every
+    file is opened once and re-read with os.pread; cgroup files generate
+    fresh contents on each read from offset 0. Files missing on this
+    kernel (e.g. PSI on v1) report None. Usage and IO are rates since the
+    previous sample.
+    """
+    V2_FILES = {
+        'cpu_max': 'cpu.max', 'cpu_stat': 'cpu.stat', 'memory_current': 'memory.current',
+        'memory_max': 'memory.max', 'memory_stat': 'memory.stat', 'io_stat': 'io.stat',
+        'cpu_pressure': 'cpu.pressure', 'memory_pressure': 'memory.pressure', 'io_pressure': 'io.pressure',
+    }
+    V1_FILES = {
+        'cpu_quota': ('cpu', 'cpu.cfs_quota_us'), 'cpu_period': ('cpu', 'cpu.cfs_period_us'),
+        'cpu_stat': ('cpu', 'cpu.stat'), 'cpu_usage': ('cpuacct', 'cpuacct.usage'),
+        'memory_current': ('memory', 'memory.usage_in_bytes'),
+        'memory_max': ('memory', 'memory.limit_in_bytes'), 'memory_stat': ('memory', 'memory.stat'),
+        'io_bytes': ('blkio', 'blkio.throttle.io_service_bytes'),
+    }
+
+    def __init__(self, version, paths, host_memory=None, cpus=None):
+        self.version = version
+        self.paths = paths
+        self.files = {}
+        if version == 2:
+            wanted = {key: os.path.join(paths['unified'], name) for key, name in self.V2_FILES.items()}
+        else:
+            wanted = {key: os.path.join(paths[controller], name)
+                      for key, (controller, name) in self.V1_FILES.items() if controller in paths}
+        for key, path in wanted.items():
+            try:
+                self.files[key] = _CachedFile(path)
+            except OSError:
+                pass
+        if cpus is None:
+            cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+        self.cpus = cpus
+        self.host_memory = host_memory
+        self._last = None
+
+    @classmethod
+    def detect(cls, root=CGROUP_ROOT, proc_cgroup='/proc/self/cgroup', **options):
+        """Return a collector for this process's cgroup, or None outside Linux cgroups"""
+        found = find_cgroup(root, proc_cgroup)
+        if found is None:
+            return None
+        return cls(*found, **options)
+
+    def _read(self, key):
+        handle = self.files.get(key)
+        return handle.read() if handle is not None else None
+
+    def read_counters(self):
+        """Raw counters: cpu_usage_ns, throttling, limits, memory, PSI, IO bytes"""
+        counters = {'quota_cores': None, 'memory_limit': None, 'cpu_usage_ns': None,
+                    'periods': None, 'throttled_periods': None, 'memory_current': None,
+                    'inactive_file': 0, 'io_read': None, 'io_write': None,
+                    'cpu_pressure': None, 'memory_pressure': None, 'io_pressure': None}
+
+        if self.version == 2:
+            data = self._read('cpu_max')
+            if data:
+                quota, period = data.split()
+                if quota != b'max':
+                    counters['quota_cores'] = int(quota) / int(period)
+            data = self._read('cpu_stat')
+            if data:
+                stat = _key_values(data)
+                counters['cpu_usage_ns'] = stat.get(b'usage_usec', 0) * 1000
+                counters['periods'] = stat.get(b'nr_periods')
+                counters['throttled_periods'] = stat.get(b'nr_throttled')
+            data = self._read('memory_max')
+            if data and data.strip() != b'max':
+                counters['memory_limit'] = int(data)
+            data = self._read('memory_stat')
+            if data:
+                counters['inactive_file'] = _key_values(data).get(b'inactive_file', 0)
+            data = self._read('io_stat')
+            if data is not None:
+                read = written = 0
+                for field in data.split():
+                    if field.startswith(b'rbytes='):
+                        read += int(field[7:])
+                    elif field.startswith(b'wbytes='):
+                        written += int(field[7:])
+                counters['io_read'], counters['io_write'] = read, written
+            for name in ('cpu_pressure', 'memory_pressure', 'io_pressure'):
+                data = self._read(name)
+                if data:
+                    counters[name] = _pressure(data)
+        else:
+            quota, period = self._read('cpu_quota'), self._read('cpu_period')
+            if quota and period and int(quota) > 0:
+                counters['quota_cores'] = int(quota) / int(period)
+            data = self._read('cpu_usage')
+            if data:
+                counters['cpu_usage_ns'] = int(data)
+            data = self._read('cpu_stat')
+            if data:
+                stat = _key_values(data)
+                counters['periods'] = stat.get(b'nr_periods')
+                counters['throttled_periods'] = stat.get(b'nr_throttled')
+            data = self._read('memory_max')
+            if data and int(data) < _V1_UNLIMITED:
+                counters['memory_limit'] = int(data)
+            data = self._read('memory_stat')
+            if data:
+                counters['inactive_file'] = _key_values(data).get(b'total_inactive_file', 0)
+            data = self._read('io_bytes')
+            if data is not None:
+                read = written = 0
+                for line in data.split(b'\n'):
+                    parts = line.split()
+                    if len(parts) == 3 and parts[1] == b'Read':
+                        read += int(parts[2])
+                    elif len(parts) == 3 and parts[1] == b'Write':
+                        written += int(parts[2])
+                counters['io_read'], counters['io_write'] = read, written
+
+        data = self._read('memory_current')
+        if data:
+            counters['memory_current'] = int(data)
+        return counters
+
+    def limited(self):
+        """True when this cgroup has a CPU quota or memory limit"""
+        counters = self.read_counters()
+        return counters['quota_cores'] is not None or counters['memory_limit'] is not None
+
+    def sample(self):
+        """
+        Return the cgroup's usage. CPU percent is relative to its quota
+        (or to the CPUs it may run on); memory used excludes reclaimable
+        page cache, as container runtimes report it.
+        """
+        now = time.monotonic_ns()
+        c = self.read_counters()
+        last, last_time = self._last if self._last else (None, now)
+        self._last = (c, now)
+        elapsed_ns = now - last_time
+
+        cores = c['quota_cores'] or self.cpus
+        cpu_percent = throttled_percent = read_rate = write_rate = None
+        if last is not None and elapsed_ns > 0:
+            if c['cpu_usage_ns'] is not None and last['cpu_usage_ns'] is not None:
+                used = c['cpu_usage_ns'] - last['cpu_usage_ns']
+                cpu_percent = round(min(max(100.0 * used / (elapsed_ns * cores), 0.0), 100.0), 1)
+            if c['periods'] is not None and last['periods'] is not None:
+                periods = c['periods'] - last['periods']
+                if periods > 0:
+                    throttled_percent = round(100.0 * (c['throttled_periods'] - last['throttled_periods']) / periods, 1)
+            if c['io_read'] is not None and last['io_read'] is not None:
+                read_rate = round((c['io_read'] - last['io_read']) * 1e9 / elapsed_ns, 1)
+                write_rate = round((c['io_write'] - last['io_write']) * 1e9 / elapsed_ns, 1)
+
+        limit = c['memory_limit'] or self.host_memory
+        used = None
+        if c['memory_current'] is not None:
+            used = max(0, c['memory_current'] - c['inactive_file'])
+
+        return {
+            'version': self.version,
+            'cpu_limit_cores': round(cores, 2),
+            'cpu_quota_set': c['quota_cores'] is not None,
+            'cpu_usage_percent': cpu_percent,
+            'cpu_throttled_percent': throttled_percent,
+            'memory_limit_gb': round(limit / (1024**3), 2) if limit else None,
+            'memory_limit_set': c['memory_limit'] is not None,
+            'memory_used_gb': round(used / (1024**3), 2) if used is not None else None,
+            'memory_usage_percent': round(100.0 * used / limit, 1) if used is not None and limit else None,
+            'cpu_pressure_avg10': c['cpu_pressure'],
+            'memory_pressure_avg10': c['memory_pressure'],
+            'io_pressure_avg10': c['io_pressure'],
+            'io_read_bytes_per_s': read_rate,
+            'io_write_bytes_per_s': write_rate
+        }
+
+    def close(self):
+        for handle in self.files.values():
+            handle.close()
+        self.files = {}
@@ -0,0 +1,147 @@
+import time
+
+import psutil
+
+# Re-enumerate mounted partitions at most this often (seconds)
+PARTITION_REFRESH = 60
+
+# Filesystems that never hold user data (plus overlay/squashfs, which
+# container runtimes and snaps mount by the hundred)
+PSEUDO_FILESYSTEMS = {
+    'autofs', 'binfmt_misc', 'bpf', 'cgroup', 'cgroup2', 'configfs', 'debugfs',
+    'devpts', 'devtmpfs', 'efivarfs', 'fusectl', 'hugetlbfs', 'mqueue', 'nsfs',
+    'fuse.gvfsd-fuse', 'fuse.lxcfs', 'fuse.portal', 'overlay', 'proc', 'pstore',
+    'ramfs', 'rpc_pipefs', 'securityfs', 'squashfs', 'sysfs', 'tmpfs', 'tracefs',
+}
+
+# Block devices left out of per-disk I/O (loopback and RAM disks)
+SKIP_DISK_PREFIXES = ('loop', 'ram', 'zram')
+
+# Function to turn two counter readings into a per-second rate
+def _rate(current, previous, elapsed):
+    if previous is None or elapsed <= 0 or current < previous:
+        return None
+    return round((current - previous) / elapsed, 1)
+
+# Per-mount, per-disk and per-interface collector
+class DeviceCollector:
+    """
+    Collects usage for every real mounted filesystem, I/O for every block
+    device and traffic for every network interface, with rates computed
+    from the previous call.
+
+    The partition list is slow to enumerate on hosts with many mounts, so
+    it is cached for PARTITION_REFRESH seconds (or until a mount
+    disappears); each call then costs one statvfs per mount plus one read
+    each of the disk and network counters. Rates are None until there is
+    a previous reading.
+    """
+    def __init__(self, partition_refresh=PARTITION_REFRESH):
+        self.partition_refresh = partition_refresh
+        self._partitions = None
+        self._partitions_at = 0.0
+        self._last = None
+
+    def partitions(self, now=None):
+        """Cached list of (mountpoint, device, fstype) for real filesystems"""
+        now = now if now is not None else time.monotonic()
+        if self._partitions is None or now - self._partitions_at >= self.partition_refresh:
+            seen = set()
+            partitions = []
+            for part in psutil.disk_partitions(all=True):
+                # The root filesystem is kept even when it is an overlay (containers)
+                if part.mountpoint != '/' and part.fstype in PSEUDO_FILESYSTEMS:
+                    continue
+                if part.device in seen:
+                    continue
+                # The same device mounted twice (bind mounts) is reported once
+                seen.add(part.device)
+                partitions.append((part.mountpoint, part.device, part.fstype))
+            self._partitions = partitions
+            self._partitions_at = now
+        return self._partitions
+
+    def _read(self):
+        disks = {}
+        for mountpoint, device, fstype in self.partitions():
+            try:
+                usage = psutil.disk_usage(mountpoint)
+            except OSError:
+                # Unmounted since the list was cached
+                self._partitions = None
+                continue
+            disks[mountpoint] = {
+                'device': device,
+                'fstype': fstype,
+                'total_gb': round(usage.total / (1024**3), 2),
+                'free_gb': round(usage.free / (1024**3), 2),
+                'usage_percent': usage.percent
+            }
+
+        io = psutil.disk_io_counters(perdisk=True) or {}
+        io = {name: counters for name, counters in io.items() if not name.startswith(SKIP_DISK_PREFIXES)}
+        # Per-disk counters include partitions and device-mapper volumes
+        # on top of their disks; the system-wide counters leave those out
+        io_total = psutil.disk_io_counters(perdisk=False)
+        nics = psutil.net_io_counters(pernic=True) or {}
+        return disks, io, io_total, nics
+
+    def collect(self):
+        """
+        Return {'disks': {mountpoint: ...}, 'disk_io': {disk: ...},
+        'disk_io_total': {...}, 'interfaces': {nic: ...}}. Use
+        disk_io_total for whole-system disk rates: adding up disk_io
+        counts partitions and volumes as well as their disks.
+        """
+        now = time.monotonic()
+        disks, io, io_total, nics = self._read()
+        last_io, last_total, last_nics, last_time = self._last if self._last else ({}, None, {}, now)
+        elapsed = now - last_time
+        self._last = (io, io_total, nics, now)
+
+        disk_io = {name: _disk_rates(c, last_io.get(name), elapsed) for name, c in io.items()}
+        disk_io_total = _disk_rates(io_total, last_total, elapsed) if io_total else {
+            field: None for field in ('read_bytes_per_s', 'write_bytes_per_s', 'read_iops', 'write_iops')}
+
+        interfaces = {}
+        for name, c in nics.items():
+            p = last_nics.get(name)
+            interfaces[name] = {
+                'sent_bytes_per_s': _rate(c.bytes_sent, p and p.bytes_sent, elapsed),
+                'recv_bytes_per_s': _rate(c.bytes_recv, p and p.bytes_recv, elapsed),
+                'packets_sent_per_s': _rate(c.packets_sent, p and p.packets_sent, elapsed),
+                'packets_recv_per_s': _rate(c.packets_recv, p and p.packets_recv, elapsed),
+                'errors_in_per_s': _rate(c.errin, p and p.errin, elapsed),
+                'errors_out_per_s': _rate(c.errout, p and p.errout, elapsed),
+                'errors_in': c.errin,
+                'errors_out': c.errout,
+                'drops_in': c.dropin,
+                'drops_out': c.dropout,
+                'bytes_sent': c.bytes_sent,
+                'bytes_recv': c.bytes_recv,
+                'packets_sent': c.packets_sent,
+                'packets_recv': c.packets_recv
+            }
+
+        return {'disks': disks, 'disk_io': disk_io, 'disk_io_total': disk_io_total, 'interfaces': interfaces}
+
+# Function to turn two readings of disk counters into rates
+def _disk_rates(c, p, elapsed):
+    return {
+        'read_bytes_per_s': _rate(c.read_bytes, p and p.read_bytes, elapsed),
+        'write_bytes_per_s': _rate(c.write_bytes, p and p.write_bytes, elapsed),
+        'read_iops': _rate(c.read_count, p and p.read_count, elapsed),
+        'write_iops': _rate(c.write_count, p and p.write_count, elapsed),
+        'read_bytes': c.read_bytes,
+        'write_bytes': c.write_bytes,
+        'read_count': c.read_count,
+        'write_count': c.write_count
+    }
+
+# Function to add up per-device rates (None while there is no baseline)
+def total_rates(devices, fields):
+    totals = {}
+    for field in fields:
+        values = [device[field] for device in devices.values() if device[field] is not None]
+        totals[field] = round(sum(values), 1) if values else None
+    return totals
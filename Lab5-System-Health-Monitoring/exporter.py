@@ -0,0 +1,172 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Default exporter port
+EXPORTER_PORT = 9276
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Single-value metrics: (name, type, help, snapshot section, key)
+SYSTEM_METRICS = (
+    ('system_cpu_usage_percent', 'gauge', "CPU usage across all cores", 'cpu', 'usage_percent'),
+    ('system_cpu_cores', 'gauge', "Logical CPU cores", 'cpu', 'cores'),
+    ('system_cpu_frequency_mhz', 'gauge', "Current CPU frequency", 'cpu', 'frequency_mhz'),
+    ('system_memory_usage_percent', 'gauge', "Memory in use", 'memory', 'usage_percent'),
+    ('system_memory_total_gigabytes', 'gauge', "Total memory", 'memory', 'total_gb'),
+    ('system_memory_available_gigabytes', 'gauge', "Available memory", 'memory', 'available_gb'),
+    ('system_memory_used_gigabytes', 'gauge', "Used memory", 'memory', 'used_gb'),
+    ('system_cgroup_cpu_limit_cores', 'gauge', "CPU cores the container may use", 'cgroup', 'cpu_limit_cores'),
+    ('system_cgroup_cpu_throttled_percent', 'gauge', "CFS periods in which the container was throttled", 'cgroup', 'cpu_throttled_percent'),
+    ('system_cgroup_cpu_pressure_percent', 'gauge', "Time some tasks waited for CPU (avg10)", 'cgroup', 'cpu_pressure_avg10'),
+    ('system_cgroup_memory_pressure_percent', 'gauge', "Time some tasks waited for memory (avg10)", 'cgroup', 'memory_pressure_avg10'),
+    ('system_cgroup_io_pressure_percent', 'gauge', "Time some tasks waited for IO (avg10)", 'cgroup', 'io_pressure_avg10'),
+    ('system_monitor_rss_megabytes', 'gauge', "Resident memory of the monitor itself", 'monitor', 'rss_mb'),
+    ('system_monitor_cpu_percent', 'gauge', "CPU used by the monitor itself", 'monitor', 'cpu_percent'),
+    ('system_monitor_sample_milliseconds', 'gauge', "Time taken by the last sample", 'monitor', 'sample_ms'),
+)
+
+# Per-device metrics: (name, type, help, snapshot section, label name, key)
+DEVICE_METRICS = (
+    ('system_filesystem_usage_percent', 'gauge', "Filesystem space in use", 'disks', 'mountpoint', 'usage_percent'),
+    ('system_filesystem_size_gigabytes', 'gauge', "Filesystem size", 'disks', 'mountpoint', 'total_gb'),
+    ('system_filesystem_free_gigabytes', 'gauge', "Filesystem free space", 'disks', 'mountpoint', 'free_gb'),
+    ('system_disk_read_bytes', 'counter', "Bytes read from disk", 'disk_io', 'disk', 'read_bytes'),
+    ('system_disk_written_bytes', 'counter', "Bytes written to disk", 'disk_io', 'disk', 'write_bytes'),
+    ('system_disk_reads', 'counter', "Completed disk reads", 'disk_io', 'disk', 'read_count'),
+    ('system_disk_writes', 'counter', "Completed disk writes", 'disk_io', 'disk', 'write_count'),
+    ('system_network_transmit_bytes', 'counter', "Bytes sent", 'interfaces', 'interface', 'bytes_sent'),
+    ('system_network_receive_bytes', 'counter', "Bytes received", 'interfaces', 'interface', 'bytes_recv'),
+    ('system_network_transmit_packets', 'counter', "Packets sent", 'interfaces', 'interface', 'packets_sent'),
+    ('system_network_receive_packets', 'counter', "Packets received", 'interfaces', 'interface', 'packets_recv'),
+    ('system_network_receive_errors', 'counter', "Receive errors", 'interfaces', 'interface', 'errors_in'),
+    ('system_network_transmit_errors', 'counter', "Transmit errors", 'interfaces', 'interface', 'errors_out'),
+    ('system_network_receive_drops', 'counter', "Dropped incoming packets", 'interfaces', 'interface', 'drops_in'),
+    ('system_network_transmit_drops', 'counter', "Dropped outgoing packets", 'interfaces', 'interface', 'drops_out'),
+    ('system_monitor_section_milliseconds', 'counter', "Time spent in each monitor section", 'collectors', 'section', 'total_ms'),
+    ('system_monitor_section_calls', 'counter', "Runs of each monitor section", 'collectors', 'section', 'calls'),
+)
+
+# Function to escape an OpenMetrics label value
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# Function to render one snapshot in OpenMetrics text format
+def render_openmetrics(snapshot, extra=()):
+    """
+    Return the exposition text for a snapshot. `extra` adds
+    (name, type, help, value) families such as exporter counters.
+    """
+    lines = []
+
+    def family(name, kind, text, samples):
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"# HELP {name} {text}")
+        suffix = '_total' if kind == 'counter' else ''
+        for labels, value in samples:
+            lines.append(f"{name}{suffix}{labels} {value}")
+
+    for name, kind, text, section, key in SYSTEM_METRICS:
+        value = snapshot.get(section, {}).get(key)
+        if isinstance(value, (int, float)):
+            family(name, kind, text, [('', value)])
+
+    for name, kind, text, section, label, key in DEVICE_METRICS:
+        samples = []
+        for device, values in snapshot.get(section, {}).items():
+            value = values.get(key)
+            if value is None:
+                continue
+            labels = f'{label}="{_label(device)}"'
+            if section == 'disks':
+                labels += f',device="{_label(values["device"])}",fstype="{_label(values["fstype"])}"'
+            samples.append((f"{{{labels}}}", value))
+        if samples:
+            family(name, kind, text, samples)
+
+    family('system_snapshot_timestamp_seconds', 'gauge', "When the served sample was taken",
+           [('', round(snapshot['timestamp'], 3))])
+    for name, kind, text, value in extra:
+        family(name, kind, text, [('', value)])
+
+    lines.append("# EOF")
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+# Prometheus/OpenMetrics exporter
+class MetricsExporter:
+    """
+    Serves /metrics from the background sampler's latest snapshot.
+
+    A scrape never collects anything itself. The body (and its gzip
+    version) is rendered once per new snapshot and reused by every scrape
+    until the sampler publishes the next one, so concurrent scrapers cost
+    little more than a dictionary lookup and a socket write.
+    """
+    def __init__(self, get_snapshot, cache=True):
+        self.get_snapshot = get_snapshot
+        self.cache = cache
+        self.scrapes = 0
+        self.renders = 0
+        self._lock = threading.Lock()
+        self._rendered = (None, b'', b'')
+
+    def body(self, compressed=False):
+        """Return the (possibly cached) exposition body for the latest snapshot"""
+        snapshot = self.get_snapshot()
+        with self._lock:
+            self.scrapes += 1
+            source, plain, packed = self._rendered
+            if source is snapshot and self.cache:
+                return packed if compressed else plain
+            self.renders += 1
+            extra = (('system_exporter_renders', 'counter', "Times the body was rendered", self.renders),)
+        plain = render_openmetrics(snapshot, extra)
+        packed = gzip.compress(plain, compresslevel=5)
+        with self._lock:
+            self._rendered = (snapshot, plain, packed)
+        return packed if compressed else plain
+
+    def make_server(self, host='0.0.0.0', port=EXPORTER_PORT):
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are separate writes; without TCP_NODELAY a
+            # keep-alive scrape waits ~40 ms on delayed ACKs
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    content = b'<html><body><a href="/metrics">Metrics</a></body></html>\n'
+                    self._send(404 if self.path != '/' else 200, 'text/html', content)
+                    return
+                compressed = 'gzip' in self.headers.get('Accept-Encoding', '')
+                self._send(200, CONTENT_TYPE, exporter.body(compressed), compressed)
+
+            def _send(self, status, content_type, content, compressed=False):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(content)))
+                if compressed:
+                    self.send_header('Content-Encoding', 'gzip')
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        return server
+
+# Function to run the exporter until Ctrl+C
+def run_exporter(get_snapshot, host='0.0.0.0', port=EXPORTER_PORT):
+    exporter = MetricsExporter(get_snapshot)
+    server = exporter.make_server(host, port)
+    print(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nExporter stopped ({exporter.scrapes} scrapes, {exporter.renders} renders).")
+    finally:
+        server.server_close()
@@ -0,0 +1,245 @@
+import asyncio
+import json
+import socket
+import time
+from collections import deque
+
+# Default collector port
+COLLECTOR_PORT = 9275
+
+# Values every agent sends, in this order, after the timestamp
+FLEET_FIELDS = (
+    'cpu.usage_percent',
+    'memory.usage_percent',
+    'disk.usage_percent',
+    'network.bytes_sent_mb',
+    'network.bytes_received_mb',
+)
+
+# Fleet alert thresholds (same defaults as monitor_with_alerts)
+FLEET_THRESHOLDS = {
+    'cpu.usage_percent': 80,
+    'memory.usage_percent': 85,
+    'disk.usage_percent': 90,
+}
+
+# Agent buffers at most this many samples while the collector is unreachable
+AGENT_BUFFER = 10000
+
+def _clock():
+    return time.strftime('%H:%M:%S')
+
+# Function to take one compact sample using the monitor's collectors
+def collect_sample():
+    """
+    Return [timestamp, value, ...] in FLEET_FIELDS order
+    """
+    from system_monitor import get_cpu_info, get_memory_info, get_disk_info, get_network_info
+
+    cpu = get_cpu_info()
+    memory = get_memory_info()
+    disk = get_disk_info()
+    network = get_network_info()
+    return [round(time.time(), 3), cpu['usage_percent'], memory['usage_percent'],
+            disk['usage_percent'], network['bytes_sent_mb'], network['bytes_received_mb']]
+
+# Function to encode a batch as one newline-terminated JSON line
+def encode_batch(agent, samples):
+    return (json.dumps({'agent': agent, 'fields': FLEET_FIELDS, 'samples': samples},
+                       separators=(',', ':')) + '\n').encode()
+
+# Agent mode
+def run_agent(collector_host, collector_port=COLLECTOR_PORT, interval=5, batch_size=12,
+              name=None, max_batches=None):
+    """
+    Sample every `interval` seconds and ship batches of `batch_size`
+    samples to the collector. Samples are kept (up to AGENT_BUFFER) while
+    the collector is unreachable and sent once it comes back.
+    """
+    name = name or socket.gethostname()
+    pending = deque(maxlen=AGENT_BUFFER)
+    sock = None
+    retry_at = 0
+    sent = 0
+
+    print(f"Agent '{name}' sending to {collector_host}:{collector_port} "
+          f"(every {interval}s, {batch_size} samples per batch)")
+
+    try:
+        while max_batches is None or sent < max_batches:
+            pending.append(collect_sample())
+
+            if len(pending) >= batch_size and time.time() >= retry_at:
+                try:
+                    if sock is None:
+                        sock = socket.create_connection((collector_host, collector_port), timeout=10)
+                    sock.sendall(encode_batch(name, list(pending)))
+                    pending.clear()
+                    sent += 1
+                    retry_at = 0
+                except OSError as e:
+                    print(f"WARNING: collector unavailable ({str(e)}), {len(pending)} samples buffered")
+                    if sock is not None:
+                        sock.close()
+                    sock = None
+                    retry_at = time.time() + min(60, interval * 4)
+
+            time.sleep(interval)
+
+    except KeyboardInterrupt:
+        print("\nAgent stopped.")
+    finally:
+        if sock is not None:
+            sock.close()
+
+# Per-agent state kept by the collector
+class AgentState:
+    __slots__ = ('name', 'address', 'latest', 'last_seen', 'samples', 'alerts')
+
+    def __init__(self, name, address):
+        self.name = name
+        self.address = address
+        self.latest = None
+        self.last_seen = 0.0
+        self.samples = 0
+        self.alerts = set()
+
+# Collector mode
+class FleetCollector:
+    """
+    Asyncio collector that ingests batches from many agents at once.
+
+    Each connection sends newline-delimited JSON batches. The collector
+    keeps the latest sample per agent, fleet-wide aggregates and the set
+    of firing alerts; an alert is reported once when it starts and once
+    when it clears. Sending {"stats": true} returns the collector stats.
+    """
+    def __init__(self, thresholds=None, stale_after=60, on_alert=None):
+        self.thresholds = thresholds if thresholds is not None else FLEET_THRESHOLDS
+        self.stale_after = stale_after
+        self.on_alert = on_alert or self._print_alert
+        self.agents = {}
+        self.samples = 0
+        self.batches = 0
+        self.started = time.time()
+        self._checks = [(FLEET_FIELDS.index(field) + 1, field, limit)
+                        for field, limit in self.thresholds.items() if field in FLEET_FIELDS]
+
+    @staticmethod
+    def _print_alert(agent, field, value, firing):
+        state = "ALERT" if firing else "CLEARED"
+        print(f"[{_clock()}] {state}: {agent} {field} = {value}")
+
+    def ingest(self, batch, address=None):
+        """Apply one decoded batch; raises ValueError (before changing anything) if it's malformed"""
+        name = batch.get('agent')
+        samples = batch.get('samples')
+        if not isinstance(name, str) or not isinstance(samples, list):
+            raise ValueError("batch needs an agent name and a list of samples")
+        if samples:
+            # Only the newest sample is kept, and stats/alerts index into it
+            latest = samples[-1]
+            if not isinstance(latest, list) or len(latest) != len(FLEET_FIELDS) + 1 or \
+                    not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in latest):
+                raise ValueError(f"sample needs a timestamp and {len(FLEET_FIELDS)} numbers")
+
+        agent = self.agents.get(name)
+        if agent is None:
+            agent = self.agents[name] = AgentState(name, address)
+
+        if not samples:
+            return
+        self.samples += len(samples)
+        self.batches += 1
+        agent.samples += len(samples)
+        agent.latest = samples[-1]
+        agent.last_seen = time.time()
+
+        # Alerts are evaluated on the newest sample of each batch
+        latest = samples[-1]
+        for index, field, limit in self._checks:
+            value = latest[index]
+            firing = value > limit
+            if firing != (field in agent.alerts):
+                if firing:
+                    agent.alerts.add(field)
+                else:
+                    agent.alerts.discard(field)
+                self.on_alert(name, field, value, firing)
+
+    def stats(self):
+        """Fleet aggregates and ingest counters"""
+        now = time.time()
+        live = [a for a in self.agents.values() if a.latest and now - a.last_seen <= self.stale_after]
+        elapsed = now - self.started
+        fleet = {}
+        for position, field in enumerate(FLEET_FIELDS, 1):
+            values = [a.latest[position] for a in live]
+            if values:
+                fleet[field] = {'avg': round(sum(values) / len(values), 2), 'max': max(values)}
+        return {
+            'agents': len(self.agents),
+            'live_agents': len(live),
+            'stale_agents': len(self.agents) - len(live),
+            'samples': self.samples,
+            'batches': self.batches,
+            'ingest_rate': round(self.samples / elapsed, 1) if elapsed > 0 else 0.0,
+            'alerting_agents': sum(1 for a in self.agents.values() if a.alerts),
+            'fleet': fleet
+        }
+
+    async def _handle(self, reader, writer):
+        address = writer.get_extra_info('peername')
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than the stream limit; the reader has dropped it
+                    continue
+                if not line:
+                    break
+                # A bad message is skipped; the agent's next batch still counts
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(message, dict):
+                    continue
+                if message.get('stats'):
+                    writer.write((json.dumps(self.stats()) + '\n').encode())
+                    await writer.drain()
+                elif 'agent' in message:
+                    try:
+                        self.ingest(message, address)
+                    except ValueError:
+                        continue
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='0.0.0.0', port=COLLECTOR_PORT, report_every=30):
+        server = await asyncio.start_server(self._handle, host, port, limit=2 ** 22)
+        print(f"Collector listening on {host}:{port}")
+        async with server:
+            while True:
+                await asyncio.sleep(report_every)
+                print_fleet_summary(self.stats())
+
+# Function to print fleet stats
+def print_fleet_summary(stats):
+    print(f"\n[{_clock()}] Agents: {stats['live_agents']} live, {stats['stale_agents']} stale | "
+          f"Samples: {stats['samples']} ({stats['ingest_rate']}/s) | "
+          f"Alerting: {stats['alerting_agents']}")
+    for field, agg in stats['fleet'].items():
+        print(f"  {field:<28} avg {agg['avg']:>8}  max {agg['max']:>8}")
+
+# Function to run the collector until Ctrl+C
+def run_collector(host='0.0.0.0', port=COLLECTOR_PORT, report_every=30):
+    collector = FleetCollector()
+    try:
+        asyncio.run(collector.serve(host, port, report_every))
+    except KeyboardInterrupt:
+        print("\nCollector stopped.")
+        print_fleet_summary(collector.stats())
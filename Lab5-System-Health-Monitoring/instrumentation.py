@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+
+import psutil
+
+# Per-process syscall counters (Linux only)
+_PROC_IO = '/proc/self/io'
+
+# Reads syscall counts from /proc/self/io through one cached descriptor
+class SyscallCounter:
+    """
+    Linux counts read-type (syscr) and write-type (syscw) syscalls per
+    process. The file is opened once and re-read with os.pread, which is
+    itself one read syscall; that cost is measured at start-up and
+    subtracted. Counts cover every thread in the process, so a section
+    running alongside other busy threads is over-counted.
+    """
+    def __init__(self):
+        self.fd = os.open(_PROC_IO, os.O_RDONLY)
+        first = self.read()
+        self.cost = self.read() - first
+
+    def read(self):
+        total = 0
+        for line in os.pread(self.fd, 512, 0).split(b'\n'):
+            if line.startswith((b'syscr:', b'syscw:')):
+                total += int(line.split()[1])
+        return total
+
+    def close(self):
+        os.close(self.fd)
+
+# Accumulated cost of one instrumented section
+class SectionStats:
+    __slots__ = ('calls', 'total_ns', 'max_ns', 'syscalls')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.syscalls = None
+
+class _Section:
+    __slots__ = ('profiler', 'name', 'start', 'syscalls')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        counter = self.profiler._syscalls
+        self.syscalls = counter.read() if counter else 0
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self.start
+        counter = self.profiler._syscalls
+        syscalls = counter.read() - self.syscalls - counter.cost if counter else None
+        self.profiler.record(self.name, elapsed, syscalls)
+        return False
+
+class _Disabled:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_DISABLED = _Disabled()
+
+# Self-instrumentation for the monitor
+class Profiler:
+    """
+    Times named sections of the monitor (one per collector) and tracks
+    the monitor's own RSS and CPU.
+
+    Timing a section costs two perf_counter_ns calls and a dict update.
+    Syscall counting (Linux, off by default) adds two reads of
+    /proc/self/io per section. Both costs are measured by calibrate() so
+    the reported times can be read against them.
+    """
+    def __init__(self, enabled=True, count_syscalls=False):
+        self.enabled = enabled
+        self.sections = {}
+        self.overhead_ns = 0
+        self._lock = threading.Lock()
+        self._syscalls = None
+        self._process = psutil.Process()
+        self._last_cpu = {}
+        if count_syscalls:
+            self.enable_syscalls()
+
+    def enable_syscalls(self):
+        """Start counting syscalls per section (returns False where unsupported)"""
+        if self._syscalls is None:
+            try:
+                self._syscalls = SyscallCounter()
+            except OSError:
+                return False
+        return True
+
+    def section(self, name):
+        """Context manager timing one run of section `name`"""
+        return _Section(self, name) if self.enabled else _DISABLED
+
+    def wrap(self, func, name):
+        """Return `func` timed as section `name`"""
+        def timed(*args, **kwargs):
+            with self.section(name):
+                return func(*args, **kwargs)
+        return timed
+
+    def record(self, name, elapsed_ns, syscalls=None):
+        with self._lock:
+            stats = self.sections.get(name)
+            if stats is None:
+                stats = self.sections[name] = SectionStats()
+            stats.calls += 1
+            stats.total_ns += elapsed_ns
+            if elapsed_ns > stats.max_ns:
+                stats.max_ns = elapsed_ns
+            if syscalls is not None:
+                stats.syscalls = (stats.syscalls or 0) + syscalls
+
+    def calibrate(self, rounds=2000):
+        """Measure the cost of one empty section in ns (kept in overhead_ns)"""
+        probe = Profiler(enabled=True)
+        probe._syscalls = self._syscalls
+        start = time.perf_counter_ns()
+        for _ in range(rounds):
+            with probe.section('calibrate'):
+                pass
+        self.overhead_ns = (time.perf_counter_ns() - start) // rounds
+        return self.overhead_ns
+
+    def stats(self):
+        """{section: {'calls', 'avg_ms', 'max_ms', 'total_ms', 'syscalls_per_call'}}"""
+        with self._lock:
+            items = list(self.sections.items())
+        result = {}
+        for name, s in items:
+            result[name] = {
+                'calls': s.calls,
+                'avg_ms': round(s.total_ns / s.calls / 1e6, 3),
+                'max_ms': round(s.max_ns / 1e6, 3),
+                'total_ms': round(s.total_ns / 1e6, 1),
+                'syscalls_per_call': None if s.syscalls is None else round(s.syscalls / s.calls, 1)
+            }
+        return result
+
+    def self_usage(self, reader='sampler'):
+        """
+        The monitor's own RSS (MB), CPU percent since `reader`'s last call
+        and threads. Each reader keeps its own starting point, so a profile
+        printed from another thread doesn't cut the sampler's interval short.
+        """
+        now = time.monotonic()
+        times = os.times()
+        cpu = times.user + times.system
+        with self._lock:
+            last = self._last_cpu.get(reader)
+            self._last_cpu[reader] = (cpu, now)
+        cpu_percent = None
+        if last is not None:
+            elapsed = now - last[1]
+            if elapsed > 0:
+                cpu_percent = round(100.0 * (cpu - last[0]) / elapsed, 2)
+        try:
+            rss = self._process.memory_info().rss
+        except psutil.Error:
+            rss = 0
+        return {
+            'rss_mb': round(rss / (1024**2), 1),
+            'cpu_percent': cpu_percent,
+            'threads': threading.active_count()
+        }
+
+# Function to print a profile summary
+def print_profile(profiler):
+    stats = profiler.stats()
+    usage = profiler.self_usage('profile')
+    print("\n" + "="*60)
+    print("MONITOR PROFILE")
+    print("="*60)
+    print(f"{'Section':<20} {'Calls':>7} {'Avg ms':>9} {'Max ms':>9} {'Total ms':>10} {'Syscalls':>9}")
+    for name, s in sorted(stats.items(), key=lambda item: -item[1]['total_ms']):
+        syscalls = '-' if s['syscalls_per_call'] is None else s['syscalls_per_call']
+        print(f"{name[:20]:<20} {s['calls']:>7} {s['avg_ms']:>9} {s['max_ms']:>9} "
+              f"{s['total_ms']:>10} {syscalls:>9}")
+    print("-"*60)
+    print(f"Instrumentation overhead: {profiler.overhead_ns / 1000:.2f} us per section")
+    times = os.times()
+    uptime = time.time() - profiler._process.create_time()
+    average_cpu = 100.0 * (times.user + times.system) / uptime if uptime > 0 else 0.0
+    print(f"Monitor RSS: {usage['rss_mb']} MB | Average CPU: {average_cpu:.2f}% | Threads: {usage['threads']}")
+    print("="*60)
@@ -0,0 +1,188 @@
+import os
+import re
+import struct
+import threading
+import time
+
+# Default directory for stored metrics
+METRICS_DIR = "metrics_data"
+
+# Record layouts (little-endian, fixed width):
+#   raw    - uint32 timestamp, float32 value               (8 bytes)
+#   rollup - uint32 timestamp, float32 avg, min, max       (16 bytes)
+RAW_RECORD = struct.Struct('<If')
+ROLLUP_RECORD = struct.Struct('<Ifff')
+
+# Resolutions: name -> (bucket seconds, segment seconds, retention seconds)
+# With these defaults each metric needs at most ~2.2 MB on disk.
+RESOLUTIONS = {
+    'raw': (1, 3600, 2 * 86400),
+    '1m': (60, 86400, 30 * 86400),
+    '1h': (3600, 30 * 86400, 400 * 86400),
+}
+
+_SAFE_NAME = re.compile(r'[^A-Za-z0-9_.-]')
+
+# Running min/max/sum for one rollup bucket
+class _Bucket:
+    __slots__ = ('start', 'count', 'total', 'low', 'high')
+
+    def __init__(self, start):
+        self.start = start
+        self.count = 0
+        self.total = 0.0
+        self.low = float('inf')
+        self.high = float('-inf')
+
+    def add(self, avg, low, high, count=1):
+        self.count += count
+        self.total += avg * count
+        if low < self.low:
+            self.low = low
+        if high > self.high:
+            self.high = high
+
+# On-disk metrics time series with rollups
+class MetricsStore:
+    """
+    Append-only time-series store for monitor metrics.
+
+    Each metric gets a directory per resolution holding fixed-width binary
+    segment files named after the segment start time. Raw 1-second samples
+    roll up incrementally into 1-minute and 1-hour averages (with min/max)
+    as buckets close, and whole segments past their retention are deleted
+    when a new segment is opened, so disk use stays bounded.
+
+    Appends are constant time: one packed record written to an open file.
+    Partially filled rollup buckets live in memory and are lost on restart.
+    """
+    def __init__(self, path=METRICS_DIR, resolutions=None):
+        self.path = path
+        self.resolutions = resolutions or RESOLUTIONS
+        self._lock = threading.Lock()
+        self._files = {}
+        self._buckets = {}
+        os.makedirs(path, exist_ok=True)
+
+    def _dir(self, metric, resolution):
+        return os.path.join(self.path, _SAFE_NAME.sub('_', metric), resolution)
+
+    def _write(self, metric, resolution, ts, record):
+        """Append one packed record, rotating segments as needed"""
+        _bucket, span, _retention = self.resolutions[resolution]
+        segment = ts - ts % span
+        key = (metric, resolution)
+        current = self._files.get(key)
+
+        if current is None or current[0] != segment:
+            if current is not None:
+                current[1].close()
+            directory = self._dir(metric, resolution)
+            os.makedirs(directory, exist_ok=True)
+            handle = open(os.path.join(directory, f"{segment}.seg"), 'ab')
+            self._files[key] = current = (segment, handle)
+            self._expire(directory, resolution, ts)
+
+        current[1].write(record)
+
+    def _expire(self, directory, resolution, now):
+        """Delete segments that ended before the retention window"""
+        _bucket, span, retention = self.resolutions[resolution]
+        cutoff = now - retention
+        for name in os.listdir(directory):
+            if name.endswith('.seg') and int(name[:-4]) + span <= cutoff:
+                os.remove(os.path.join(directory, name))
+
+    def _roll_up(self, metric, resolution, ts, avg, low, high, count):
+        """Feed a value into the bucket for `resolution`, closing it when due"""
+        width = self.resolutions[resolution][0]
+        start = ts - ts % width
+        key = (metric, resolution)
+        bucket = self._buckets.get(key)
+
+        if bucket is not None and bucket.start != start:
+            if bucket.count:
+                bucket_avg = bucket.total / bucket.count
+                self._write(metric, resolution, bucket.start,
+                            ROLLUP_RECORD.pack(bucket.start, bucket_avg, bucket.low, bucket.high))
+                if resolution == '1m':
+                    self._roll_up(metric, '1h', bucket.start, bucket_avg,
+                                  bucket.low, bucket.high, bucket.count)
+            bucket = None
+
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(start)
+        bucket.add(avg, low, high, count)
+
+    def append(self, metric, value, ts=None):
+        """Append one sample for a metric (timestamp defaults to now)"""
+        ts = int(ts if ts is not None else time.time())
+        value = float(value)
+        with self._lock:
+            self._write(metric, 'raw', ts, RAW_RECORD.pack(ts, value))
+            self._roll_up(metric, '1m', ts, value, value, value, 1)
+
+    def append_sample(self, values, ts=None):
+        """Append a dict of metric -> value sharing one timestamp"""
+        ts = int(ts if ts is not None else time.time())
+        for metric, value in values.items():
+            self.append(metric, value, ts)
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            for _segment, handle in self._files.values():
+                handle.flush()
+
+    def close(self):
+        with self._lock:
+            for _segment, handle in self._files.values():
+                handle.close()
+            self._files = {}
+
+    def metrics(self):
+        """List stored metric names"""
+        return sorted(os.listdir(self.path)) if os.path.isdir(self.path) else []
+
+    def pick_resolution(self, start, end):
+        """Choose a resolution for a query: raw up to 6 hours, 1m up to a week"""
+        age = time.time() - start
+        span = end - start
+        if span <= 6 * 3600 and age <= self.resolutions['raw'][2]:
+            return 'raw'
+        if span <= 7 * 86400 and age <= self.resolutions['1m'][2]:
+            return '1m'
+        return '1h'
+
+    def query(self, metric, start, end=None, resolution=None):
+        """
+        Return (timestamp, avg, min, max) tuples for start <= ts < end.
+
+        Raw samples report the value as avg, min and max. Only segment files
+        overlapping the range are opened.
+        """
+        end = end if end is not None else time.time() + 1
+        resolution = resolution or self.pick_resolution(start, end)
+        _bucket, span, _retention = self.resolutions[resolution]
+        directory = self._dir(metric, resolution)
+        if not os.path.isdir(directory):
+            return []
+
+        self.flush()
+        segments = sorted(int(name[:-4]) for name in os.listdir(directory) if name.endswith('.seg'))
+        record = RAW_RECORD if resolution == 'raw' else ROLLUP_RECORD
+        rows = []
+
+        for segment in segments:
+            if segment + span <= start or segment >= end:
+                continue
+            with open(os.path.join(directory, f"{segment}.seg"), 'rb') as f:
+                data = f.read()
+            data = data[:len(data) - len(data) % record.size]
+            for values in record.iter_unpack(data):
+                if start <= values[0] < end:
+                    if resolution == 'raw':
+                        rows.append((values[0], values[1], values[1], values[1]))
+                    else:
+                        rows.append(values)
+        return rows
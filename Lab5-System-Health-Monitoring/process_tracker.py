@@ -0,0 +1,102 @@
+import heapq
+
+import psutil
+
+# How each supported field is read from a psutil.Process (inside oneshot())
+FIELD_READERS = {
+    'name': lambda p: p.name(),
+    'username': lambda p: p.username(),
+    'status': lambda p: p.status(),
+    'cpu_percent': lambda p: p.cpu_percent(interval=None),
+    'memory_percent': lambda p: round(p.memory_percent(), 2),
+    'memory_rss_mb': lambda p: round(p.memory_info().rss / (1024**2), 1),
+    'num_threads': lambda p: p.num_threads(),
+    'cmdline': lambda p: ' '.join(p.cmdline()),
+}
+DEFAULT_FIELDS = ('name', 'cpu_percent', 'memory_percent')
+
+# Persistent process table refreshed incrementally
+class ProcessTracker:
+    """
+    Keeps a pid -> psutil.Process cache across refreshes.
+
+    Reusing the same Process objects is what makes cpu_percent meaningful:
+    psutil reports usage since the previous call on that object, so a
+    fresh object (as process_iter creates) always starts at 0.0. Only the
+    requested fields are read, all inside one oneshot() block per process.
+    A pid whose create time changed has been reused by a new process and
+    gets a fresh cache entry.
+    """
+    def __init__(self, fields=DEFAULT_FIELDS):
+        unknown = set(fields) - set(FIELD_READERS)
+        if unknown:
+            raise ValueError(f"Unknown process fields: {', '.join(sorted(unknown))}")
+        self.fields = tuple(fields)
+        self._readers = [(field, FIELD_READERS[field]) for field in self.fields]
+        self._procs = {}
+        self.rows = []
+        self.refreshes = 0
+
+    def _track(self, pid):
+        try:
+            proc = psutil.Process(pid)
+            created = proc.create_time()
+            if 'cpu_percent' in self.fields:
+                proc.cpu_percent(interval=None)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return None
+        self._procs[pid] = (proc, created)
+        return proc, created
+
+    def refresh(self):
+        """Re-read every process and return the rows (one dict per process)"""
+        pids = psutil.pids()
+        live = set(pids)
+
+        for pid in [pid for pid in self._procs if pid not in live]:
+            del self._procs[pid]
+
+        rows = []
+        for pid in pids:
+            entry = self._procs.get(pid)
+            is_new = entry is None
+            if is_new:
+                entry = self._track(pid)
+                if entry is None:
+                    continue
+            proc, created = entry
+            # A cached Process keeps its own create time; is_running()
+            # compares it with a fresh one, so a reused pid shows up here
+            if not is_new and not proc.is_running():
+                is_new = True
+                entry = self._track(pid)
+                if entry is None:
+                    continue
+                proc, created = entry
+            row = {'pid': pid}
+            try:
+                with proc.oneshot():
+                    for field, reader in self._readers:
+                        try:
+                            row[field] = reader(proc)
+                        except psutil.AccessDenied:
+                            row[field] = None
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                self._procs.pop(pid, None)
+                continue
+            # First sample of a new process has no CPU baseline yet
+            if is_new and 'cpu_percent' in row:
+                row['cpu_percent'] = None
+            rows.append(row)
+
+        self.rows = rows
+        self.refreshes += 1
+        return rows
+
+    def top(self, n=20, key='cpu_percent', refresh=True):
+        """Return the n processes with the largest `key` using heapq"""
+        rows = self.refresh() if refresh else self.rows
+        return heapq.nlargest(n, rows, key=lambda row: row.get(key) or 0)
+
+    def __len__(self):
+        return len(self._procs)
@@ -0,0 +1,218 @@
+import gzip
+import json
+import os
+import time
+import zlib
+from datetime import datetime, timedelta
+
+# Default directory for archived health reports
+REPORTS_DIR = "health_reports"
+
+# Default schedule: every 15 minutes
+REPORT_SCHEDULE = "*/15 * * * *"
+
+# Metrics included in window summaries when none are given
+SUMMARY_METRICS = (
+    'cpu.usage_percent',
+    'memory.usage_percent',
+    'disk.usage_percent',
+    'disk.read_bytes_per_s',
+    'disk.write_bytes_per_s',
+    'network.sent_bytes_per_s',
+    'network.recv_bytes_per_s',
+)
+
+_FIELDS = (('minute', 0, 59), ('hour', 0, 23), ('day', 1, 31), ('month', 1, 12), ('weekday', 0, 7))
+
+# Function to parse one cron field into the set of allowed values
+def _parse_field(text, low, high):
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step = part.split('/', 1)
+            step = int(step)
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = (int(v) for v in part.split('-', 1))
+        else:
+            start = end = int(part)
+            if step != 1:
+                end = high
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"Out of range: {text!r} (allowed {low}-{high})")
+        values.update(range(start, end + 1, step))
+    return values
+
+# Cron-style schedule
+class Schedule:
+    """
+    Five-field cron schedule: minute hour day-of-month month day-of-week
+    (0 = Sunday). Supports *, lists, ranges and steps, e.g. "*/15 * * * *"
+    or "0 8-18 * * 1-5". As in cron, when both day fields are restricted
+    a time matches if either one does.
+    """
+    def __init__(self, expression=REPORT_SCHEDULE):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Invalid schedule {expression!r}: expected 5 fields")
+        self.expression = expression
+        fields = {}
+        for text, (name, low, high) in zip(parts, _FIELDS):
+            fields[name] = _parse_field(text, low, high)
+        self.minutes = fields['minute']
+        self.hours = fields['hour']
+        self.days = fields['day']
+        self.months = fields['month']
+        # 7 is Sunday too
+        self.weekdays = {day % 7 for day in fields['weekday']}
+        self._any_day = parts[2] == '*'
+        self._any_weekday = parts[4] == '*'
+
+    def _day_matches(self, when):
+        day_ok = when.day in self.days
+        weekday_ok = (when.weekday() + 1) % 7 in self.weekdays
+        if self._any_day:
+            return weekday_ok
+        if self._any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_run(self, after=None):
+        """Return the first matching minute strictly after `after` (a datetime)"""
+        when = (after or datetime.now()).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = when + timedelta(days=366 * 5)
+        while when < limit:
+            if when.month not in self.months:
+                when = (when.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(when):
+                when = when.replace(hour=0, minute=0) + timedelta(days=1)
+            elif when.hour not in self.hours:
+                when = when.replace(minute=0) + timedelta(hours=1)
+            elif when.minute not in self.minutes:
+                when += timedelta(minutes=1)
+            else:
+                return when
+        raise ValueError(f"Schedule {self.expression!r} never runs")
+
+# Compressed daily archive of health reports
+class ReportArchive:
+    """
+    Appends reports as JSON lines to one gzip file per day
+    (health_YYYYMMDD.jsonl.gz). Each append adds a small gzip member, so
+    a crash never corrupts earlier reports and gzip readers see one
+    continuous file.
+    """
+    def __init__(self, path=REPORTS_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, day):
+        return os.path.join(self.path, f"health_{day.strftime('%Y%m%d')}.jsonl.gz")
+
+    def append(self, report, when=None):
+        """Add a report; returns the archive file it went into"""
+        when = when or datetime.now()
+        filename = self._file(when)
+        with gzip.open(filename, 'ab', compresslevel=6) as f:
+            f.write((json.dumps(report, separators=(',', ':')) + '\n').encode('utf-8'))
+        return filename
+
+    def days(self):
+        """Archived days, oldest first (files not named by date are skipped)"""
+        days = []
+        for name in os.listdir(self.path):
+            if name.startswith('health_') and name.endswith('.jsonl.gz'):
+                try:
+                    days.append(datetime.strptime(name[7:-9], '%Y%m%d'))
+                except ValueError:
+                    continue
+        return sorted(days)
+
+    def reports(self, start, end):
+        """
+        Yield archived reports with start <= report timestamp < end
+        (datetimes). Lines that aren't reports are skipped, and a file cut
+        short by a crash mid-write yields the reports before the damage.
+        """
+        for day in self.days():
+            if day + timedelta(days=1) <= start.replace(hour=0, minute=0, second=0, microsecond=0) or day >= end:
+                continue
+            try:
+                with gzip.open(self._file(day), 'rt', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            report = json.loads(line)
+                            stamp = datetime.strptime(report['timestamp'], '%Y-%m-%d %H:%M:%S')
+                        except (ValueError, KeyError, TypeError):
+                            continue
+                        if start <= stamp < end:
+                            yield report
+            except (OSError, EOFError, ValueError, zlib.error):
+                continue
+
+# Function to summarize stored metrics over a time window
+def summarize_window(store, start, end, metrics=SUMMARY_METRICS):
+    """
+    Build a summary for start <= t < end (epoch seconds) from the metrics
+    store. Long windows read the 1-hour rollups, so a month is about 720
+    records per metric. Each metric reports avg, min, max and the 95th
+    percentile of its rollup averages.
+    """
+    resolution = store.pick_resolution(start, end)
+    summary = {
+        'start': datetime.fromtimestamp(start).strftime('%Y-%m-%d %H:%M:%S'),
+        'end': datetime.fromtimestamp(end).strftime('%Y-%m-%d %H:%M:%S'),
+        'resolution': resolution,
+        'metrics': {}
+    }
+    for metric in metrics:
+        rows = store.query(metric, start, end, resolution=resolution)
+        if not rows:
+            continue
+        averages = sorted(r[1] for r in rows)
+        summary['metrics'][metric] = {
+            'avg': round(sum(averages) / len(averages), 2),
+            'min': round(min(r[2] for r in rows), 2),
+            'max': round(max(r[3] for r in rows), 2),
+            'p95': round(averages[min(len(averages) - 1, int(len(averages) * 0.95))], 2),
+            'points': len(rows)
+        }
+    return summary
+
+# Function to print a window summary
+def print_summary(summary):
+    print("\n" + "="*60)
+    print(f"HEALTH SUMMARY: {summary['start']} to {summary['end']}")
+    print(f"(from {summary['resolution']} data)")
+    print("="*60)
+    if not summary['metrics']:
+        print("  No stored metrics in this window.")
+    else:
+        print(f"{'Metric':<28} {'Avg':>9} {'P95':>9} {'Min':>9} {'Max':>9}")
+        for metric, values in summary['metrics'].items():
+            print(f"{metric[:28]:<28} {values['avg']:>9} {values['p95']:>9} "
+                  f"{values['min']:>9} {values['max']:>9}")
+    if 'reports' in summary:
+        print(f"\nArchived reports: {summary['reports']} "
+              f"({summary['reports_with_issues']} with issues)")
+    print("="*60)
+
+# Function to run scheduled reports until Ctrl+C
+def run_scheduler(collect_report, schedule, archive, max_runs=None):
+    """
+    Call `collect_report()` at every scheduled minute and archive the
+    result. Never prompts, so it can run as a service or under nohup.
+    """
+    runs = 0
+    print(f"Writing health reports to {archive.path}/ on schedule '{schedule.expression}'")
+    try:
+        while max_runs is None or runs < max_runs:
+            due = schedule.next_run()
+            time.sleep(max(0.0, (due - datetime.now()).total_seconds()))
+            filename = archive.append(collect_report())
+            runs += 1
+            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Report archived to {filename}")
+    except KeyboardInterrupt:
+        print(f"\nScheduler stopped after {runs} reports.")
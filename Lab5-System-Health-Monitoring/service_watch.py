@@ -0,0 +1,316 @@
+import json
+import os
+import re
+import socket
+import time
+import urllib.error
+import urllib.request
+
+import psutil
+
+# Default services file (JSON list of services)
+SERVICES_FILE = "services.json"
+
+# Seconds between liveness probes of the same service
+PROBE_INTERVAL = 30
+
+# Live process index updated from start/exit deltas
+class ProcessIndex:
+    """
+    Keeps pid -> name and name -> pids for every process.
+
+    Each refresh lists the pids once and only reads the name (and the
+    command line, when cmdline patterns are registered) of processes that
+    started since the last refresh; exited pids are dropped. Lookups are
+    then dictionary reads. A pid reused between two refreshes is not
+    noticed by refresh(), which pid allocation makes unlikely within a few
+    seconds; current() re-checks one pid against its recorded start time.
+    """
+    def __init__(self):
+        self.procs = {}
+        self.created = {}
+        self.by_name = {}
+        self.patterns = {}
+        self.pattern_pids = {}
+        self._pid_patterns = {}
+        self.refreshes = 0
+
+    def add_pattern(self, key, pattern):
+        """Track processes whose command line matches `pattern` under `key`"""
+        needs_cmdlines = not self.patterns
+        self.patterns[key] = re.compile(pattern)
+        self.pattern_pids[key] = set()
+        if needs_cmdlines:
+            for pid, (name, _cmdline) in list(self.procs.items()):
+                self.procs[pid] = (name, self._read_cmdline(pid))
+        for pid, (_name, cmdline) in self.procs.items():
+            if cmdline and self.patterns[key].search(cmdline):
+                self.pattern_pids[key].add(pid)
+                self._pid_patterns.setdefault(pid, []).append(key)
+
+    @staticmethod
+    def _read_cmdline(pid):
+        try:
+            return ' '.join(psutil.Process(pid).cmdline())
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return ''
+
+    def _add(self, pid):
+        # Each field on its own: a process whose command line can't be
+        # read must still be found by name
+        try:
+            proc = psutil.Process(pid)
+            try:
+                created = proc.create_time()
+            except psutil.AccessDenied:
+                created = None
+            try:
+                name = proc.name().lower()
+            except psutil.AccessDenied:
+                name = ''
+            try:
+                cmdline = ' '.join(proc.cmdline()) if self.patterns else None
+            except psutil.AccessDenied:
+                cmdline = None
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            return False
+        self.procs[pid] = (name, cmdline)
+        self.created[pid] = created
+        self.by_name.setdefault(name, set()).add(pid)
+        if cmdline:
+            for key, regex in self.patterns.items():
+                if regex.search(cmdline):
+                    self.pattern_pids[key].add(pid)
+                    self._pid_patterns.setdefault(pid, []).append(key)
+        return True
+
+    def _remove(self, pid):
+        name, _cmdline = self.procs.pop(pid)
+        self.created.pop(pid, None)
+        pids = self.by_name.get(name)
+        if pids is not None:
+            pids.discard(pid)
+            if not pids:
+                del self.by_name[name]
+        for key in self._pid_patterns.pop(pid, ()):
+            self.pattern_pids[key].discard(pid)
+
+    def refresh(self):
+        """Apply process starts and exits; return (started, exited)"""
+        live = set(psutil.pids())
+        exited = [pid for pid in self.procs if pid not in live]
+        for pid in exited:
+            self._remove(pid)
+        started = 0
+        for pid in live.difference(self.procs):
+            if self._add(pid):
+                started += 1
+        self.refreshes += 1
+        return started, len(exited)
+
+    def current(self, pid):
+        """
+        Re-check one indexed pid, re-indexing it if it now belongs to a
+        different process. Returns (name, start time) or None if the pid
+        isn't running.
+        """
+        if pid not in self.procs:
+            return None
+        try:
+            created = psutil.Process(pid).create_time()
+        except psutil.AccessDenied:
+            created = self.created[pid]
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            self._remove(pid)
+            return None
+        if created != self.created[pid]:
+            self._remove(pid)
+            if not self._add(pid):
+                return None
+        return self.procs[pid][0], self.created[pid]
+
+    def pids_for_name(self, name):
+        return self.by_name.get(name.lower(), set())
+
+    def __len__(self):
+        return len(self.procs)
+
+# Function to check a TCP port accepts connections
+def probe_tcp(address, timeout=3):
+    """Return (ok, latency_ms, error) for 'host:port'"""
+    host, _, port = address.rpartition(':')
+    start = time.perf_counter()
+    try:
+        with socket.create_connection((host or 'localhost', int(port)), timeout=timeout):
+            pass
+    except (OSError, ValueError) as e:
+        return False, None, str(e)
+    return True, round((time.perf_counter() - start) * 1000, 1), None
+
+# Function to check a URL answers without an error status
+def probe_http(url, timeout=3):
+    """Return (ok, latency_ms, error); any status below 400 counts as up"""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read(1024)
+    except urllib.error.HTTPError as e:
+        return False, None, f"HTTP {e.code}"
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        return False, None, str(getattr(e, 'reason', e))
+    return True, round((time.perf_counter() - start) * 1000, 1), None
+
+# One watched service and its last known state
+class WatchedService:
+    """
+    A service from the services file:
+
+    name          - display name
+    process       - match processes by name (e.g. "nginx", "sshd.exe")
+    cmdline       - or match a regex against the full command line
+    pidfile       - or read the pid from a file (with `process` too, the
+                    pid must also have that name)
+    min_processes - processes required to count as running (default 1)
+    tcp           - optional "host:port" that must accept connections
+    http          - optional URL that must answer with status < 400
+    timeout       - probe timeout in seconds (default 3)
+    """
+    def __init__(self, spec):
+        self.name = spec['name']
+        self.process = spec.get('process')
+        self.cmdline = spec.get('cmdline')
+        self.pidfile = spec.get('pidfile')
+        if not (self.process or self.cmdline or self.pidfile):
+            raise ValueError(f"Service {self.name}: needs 'process', 'cmdline' or 'pidfile'")
+        self.min_processes = spec.get('min_processes', 1)
+        self.tcp = spec.get('tcp')
+        self.http = spec.get('http')
+        self.timeout = spec.get('timeout', 3)
+        self.probe = None
+        self.probed_at = 0.0
+        self.healthy = None
+
+    def pids(self, index):
+        if self.pidfile:
+            try:
+                with open(self.pidfile, 'r') as f:
+                    # Only the first line: e.g. postmaster.pid has more after it
+                    pid = int(f.readline().strip())
+                written = os.path.getmtime(self.pidfile)
+            except (OSError, ValueError):
+                return set()
+            proc = index.current(pid)
+            if proc is None:
+                return set()
+            # After a crash the pid may belong to another process: the
+            # service's own process started before its pidfile was written
+            name, created = proc
+            if created is not None and created > written + 1:
+                return set()
+            if self.process and name != self.process.lower():
+                return set()
+            return {pid}
+        if self.cmdline:
+            return index.pattern_pids[self.name]
+        return index.pids_for_name(self.process)
+
+    def run_probe(self):
+        if self.tcp:
+            ok, latency, error = probe_tcp(self.tcp, self.timeout)
+        else:
+            ok, latency, error = probe_http(self.http, self.timeout)
+        self.probe = {'ok': ok, 'latency_ms': latency, 'error': error}
+        self.probed_at = time.monotonic()
+
+# Continuous watcher for many services
+class ServiceWatcher:
+    """
+    Checks every service against the shared ProcessIndex each cycle and
+    runs due liveness probes concurrently. Each status reports whether
+    the service's health changed since the previous check.
+    """
+    def __init__(self, services, index=None, probe_interval=PROBE_INTERVAL, probe_workers=32):
+        self.services = [s if isinstance(s, WatchedService) else WatchedService(s) for s in services]
+        names = [s.name for s in self.services]
+        if len(names) != len(set(names)):
+            raise ValueError("Service names must be unique")
+        self.index = index or ProcessIndex()
+        self.probe_interval = probe_interval
+        self.probe_workers = probe_workers
+        for service in self.services:
+            if service.cmdline:
+                self.index.add_pattern(service.name, service.cmdline)
+
+    @classmethod
+    def load(cls, path=SERVICES_FILE, **options):
+        with open(path, 'r') as f:
+            return cls(json.load(f), **options)
+
+    def _probe_due(self, probe):
+        now = time.monotonic()
+        due = [s for s in self.services
+               if (s.tcp or s.http) and (probe == 'all' or now - s.probed_at >= self.probe_interval)]
+        if not due:
+            return
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(self.probe_workers, len(due))) as pool:
+            list(pool.map(WatchedService.run_probe, due))
+
+    def check(self, probe=True):
+        """
+        Refresh the index and return one status dict per service.
+        probe: True (probes that are due), 'all', or False (skip probes)
+        """
+        self.index.refresh()
+        if probe:
+            self._probe_due(probe)
+
+        statuses = []
+        for service in self.services:
+            pids = service.pids(self.index)
+            running = len(pids) >= service.min_processes
+            probe_ok = service.probe['ok'] if service.probe else None
+            healthy = running and probe_ok is not False
+            changed = service.healthy is not None and healthy != service.healthy
+            service.healthy = healthy
+            statuses.append({
+                'service': service.name,
+                'running': running,
+                'processes': len(pids),
+                'probe': service.probe,
+                'healthy': healthy,
+                'changed': changed
+            })
+        return statuses
+
+# Function to print service statuses
+def print_service_status(statuses):
+    print(f"{'Service':<28} {'Status':<12} {'Procs':>6}  Probe")
+    print("-" * 60)
+    for status in statuses:
+        state = "HEALTHY" if status['healthy'] else ("RUNNING" if status['running'] else "NOT RUNNING")
+        probe = status['probe']
+        if probe is None:
+            detail = "-"
+        elif probe['ok']:
+            detail = f"ok ({probe['latency_ms']} ms)"
+        else:
+            detail = f"FAILED ({probe['error']})"
+        print(f"{status['service'][:28]:<28} {state:<12} {status['processes']:>6}  {detail}")
+
+# Function to watch services until Ctrl+C
+def watch_services(watcher, interval=10):
+    statuses = watcher.check(probe='all')
+    print_service_status(statuses)
+    healthy = sum(1 for s in statuses if s['healthy'])
+    print(f"\nWatching {len(statuses)} services ({healthy} healthy), checking every {interval}s...")
+    try:
+        while True:
+            time.sleep(interval)
+            for status in watcher.check():
+                if status['changed']:
+                    state = "RECOVERED" if status['healthy'] else "DOWN"
+                    print(f"[{time.strftime('%H:%M:%S')}] {state}: {status['service']} "
+                          f"({status['processes']} processes)")
+    except KeyboardInterrupt:
+        print("\nStopped watching services.")
@@ -1,65 +1,358 @@
 import psutil
+import threading
 import time
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 import platform
+import os
+from metrics_store import MetricsStore, METRICS_DIR
+from process_tracker import ProcessTracker
+from device_stats import DeviceCollector, total_rates
+from alert_engine import AlertEngine, ALERT_RULES_FILE, threshold_rules
+from anomaly_detector import AnomalyDetector
+from service_watch import ProcessIndex
+from instrumentation import Profiler, print_profile
+from cgroup_stats import CgroupCollector
+
+# Seconds between background samples
+SAMPLE_INTERVAL = 1.0
+
+# Record every sample to the metrics history while the monitor is running
+RECORD_HISTORY = True
+
+# Cumulative counters left out of the history: the store's 32-bit floats
+# lose precision as they grow and their rollup averages mean nothing.
+# Their per-second rates (network.sent_bytes_per_s, ...) are kept instead.
+HISTORY_SKIP = frozenset((
+    'network.bytes_sent_mb',
+    'network.bytes_received_mb',
+    'network.packets_sent',
+    'network.packets_received',
+    'network.errors_in',
+    'network.errors_out',
+))
+
+# Metrics watched for anomalies (unusual compared to their own history)
+ANOMALY_METRICS = (
+    'cpu.usage_percent',
+    'memory.usage_percent',
+    'disk.usage_percent',
+    'disk.read_bytes_per_s',
+    'disk.write_bytes_per_s',
+    'network.sent_bytes_per_s',
+    'network.recv_bytes_per_s',
+)
+
+# Report the container's (cgroup's) CPU and memory instead of the host's:
+# 'auto' when running under a CPU quota or memory limit, 'on' or 'off'
+CGROUP_MODE = 'auto'
+
+# Times each collector and tracks the monitor's own RSS/CPU
+profiler = Profiler()
+
+# Function to read CPU busy/total time (seconds) from psutil
+def _cpu_times():
+    t = psutil.cpu_times()
+    total = sum(t)
+    # guest time is already counted in user time on Linux
+    total -= getattr(t, 'guest', 0) + getattr(t, 'guest_nice', 0)
+    idle = t.idle + getattr(t, 'iowait', 0)
+    return total - idle, total
+
+# Function to open the cgroup collector for this process
+def _open_cgroup(mode=CGROUP_MODE):
+    """
+    Return a CgroupCollector, or None to use host-wide psutil metrics
+    (mode 'off', no cgroup filesystem, or 'auto' without any limits)
+    """
+    if mode == 'off':
+        return None
+    try:
+        collector = CgroupCollector.detect(host_memory=psutil.virtual_memory().total)
+        if collector is not None and mode == 'auto' and not collector.limited():
+            collector.close()
+            return None
+    except (OSError, ValueError):
+        return None
+    return collector
+
+# Background sampler shared by every collector
+class MetricsSampler:
+    """
+    Samples CPU, memory, disk and network in one pass per tick on a
+    background thread and keeps the latest snapshot.
+
+    CPU usage is computed from the change in CPU times between ticks, so
+    no caller ever blocks on psutil.cpu_percent(interval=1); readers get
+    the most recent snapshot immediately. Disk and network throughput
+    (per mount, disk and interface, plus totals) are rates over the same
+    ticks.
+
+    Inside a container with CPU or memory limits, CPU and memory come
+    from the cgroup instead, measured against those limits.
+    """
+    def __init__(self, interval=SAMPLE_INTERVAL, profiler=profiler, cgroup=CGROUP_MODE):
+        self.interval = interval
+        self.profiler = profiler
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+        self._snapshot = None
+        self._last_cpu = None
+        self._cpu_count = psutil.cpu_count(logical=True)
+        self._devices = DeviceCollector()
+        self._cgroup = _open_cgroup(cgroup)
+        self._device_lock = threading.Lock()
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        """Call `callback(snapshot)` on the sampler thread after every tick"""
+        self._subscribers.append(callback)
+
+    def is_subscribed(self, callback):
+        return callback in self._subscribers
+
+    def start(self):
+        """Start the sampling thread (no-op if already running)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._last_cpu = _cpu_times()
+            if self._cgroup is not None:
+                self._cgroup.sample()
+            with self._device_lock:
+                self._devices.collect()
+            self._thread = threading.Thread(target=self._run, name='metrics-sampler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the sampling thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        # First tick comes quickly so callers aren't kept waiting
+        if self._stop.wait(min(self.interval, 0.1)):
+            return
+        while True:
+            snapshot = self.sample()
+            for callback in self._subscribers:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    print(f"\nWARNING: sampler callback failed - {str(e)}")
+            if self._stop.wait(self.interval):
+                return
+
+    def sample(self):
+        """Collect every metric once and publish the snapshot"""
+        section = self.profiler.section
+        started = time.perf_counter()
+
+        cgroup = None
+        cpu_info = None
+        memory_info = None
+        if self._cgroup is not None:
+            with section('cgroup'):
+                with self._lock:
+                    cgroup = self._cgroup.sample()
+            used = cgroup['memory_used_gb'] or 0.0
+            if cgroup['cpu_usage_percent'] is not None:
+                cpu_freq = psutil.cpu_freq()
+                cpu_info = {
+                    'usage_percent': cgroup['cpu_usage_percent'],
+                    'cores': cgroup['cpu_limit_cores'],
+                    'frequency_mhz': cpu_freq.current if cpu_freq else 'N/A',
+                    'source': f"cgroup v{cgroup['version']}"
+                }
+            if cgroup['memory_usage_percent'] is not None:
+                memory_info = {
+                    'total_gb': cgroup['memory_limit_gb'],
+                    'available_gb': round(max(cgroup['memory_limit_gb'] - used, 0.0), 2),
+                    'used_gb': used,
+                    'usage_percent': cgroup['memory_usage_percent'],
+                    'source': f"cgroup v{cgroup['version']}"
+                }
+        # The host's figures where the cgroup has none: its CPU usage needs
+        # two readings, and cgroup v1 may lack cpuacct or a memory controller
+        if cpu_info is None:
+            with section('cpu'):
+                with self._lock:
+                    busy, total = _cpu_times()
+                    if self._last_cpu is None:
+                        cpu_percent = 0.0
+                    else:
+                        last_busy, last_total = self._last_cpu
+                        elapsed = total - last_total
+                        cpu_percent = round(100.0 * (busy - last_busy) / elapsed, 1) if elapsed > 0 else 0.0
+                        cpu_percent = min(max(0.0, cpu_percent), 100.0)
+                    self._last_cpu = (busy, total)
+                cpu_freq = psutil.cpu_freq()
+            cpu_info = {
+                'usage_percent': cpu_percent,
+                'cores': self._cpu_count,
+                'frequency_mhz': cpu_freq.current if cpu_freq else 'N/A',
+                'source': 'host'
+            }
+        if memory_info is None:
+            with section('memory'):
+                memory = psutil.virtual_memory()
+            memory_info = {
+                'total_gb': round(memory.total / (1024**3), 2),
+                'available_gb': round(memory.available / (1024**3), 2),
+                'used_gb': round(memory.used / (1024**3), 2),
+                'usage_percent': memory.percent,
+                'source': 'host'
+            }
+
+        with section('disk'):
+            disk = psutil.disk_usage('/')
+        with section('network'):
+            net_io = psutil.net_io_counters()
+        with section('devices'):
+            with self._device_lock:
+                devices = self._devices.collect()
+        # System-wide counters: adding up disk_io would count partitions too
+        disk_rates = {field: devices['disk_io_total'][field] for field in ('read_bytes_per_s', 'write_bytes_per_s',
+                                                                            'read_iops', 'write_iops')}
+        net_rates = total_rates(devices['interfaces'], ('sent_bytes_per_s', 'recv_bytes_per_s',
+                                                        'packets_sent_per_s', 'packets_recv_per_s',
+                                                        'errors_in_per_s', 'errors_out_per_s'))
+
+        snapshot = {
+            'timestamp': time.time(),
+            'cpu': cpu_info,
+            'memory': memory_info,
+            'disk': {
+                'total_gb': round(disk.total / (1024**3), 2),
+                'used_gb': round(disk.used / (1024**3), 2),
+                'free_gb': round(disk.free / (1024**3), 2),
+                'usage_percent': disk.percent,
+                **disk_rates
+            },
+            'network': {
+                'bytes_sent_mb': round(net_io.bytes_sent / (1024**2), 2),
+                'bytes_received_mb': round(net_io.bytes_recv / (1024**2), 2),
+                'packets_sent': net_io.packets_sent,
+                'packets_received': net_io.packets_recv,
+                'errors_in': net_io.errin,
+                'errors_out': net_io.errout,
+                **net_rates
+            },
+            'disks': devices['disks'],
+            'disk_io': devices['disk_io'],
+            'interfaces': devices['interfaces']
+        }
+        if cgroup is not None:
+            snapshot['cgroup'] = cgroup
+
+        # The monitor's own cost, as metrics like any other
+        with section('self'):
+            snapshot['monitor'] = self.profiler.self_usage()
+        snapshot['monitor']['sample_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        self.profiler.record('sample', int((time.perf_counter() - started) * 1e9))
+        snapshot['collectors'] = self.profiler.stats()
+
+        with self._lock:
+            self._snapshot = snapshot
+        self._ready.set()
+        return snapshot
+
+    def latest(self):
+        """Return the most recent snapshot, starting the sampler if needed"""
+        if self._snapshot is None:
+            self.start()
+            if not self._ready.wait(self.interval + 1):
+                return self.sample()
+        with self._lock:
+            return self._snapshot
+
+sampler = MetricsSampler()
+
+# Metrics history (opened on first use)
+_metrics_store = None
+
+# Process table kept between views (created on first use)
+_process_tracker = None
+
+# Process name index kept between service checks (created on first use)
+_process_index = None
+
+# Function to get the shared metrics history store
+def get_metrics_store():
+    """Open the metrics store on first use"""
+    global _metrics_store
+    if _metrics_store is None:
+        _metrics_store = MetricsStore(METRICS_DIR)
+    return _metrics_store
+
+# Function to flatten a snapshot into metric name -> number
+def flatten_snapshot(snapshot):
+    """
+    Turn a snapshot into {'cpu.usage_percent': 12.5, ...} for storage
+    """
+    values = {}
+    for section, metrics in snapshot.items():
+        if not isinstance(metrics, dict):
+            continue
+        for name, value in metrics.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                values[f"{section}.{name}"] = value
+    return values
+
+# Function to write a snapshot to the metrics history
+def record_snapshot(snapshot):
+    values = {name: value for name, value in flatten_snapshot(snapshot).items() if name not in HISTORY_SKIP}
+    get_metrics_store().append_sample(values, snapshot['timestamp'])
+
+# Function to get one consistent snapshot of every metric
+def get_snapshot():
+    """
+    Get the latest CPU, memory, disk and network sample
+    """
+    return sampler.latest()
 
 # Function to get CPU information
 def get_cpu_info():
     """
     Get CPU usage information
     """
-    cpu_percent = psutil.cpu_percent(interval=1)
-    cpu_count = psutil.cpu_count(logical=True)
-    cpu_freq = psutil.cpu_freq()
-    
-    return {
-        'usage_percent': cpu_percent,
-        'cores': cpu_count,
-        'frequency_mhz': cpu_freq.current if cpu_freq else 'N/A'
-    }
+    return get_snapshot()['cpu']
 
 # Function to get memory information
 def get_memory_info():
     """
     Get RAM usage information
     """
-    memory = psutil.virtual_memory()
-    
-    return {
-        'total_gb': round(memory.total / (1024**3), 2),
-        'available_gb': round(memory.available / (1024**3), 2),
-        'used_gb': round(memory.used / (1024**3), 2),
-        'usage_percent': memory.percent
-    }
+    return get_snapshot()['memory']
 
 # Function to get disk information
 def get_disk_info():
     """
     Get disk usage information
     """
-    disk = psutil.disk_usage('/')
-    
-    return {
-        'total_gb': round(disk.total / (1024**3), 2),
-        'used_gb': round(disk.used / (1024**3), 2),
-        'free_gb': round(disk.free / (1024**3), 2),
-        'usage_percent': disk.percent
-    }
+    return get_snapshot()['disk']
 
 # Function to get network information
 def get_network_info():
     """
     Get network statistics
     """
-    net_io = psutil.net_io_counters()
-    
-    return {
-        'bytes_sent_mb': round(net_io.bytes_sent / (1024**2), 2),
-        'bytes_received_mb': round(net_io.bytes_recv / (1024**2), 2),
-        'packets_sent': net_io.packets_sent,
-        'packets_received': net_io.packets_recv
-    }
+    return get_snapshot()['network']
+
+# Function to format a bytes/second rate
+def format_rate(bytes_per_s):
+    if bytes_per_s is None:
+        return "N/A"
+    for unit in ('B/s', 'KB/s', 'MB/s'):
+        if bytes_per_s < 1024:
+            return f"{bytes_per_s:.1f} {unit}"
+        bytes_per_s /= 1024
+    return f"{bytes_per_s:.1f} GB/s"
 
 # Function to display current system status
 def show_system_status():
@@ -81,6 +374,13 @@ def show_system_status():
     print(f"  Cores: {cpu['cores']}")
     print(f"  Frequency: {cpu['frequency_mhz']} MHz")
     
+    cgroup = get_snapshot().get('cgroup')
+    if cgroup:
+        limit = f"{cgroup['cpu_limit_cores']} cores" if cgroup['cpu_quota_set'] else "no quota"
+        throttled = cgroup['cpu_throttled_percent']
+        print(f"  Container limit: {limit} ({cpu['source']})")
+        print(f"  Throttled: {'N/A' if throttled is None else str(throttled) + '% of periods'}")
+    
     # Memory Info
     print("\nMEMORY:")
     print("-" * 60)
@@ -89,6 +389,16 @@ def show_system_status():
     print(f"  Used: {memory['used_gb']} GB")
     print(f"  Available: {memory['available_gb']} GB")
     print(f"  Usage: {memory['usage_percent']}%")
+    if cgroup:
+        if memory['source'] == 'host':
+            limit = "no container memory figures, host total"
+        else:
+            limit = "container limit" if cgroup['memory_limit_set'] else "no container limit, host total"
+        print(f"  Source: {memory['source']} ({limit})")
+        pressure = [f"{name} {cgroup[name + '_pressure_avg10']}%" for name in ('cpu', 'memory', 'io')
+                    if cgroup[name + '_pressure_avg10'] is not None]
+        if pressure:
+            print(f"  Pressure (avg10): {', '.join(pressure)}")
     
     # Disk Info
     print("\nDISK:")
@@ -98,45 +408,75 @@ def show_system_status():
     print(f"  Used: {disk['used_gb']} GB")
     print(f"  Free: {disk['free_gb']} GB")
     print(f"  Usage: {disk['usage_percent']}%")
+    print(f"  Read: {format_rate(disk['read_bytes_per_s'])} ({disk['read_iops']} IOPS)")
+    print(f"  Write: {format_rate(disk['write_bytes_per_s'])} ({disk['write_iops']} IOPS)")
+    
+    snapshot = get_snapshot()
+    if len(snapshot['disks']) > 1:
+        print(f"\n  {'Mount':<28} {'Type':<8} {'Size GB':>9} {'Free GB':>9} {'Used':>6}")
+        for mountpoint, mount in snapshot['disks'].items():
+            print(f"  {mountpoint[:28]:<28} {mount['fstype'][:8]:<8} {mount['total_gb']:>9} "
+                  f"{mount['free_gb']:>9} {mount['usage_percent']:>5}%")
     
     # Network Info
     print("\nNETWORK:")
     print("-" * 60)
     network = get_network_info()
-    print(f"  Sent: {network['bytes_sent_mb']} MB")
-    print(f"  Received: {network['bytes_received_mb']} MB")
+    print(f"  Sent: {network['bytes_sent_mb']} MB ({format_rate(network['sent_bytes_per_s'])})")
+    print(f"  Received: {network['bytes_received_mb']} MB ({format_rate(network['recv_bytes_per_s'])})")
     print(f"  Packets Sent: {network['packets_sent']}")
     print(f"  Packets Received: {network['packets_received']}")
+    print(f"  Errors: {network['errors_in']} in, {network['errors_out']} out")
+    
+    print(f"\n  {'Interface':<16} {'Sent':>14} {'Received':>14} {'Errors':>8} {'Drops':>8}")
+    for name, nic in snapshot['interfaces'].items():
+        print(f"  {name[:16]:<16} {format_rate(nic['sent_bytes_per_s']):>14} "
+              f"{format_rate(nic['recv_bytes_per_s']):>14} "
+              f"{nic['errors_in'] + nic['errors_out']:>8} {nic['drops_in'] + nic['drops_out']:>8}")
     
     print("\n" + "="*60)
     
 # Function to monitor with alerts
 def monitor_with_alerts():
     """
-    Continuously monitor system and alert on thresholds
+    Continuously monitor system and alert on rules from alert_rules.json
+    (or the CPU/memory/disk thresholds when there is no rules file)
     """
     print("\n--- System Monitoring with Alerts ---")
     print("Press Ctrl+C to stop monitoring\n")
     
-    # Default thresholds
-    cpu_threshold = 80
-    memory_threshold = 85
-    disk_threshold = 90
-    
-    print("Default Thresholds:")
-    print(f"  CPU: {cpu_threshold}%")
-    print(f"  Memory: {memory_threshold}%")
-    print(f"  Disk: {disk_threshold}%")
-    
-    customize = input("\nCustomize thresholds? (y/n): ").strip().lower()
-    
-    if customize == 'y':
+    if os.path.exists(ALERT_RULES_FILE):
         try:
-            cpu_threshold = int(input("CPU threshold (%): "))
-            memory_threshold = int(input("Memory threshold (%): "))
-            disk_threshold = int(input("Disk threshold (%): "))
-        except ValueError:
-            print("Invalid input. Using default thresholds.")
+            engine = AlertEngine.load(ALERT_RULES_FILE)
+        except (ValueError, KeyError) as e:
+            print(f"Invalid {ALERT_RULES_FILE}: {str(e)}")
+            return
+        print(f"Loaded {len(engine.rules)} rules from {ALERT_RULES_FILE}")
+    else:
+        # Default thresholds
+        cpu_threshold = 80
+        memory_threshold = 85
+        disk_threshold = 90
+        
+        print("Default Thresholds:")
+        print(f"  CPU: {cpu_threshold}%")
+        print(f"  Memory: {memory_threshold}%")
+        print(f"  Disk: {disk_threshold}%")
+        
+        customize = input("\nCustomize thresholds? (y/n): ").strip().lower()
+        
+        if customize == 'y':
+            try:
+                cpu_threshold = int(input("CPU threshold (%): "))
+                memory_threshold = int(input("Memory threshold (%): "))
+                disk_threshold = int(input("Disk threshold (%): "))
+            except ValueError:
+                print("Invalid input. Using default thresholds.")
+        
+        engine = AlertEngine(threshold_rules(cpu_threshold, memory_threshold, disk_threshold))
+    
+    # Learns each metric's normal range while monitoring
+    detector = AnomalyDetector(ANOMALY_METRICS, interval=5)
     
     print("\nMonitoring started... (checking every 5 seconds)")
     print("-" * 60)
@@ -145,72 +485,60 @@ def monitor_with_alerts():
         while True:
             timestamp = datetime.now().strftime('%H:%M:%S')
             
-            cpu = get_cpu_info()
-            memory = get_memory_info()
-            disk = get_disk_info()
-            
-            alerts = []
-            
-            # Check CPU
-            if cpu['usage_percent'] > cpu_threshold:
-                alerts.append(f"HIGH CPU: {cpu['usage_percent']}%")
+            snapshot = get_snapshot()
+            cpu = snapshot['cpu']
+            memory = snapshot['memory']
+            disk = snapshot['disk']
             
-            # Check Memory
-            if memory['usage_percent'] > memory_threshold:
-                alerts.append(f"HIGH MEMORY: {memory['usage_percent']}%")
-            
-            # Check Disk
-            if disk['usage_percent'] > disk_threshold:
-                alerts.append(f"HIGH DISK: {disk['usage_percent']}%")
+            # Only alerts that start or resolve this tick are reported
+            values = flatten_snapshot(snapshot)
+            events = engine.evaluate(values, snapshot['timestamp'])
+            anomalies = detector.observe(values, snapshot['timestamp'])
+            firing = engine.active()
             
             # Display status
-            status = "OK" if not alerts else "ALERT"
+            status = "OK" if not firing else f"ALERT ({len(firing)} firing)"
             print(f"[{timestamp}] Status: {status} | CPU: {cpu['usage_percent']}% | RAM: {memory['usage_percent']}% | Disk: {disk['usage_percent']}%")
             
-            # Display alerts
-            if alerts:
-                for alert in alerts:
-                    print(f"  WARNING: {alert}")
+            # Display alert changes
+            for event in events:
+                if event['state'] == 'firing':
+                    print(f"  {event['severity'].upper()}: {event['rule']} - {event['metric']} = {event['value']} ({event['condition']})")
+                else:
+                    print(f"  RESOLVED: {event['rule']} - {event['metric']} = {event['value']}")
+            for anomaly in anomalies:
+                print(f"  ANOMALY: {anomaly['metric']} = {anomaly['value']} "
+                      f"(usually ~{anomaly['expected']}, score {anomaly['score']})")
             
             time.sleep(5)
     
     except KeyboardInterrupt:
         print("\n\nMonitoring stopped.")
+        for rule in engine.active():
+            print(f"  Still firing: {rule.name} ({rule.metric} = {round(rule.value, 2)})")
 
-# Function to view running processes
-def show_processes():
+# Function to get the shared process tracker
+def get_process_tracker():
     """
-    Display running processes sorted by resource usage
+    Create the process tracker on first use and take a baseline sample
+    so the first CPU percentages shown are meaningful
     """
-    print("\n--- Running Processes ---")
-    print("\nSort by:")
-    print("1. CPU Usage")
-    print("2. Memory Usage")
-    
-    choice = input("Select (1-2): ").strip()
-    
-    processes = []
-    
-    for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-        try:
-            processes.append(proc.info)
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
-    
-    # Sort processes
-    if choice == '1':
-        processes.sort(key=lambda x: x['cpu_percent'] or 0, reverse=True)
-        sort_by = "CPU"
-    else:
-        processes.sort(key=lambda x: x['memory_percent'] or 0, reverse=True)
-        sort_by = "Memory"
-    
-    print(f"\nTop 20 Processes by {sort_by} Usage:")
+    global _process_tracker
+    if _process_tracker is None:
+        _process_tracker = ProcessTracker(('name', 'cpu_percent', 'memory_percent'))
+        _process_tracker.refresh = profiler.wrap(_process_tracker.refresh, 'process_scan')
+        _process_tracker.refresh()
+        time.sleep(0.5)
+    return _process_tracker
+
+# Function to print a process table
+def print_process_table(processes, sort_by):
+    print(f"\nTop {len(processes)} Processes by {sort_by} Usage:")
     print("="*80)
     print(f"{'PID':<8} {'Name':<35} {'CPU %':<10} {'Memory %':<10}")
     print("-"*80)
     
-    for proc in processes[:20]:
+    for proc in processes:
         pid = proc['pid']
         name = proc['name'][:33] if proc['name'] else 'N/A'
         cpu = f"{proc['cpu_percent']:.1f}" if proc['cpu_percent'] else '0.0'
@@ -220,6 +548,58 @@ def show_processes():
     
     print("="*80)
 
+# Function to view running processes
+def show_processes():
+    """
+    Display running processes sorted by resource usage
+    """
+    print("\n--- Running Processes ---")
+    print("\nSort by:")
+    print("1. CPU Usage")
+    print("2. Memory Usage")
+    print("3. Live View (CPU, refreshes every 2 seconds)")
+    
+    choice = input("Select (1-3): ").strip()
+    
+    if choice == '3':
+        live_process_view()
+        return
+    
+    key, sort_by = ('cpu_percent', "CPU") if choice == '1' else ('memory_percent', "Memory")
+    print_process_table(get_process_tracker().top(20, key=key), sort_by)
+
+# Function for a top-style live process view
+def live_process_view(interval=2, count=20):
+    """
+    Redraw the top processes by CPU until Ctrl+C
+    """
+    tracker = get_process_tracker()
+    
+    try:
+        while True:
+            top = tracker.top(count, key='cpu_percent')
+            cpu = get_cpu_info()
+            memory = get_memory_info()
+            
+            # Clear the screen and move the cursor home
+            print("\033[2J\033[H", end='')
+            print(f"{datetime.now().strftime('%H:%M:%S')}  Processes: {len(tracker)}  "
+                  f"CPU: {cpu['usage_percent']}%  RAM: {memory['usage_percent']}%  (Ctrl+C to stop)")
+            print_process_table(top, "CPU")
+            time.sleep(interval)
+    
+    except KeyboardInterrupt:
+        print("\n\nLive view stopped.")
+
+# Function to get the shared process name index
+def get_process_index():
+    """Create the process index on first use"""
+    global _process_index
+    if _process_index is None:
+        _process_index = ProcessIndex()
+        _process_index.refresh = profiler.wrap(_process_index.refresh, 'service_scan')
+    return _process_index
+
 # Function to check service status
 def check_services():
     """
@@ -241,40 +621,72 @@ def check_services():
     print("SERVICE STATUS")
     print("="*60)
     
-    running_processes = {proc.name().lower() for proc in psutil.process_iter(['name'])}
+    index = get_process_index()
+    index.refresh()
     
     for service in services:
-        service_lower = service.lower()
-        if service_lower in running_processes:
-            print(f"  {service}: RUNNING")
+        pids = index.pids_for_name(service)
+        if pids:
+            print(f"  {service}: RUNNING ({len(pids)} processes)")
         else:
             print(f"  {service}: NOT RUNNING")
     
     print("="*60)
     
-# Function to generate health report
-def generate_health_report():
+# Function to list health issues in a report
+def assess_health(report):
     """
-    Generate comprehensive system health report
+    Return a list of issue descriptions (empty when healthy)
     """
-    print("\n" + "="*60)
-    print("SYSTEM HEALTH REPORT")
-    print("="*60)
+    issues = []
     
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if report['cpu']['usage_percent'] > 80:
+        issues.append("High CPU usage detected")
+    if report['memory']['usage_percent'] > 85:
+        issues.append("High memory usage detected")
+    for mountpoint, mount in report['disks'].items():
+        if mount['usage_percent'] > 90:
+            issues.append(f"Low disk space detected on {mountpoint}")
+    if report['disk']['usage_percent'] > 90 and '/' not in report['disks']:
+        issues.append("Low disk space detected")
+    
+    return issues
+
+# Function to collect the data for a health report
+def collect_health_report():
+    """
+    Build a health report dict from the latest sample (no output)
+    """
+    snapshot = get_snapshot()
     
     report = {
-        'timestamp': timestamp,
+        'timestamp': datetime.fromtimestamp(snapshot['timestamp']).strftime('%Y-%m-%d %H:%M:%S'),
         'system': {
             'os': platform.system(),
             'release': platform.release(),
             'machine': platform.machine()
         },
-        'cpu': get_cpu_info(),
-        'memory': get_memory_info(),
-        'disk': get_disk_info(),
-        'network': get_network_info()
+        'cpu': snapshot['cpu'],
+        'memory': snapshot['memory'],
+        'disk': snapshot['disk'],
+        'disks': snapshot['disks'],
+        'network': snapshot['network'],
+        'interfaces': snapshot['interfaces']
     }
+    report['issues'] = assess_health(report)
+    return report
+
+# Function to generate health report
+def generate_health_report():
+    """
+    Generate comprehensive system health report
+    """
+    print("\n" + "="*60)
+    print("SYSTEM HEALTH REPORT")
+    print("="*60)
+    
+    report = collect_health_report()
+    timestamp = report['timestamp']
     
     # Display report
     print(f"\nTimestamp: {timestamp}")
@@ -301,14 +713,7 @@ def generate_health_report():
     
     # Health assessment
     print("\nHealth Assessment:")
-    issues = []
-    
-    if report['cpu']['usage_percent'] > 80:
-        issues.append("High CPU usage detected")
-    if report['memory']['usage_percent'] > 85:
-        issues.append("High memory usage detected")
-    if report['disk']['usage_percent'] > 90:
-        issues.append("Low disk space detected")
+    issues = report['issues']
     
     if not issues:
         print("  Status: HEALTHY")
@@ -333,34 +738,101 @@ def generate_health_report():
 # Function to log system metrics
 def log_system_metrics():
     """
-    Log current system metrics to file
+    Log current system metrics to the metrics history
     """
-    log_file = "system_metrics_log.json"
+    snapshot = get_snapshot()
+    # Each sample is already recorded when history recording is on;
+    # writing it again would count it twice in the rollups
+    if not sampler.is_subscribed(record_snapshot):
+        record_snapshot(snapshot)
     
-    metric = {
-        'timestamp': datetime.now().isoformat(),
-        'cpu_percent': get_cpu_info()['usage_percent'],
-        'memory_percent': get_memory_info()['usage_percent'],
-        'disk_percent': get_disk_info()['usage_percent']
-    }
+    timestamp = datetime.fromtimestamp(snapshot['timestamp']).isoformat()
+    print(f"\nMetrics logged successfully at {timestamp}")
+
+# Function to view stored metrics
+def view_metrics_history():
+    """
+    Show stored values for a metric over a time window
+    """
+    store = get_metrics_store()
+    metrics = store.metrics()
     
-    # Load existing logs
-    if os.path.exists(log_file):
-        with open(log_file, 'r') as f:
-            logs = json.load(f)
-    else:
-        logs = []
+    if not metrics:
+        print("\nNo metrics history found.")
+        return
+    
+    print("\n--- Metrics History ---")
+    for idx, name in enumerate(metrics, 1):
+        print(f"{idx}. {name}")
+    
+    windows = {'1': ('Last hour', 3600), '2': ('Last 24 hours', 86400),
+               '3': ('Last 7 days', 7 * 86400), '4': ('Last 30 days', 30 * 86400),
+               '5': ('Last year', 365 * 86400)}
+    
+    try:
+        metric = metrics[int(input("\nSelect metric: ")) - 1]
+    except (ValueError, IndexError):
+        print("\nInvalid selection!")
+        return
+    
+    print("\nTime window:")
+    for key, (label, _seconds) in windows.items():
+        print(f"{key}. {label}")
+    label, seconds = windows.get(input("Select (1-5): ").strip(), windows['1'])
+    
+    start = time.time() - seconds
+    rows = store.query(metric, start)
     
-    logs.append(metric)
+    if not rows:
+        print(f"\nNo data for {metric} in the {label.lower()}.")
+        return
+    
+    print(f"\n{metric} - {label} ({len(rows)} points)")
+    print("="*60)
+    print(f"  Average: {sum(r[1] for r in rows) / len(rows):.2f}")
+    print(f"  Minimum: {min(r[2] for r in rows):.2f}")
+    print(f"  Maximum: {max(r[3] for r in rows):.2f}")
+    print("-"*60)
     
-    # Keep only last 100 entries
-    if len(logs) > 100:
-        logs = logs[-100:]
+    # Show up to 20 evenly spaced points
+    step = max(1, len(rows) // 20)
+    print(f"{'Time':<22} {'Avg':>10} {'Min':>10} {'Max':>10}")
+    for ts, avg, low, high in rows[::step]:
+        when = datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+        print(f"{when:<22} {avg:>10.2f} {low:>10.2f} {high:>10.2f}")
+    print("="*60)
+
+# Function to find anomalies in stored history
+def find_anomalies(metric, seconds):
+    """
+    Backtest the anomaly detector over a metric's history (needs NumPy).
+    Returns (points checked, [(timestamp, value, score), ...])
+    """
+    store = get_metrics_store()
+    start = time.time() - seconds
+    resolution = store.pick_resolution(start, time.time())
+    rows = store.query(metric, start, resolution=resolution)
+    if not rows:
+        return 0, []
     
-    with open(log_file, 'w') as f:
-        json.dump(logs, f, indent=4)
+    from anomaly_detector import backtest
+    interval = store.resolutions[resolution][0]
+    timestamps = [r[0] for r in rows]
+    values = [r[1] for r in rows]
+    result = backtest(timestamps, values, interval=interval)
     
-    print(f"\nMetrics logged successfully at {metric['timestamp']}")
+    flagged = [(timestamps[i], values[i], round(float(result['mad_score'][i]), 1))
+               for i in result['anomalous'].nonzero()[0]]
+    return len(rows), flagged
+
+# Function to print anomaly backtest results
+def print_anomalies(metric, checked, flagged, limit=20):
+    print(f"\n{metric}: {len(flagged)} anomalies in {checked} points")
+    for ts, value, score in flagged[:limit]:
+        when = datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M:%S')
+        print(f"  {when}  {value:>12.2f}  score {score:>6}")
+    if len(flagged) > limit:
+        print(f"  ... {len(flagged) - limit} more")
 
 # Main menu
 def show_menu():
@@ -373,7 +845,8 @@ def show_menu():
     print("4. Generate Health Report")
     print("5. Check Service Status")
     print("6. Log Current Metrics")
-    print("7. Exit")
+    print("7. View Metrics History")
+    print("8. Exit")
     print("-"*60)
 
 # Main program
@@ -386,11 +859,14 @@ def main():
         print("Please install it using: pip install psutil")
         return
     
-    import os
+    # Start background sampling so the first screen doesn't wait on CPU
+    if RECORD_HISTORY:
+        sampler.subscribe(record_snapshot)
+    sampler.start()
     
     while True:
         show_menu()
-        choice = input("\nSelect an option (1-7): ").strip()
+        choice = input("\nSelect an option (1-8): ").strip()
         
         if choice == '1':
             show_system_status()
@@ -411,15 +887,159 @@ def main():
             log_system_metrics()
         
         elif choice == '7':
+            view_metrics_history()
+        
+        elif choice == '8':
             print("\nThank you for using System Health Monitoring Dashboard!")
             print("Exiting...\n")
             break
         
         else:
-            print("\nInvalid option. Please select 1-7.")
+            print("\nInvalid option. Please select 1-8.")
         
-        if choice != '7':
+        if choice != '8':
             input("\nPress Enter to continue...")
 
+# Function to build the command-line parser
+def build_parser():
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog='system_monitor.py',
+        description="System health monitor. Run without arguments for the interactive dashboard.")
+    parser.add_argument('--profile', action='store_true',
+                        help="count syscalls per collector and print the monitor's own cost on exit")
+    sub = parser.add_subparsers(dest='command')
+    
+    p = sub.add_parser('agent', help="sample this host and ship batches to a collector")
+    p.add_argument('collector', help="collector address as host or host:port")
+    p.add_argument('--interval', type=float, default=5, help="seconds between samples (default: 5)")
+    p.add_argument('--batch-size', type=int, default=12, help="samples per batch (default: 12)")
+    p.add_argument('--name', help="agent name (default: hostname)")
+    
+    p = sub.add_parser('collector', help="receive samples from many agents")
+    p.add_argument('--host', default='0.0.0.0')
+    p.add_argument('--port', type=int, default=None)
+    p.add_argument('--report-every', type=float, default=30, help="seconds between fleet summaries")
+    
+    p = sub.add_parser('exporter', help="serve /metrics for Prometheus (OpenMetrics format)")
+    p.add_argument('--host', default='0.0.0.0')
+    p.add_argument('--port', type=int, default=None, help="listen port (default: 9276)")
+    
+    p = sub.add_parser('services', help="watch services from a services file")
+    p.add_argument('--config', default=None, help="services file (default: services.json)")
+    p.add_argument('--interval', type=float, default=10, help="seconds between checks (default: 10)")
+    p.add_argument('--once', action='store_true', help="check once and exit (1 if any service is unhealthy)")
+    
+    p = sub.add_parser('schedule', help="archive health reports on a cron schedule (no prompts)")
+    p.add_argument('--cron', default=None, help='cron expression (default: "*/15 * * * *")')
+    p.add_argument('--dir', default=None, help="archive directory (default: health_reports)")
+    
+    p = sub.add_parser('summary', help="summarize stored metrics and archived reports for a time window")
+    p.add_argument('--days', type=float, default=1, help="window ending now, in days (default: 1)")
+    p.add_argument('--start', help="window start as YYYY-MM-DD (overrides --days)")
+    p.add_argument('--end', help="window end as YYYY-MM-DD (default: now)")
+    p.add_argument('--dir', default=None, help="archive directory (default: health_reports)")
+    p.add_argument('--json', action='store_true', help="print the summary as JSON")
+    
+    p = sub.add_parser('anomalies', help="backtest anomaly detection over stored metrics history")
+    p.add_argument('--metric', action='append', help="metric to check (repeatable, default: key metrics)")
+    p.add_argument('--hours', type=float, default=24, help="history to check (default: 24)")
+    
+    return parser
+
+# Non-interactive entry point
+def cli(argv):
+    args = build_parser().parse_args(argv)
+    
+    if args.profile:
+        if not profiler.enable_syscalls():
+            print("Syscall counts are not available on this platform.")
+        profiler.calibrate()
+    
+    try:
+        return run_command(args)
+    finally:
+        if args.profile:
+            print_profile(profiler)
+
+# Function to run one parsed command
+def run_command(args):
+    if args.command is None:
+        main()
+    
+    elif args.command == 'agent':
+        from fleet import run_agent, COLLECTOR_PORT
+        host, _, port = args.collector.partition(':')
+        run_agent(host, int(port) if port else COLLECTOR_PORT, interval=args.interval,
+                  batch_size=args.batch_size, name=args.name)
+    
+    elif args.command == 'collector':
+        from fleet import run_collector, COLLECTOR_PORT
+        run_collector(args.host, args.port or COLLECTOR_PORT, report_every=args.report_every)
+    
+    elif args.command == 'exporter':
+        from exporter import run_exporter, EXPORTER_PORT
+        sampler.start()
+        run_exporter(get_snapshot, args.host, args.port or EXPORTER_PORT)
+    
+    elif args.command == 'services':
+        from service_watch import ServiceWatcher, SERVICES_FILE, print_service_status, watch_services
+        try:
+            watcher = ServiceWatcher.load(args.config or SERVICES_FILE, index=get_process_index())
+        except (OSError, ValueError, KeyError) as e:
+            print(f"ERROR: could not load services - {str(e)}")
+            return 2
+        if args.once:
+            statuses = watcher.check(probe='all')
+            print_service_status(statuses)
+            return 0 if all(s['healthy'] for s in statuses) else 1
+        watch_services(watcher, args.interval)
+    
+    elif args.command == 'schedule':
+        from report_archive import Schedule, ReportArchive, run_scheduler, REPORT_SCHEDULE, REPORTS_DIR
+        try:
+            schedule = Schedule(args.cron or REPORT_SCHEDULE)
+        except ValueError as e:
+            print(f"ERROR: {str(e)}")
+            return 2
+        if RECORD_HISTORY:
+            sampler.subscribe(record_snapshot)
+        sampler.start()
+        run_scheduler(collect_health_report, schedule, ReportArchive(args.dir or REPORTS_DIR))
+    
+    elif args.command == 'summary':
+        from report_archive import ReportArchive, summarize_window, print_summary, REPORTS_DIR
+        try:
+            end = datetime.strptime(args.end, '%Y-%m-%d') if args.end else datetime.now()
+            start = datetime.strptime(args.start, '%Y-%m-%d') if args.start else end - timedelta(days=args.days)
+        except ValueError:
+            print("ERROR: dates must be YYYY-MM-DD")
+            return 2
+        summary = summarize_window(get_metrics_store(), start.timestamp(), end.timestamp())
+        archive_dir = args.dir or REPORTS_DIR
+        if os.path.isdir(archive_dir):
+            reports = list(ReportArchive(archive_dir).reports(start, end))
+            summary['reports'] = len(reports)
+            summary['reports_with_issues'] = sum(1 for r in reports if r.get('issues'))
+        if args.json:
+            print(json.dumps(summary, indent=2))
+        else:
+            print_summary(summary)
+    
+    elif args.command == 'anomalies':
+        try:
+            for metric in args.metric or ANOMALY_METRICS:
+                checked, flagged = find_anomalies(metric, args.hours * 3600)
+                print_anomalies(metric, checked, flagged)
+        except ImportError:
+            print("ERROR: backtesting needs NumPy (pip install numpy)")
+            return 1
+    
+    return 0
+
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        sys.exit(cli(sys.argv[1:]))
     main()
\ No newline at end of file
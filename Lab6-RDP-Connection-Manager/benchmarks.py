@@ -0,0 +1,467 @@
+import json
+import random
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from connection_store import ConnectionStore
+from connection_search import SearchIndex, search_once
+from reachability import ReachabilityCache, check_connections, summarize
+from history_log import HistoryLog, HistoryStats
+from import_export import import_profiles, export_profiles, validate_profile
+from rdp_files import RdpFileCache, TEMPLATES, check_rdp, launch
+from tag_query import TagIndex, profile_terms
+
+# Function to build n synthetic connection profiles
+def make_profiles(n, prefix='Server'):
+    envs = ('prod', 'test', 'dev', 'lab')
+    roles = ('web', 'db', 'app', 'dc', 'file', 'print')
+    profiles = []
+    for i in range(n):
+        profiles.append({
+            'display_name': f"{prefix} {i:06d}",
+            'hostname': f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+            'username': f"admin{i % 50}",
+            'port': "3389",
+            'tags': [envs[i % len(envs)], roles[i % len(roles)]],
+            'notes': f"rack {i % 40}",
+            'created': "2026-01-01 00:00:00"
+        })
+    return profiles
+
+def _timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+def _report(label, samples):
+    print(f"{label:<40} median {statistics.median(samples) * 1000:9.3f} ms"
+          f"   max {max(samples) * 1000:9.3f} ms   (n={len(samples)})")
+
+# Import as it worked before the store: any() over the list per profile
+def _legacy_import(connections, imported):
+    for conn in imported:
+        if not any(c['display_name'] == conn['display_name'] for c in connections):
+            connections.append(conn)
+
+# Benchmark: importing profiles into an existing inventory
+def bench_import(sizes=(2000, 5000, 10000, 50000), legacy_limit=5000):
+    """
+    Import n new profiles on top of n existing ones, list scan versus
+    the indexed store, then time saving and reloading the result
+    """
+    print("\n--- Connection Import ---")
+    for n in sizes:
+        existing, imported = make_profiles(n, 'Existing'), make_profiles(n)
+        if n <= legacy_limit:
+            t0 = time.perf_counter()
+            _legacy_import(list(existing), imported)
+            print(f"{f'Before: list scan, {n} + {n}':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+        with tempfile.TemporaryDirectory() as tmp:
+            store = ConnectionStore(os.path.join(tmp, 'connections.json'))
+            store.add_many(existing)
+            t0 = time.perf_counter()
+            added, skipped = store.add_many(imported)
+            print(f"{f'After: ConnectionStore, {n} + {n}':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms"
+                  f"   ({added} added, {len(skipped)} skipped)")
+
+    n = sizes[-1]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'connections.json')
+        store = ConnectionStore(path)
+        store.add_many(make_profiles(n))
+        _report(f"Atomic save ({n} profiles)", _timed(store.save, 3))
+        _report(f"Load and index ({n} profiles)", _timed(store.load, 3))
+        _report("Lookup by hostname", _timed(lambda: store.find_host('10.0.1.2'), 1000))
+        _report("Lookup by tag (1/4 of profiles)", _timed(lambda: store.with_tag('prod'), 10))
+        print(f"{'File size':<40} {os.path.getsize(path) / 1024**2:9.1f} MB")
+
+# Search as it worked before the index: substring checks over every profile
+def _legacy_search(connections, term):
+    return [conn for conn in connections
+            if term in conn['display_name'].lower() or term in conn['hostname'].lower()
+            or any(term in tag.lower() for tag in conn['tags'])]
+
+# Benchmark: type-ahead search latency
+def bench_search(n=100000, repeat=50):
+    """
+    Build the search index over n profiles and time typical queries:
+    exact names, prefixes, IP fragments, tags, notes and typos
+    """
+    print("\n--- Connection Search ---")
+    profiles = make_profiles(n)
+    # Some connections have history, so ranking has boosts to apply
+    usage = {f"Server {i:06d}": (i % 30, time.time() - i % 90 * 86400) for i in range(0, n, 7)}
+
+    # What the menu and the command line do until a typo needs the index
+    for query in ('server 042170', 'web'):
+        _report(f"One-off, no index ('{query}')",
+                _timed(lambda: search_once(profiles, query, 10, usage, fuzzy=False), 5))
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    index = SearchIndex(profiles, usage)
+    build = time.perf_counter() - t0
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{f'Build index ({n} profiles)':<40} {build * 1000:9.1f} ms   {memory / 1024**2:.1f} MB")
+
+    _report("Before: substring scan ('server 04217')", _timed(lambda: _legacy_search(profiles, 'server 04217'), 5))
+    queries = (
+        ('exact name', 'server 042170'),
+        ('name prefix', 'server 0421'),
+        ('one letter', 's'),
+        ('IP fragment', '10.1.44'),
+        ('tag (1 in 6 profiles)', 'web'),
+        ('notes', 'rack 17'),
+        ('typo in name', 'srever 04217'),
+        ('typo in tag', 'prdo'),
+        ('typo at word start', 'esrver 04217'),
+    )
+    for label, query in queries:
+        top = index.search(query, limit=10)
+        _report(f"'{query}' ({label})", _timed(lambda: index.search(query, limit=10), repeat))
+        print(f"{'':<40} top: {top[0][0] if top else '-'}")
+
+# Check as it worked before: one blocking ping per connection
+def _legacy_test(conn):
+    try:
+        subprocess.run(['ping', '-c', '2', conn['hostname']], capture_output=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+
+# Benchmark: checking every connection against local listeners
+def bench_reachability(n=5000, listeners=20, closed_every=5):
+    """
+    n profiles spread over 127.x.y.z addresses and `listeners` local
+    ports that accept connections; every `closed_every`-th profile points
+    at a closed port instead
+    """
+    print("\n--- Reachability Checks ---")
+    servers = []
+    for _ in range(listeners):
+        server = socket.socket()
+        server.bind(('0.0.0.0', 0))
+        # Never accepted: the kernel completes handshakes into the backlog
+        server.listen(4096)
+        servers.append(server)
+    closed = socket.socket()
+    closed.bind(('127.0.0.1', 0))
+    closed_port = closed.getsockname()[1]
+    closed.close()
+    try:
+        profiles = make_profiles(n)
+        for i, conn in enumerate(profiles):
+            conn['hostname'] = f"127.{i // 65536 % 256}.{i // 256 % 256}.{i % 256 or 1}"
+            conn['port'] = str(closed_port if i % closed_every == 0 else
+                               servers[i % listeners].getsockname()[1])
+
+        if shutil.which('ping'):
+            t0 = time.perf_counter()
+            for conn in profiles[:5]:
+                _legacy_test(conn)
+            legacy = (time.perf_counter() - t0) / 5
+            print(f"{'Before: ping -c 2 one at a time':<40} {legacy * 1000:9.1f} ms per profile"
+                  f" (~{legacy * n:.0f} s for {n})")
+        else:
+            print("Before: ping is not installed here (ping -c 2 takes ~1 s per reachable host)")
+
+        for concurrency in (64, 256):
+            cache = ReachabilityCache()
+            t0 = time.perf_counter()
+            results = check_connections(profiles, cache, concurrency=concurrency)
+            elapsed = time.perf_counter() - t0
+            print(f"{f'After: {n} profiles, {concurrency} at a time':<40} {elapsed * 1000:9.1f} ms   {summarize(results)}")
+
+        t0 = time.perf_counter()
+        check_connections(profiles, cache)
+        print(f"{'Cached (within TTL)':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+        _report("Status lookup for one profile", _timed(lambda: cache.get(profiles[1]), 1000))
+    finally:
+        for server in servers:
+            server.close()
+
+# History logging as it worked before: load, append, trim to 50, rewrite
+def _legacy_log(path, name, hostname):
+    history = []
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            history = json.load(f)
+    history.append({'connection_name': name, 'hostname': hostname,
+                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+    with open(path, 'w') as f:
+        json.dump(history[-50:], f, indent=4)
+
+# Benchmark: history appends and analytics over millions of entries
+def bench_history(entries=2000000, appends=20000, servers=5000, users=40):
+    """
+    Time appends, then write `entries` synthetic entries spread over a
+    year and time loading the statistics cold, resuming from saved
+    statistics, and reading the latest entries
+    """
+    print("\n--- Connection History ---")
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, 'connection_history.json')
+        _report("Before: load/append/rewrite (50 kept)",
+                _timed(lambda: _legacy_log(legacy_path, 'Server 000001', '10.0.0.1'), 2000))
+
+        log = HistoryLog(os.path.join(tmp, 'connection_history.jsonl'))
+        _report("After: append to log (nothing dropped)",
+                _timed(lambda: log.append('Server 000001', '10.0.0.1', user='admin'), appends))
+
+        # Bulk-write a year of history, rotating like the log does
+        rng = random.Random(42)
+        start = time.time() - 365 * 86400
+        lines = []
+        for i in range(entries):
+            name = f"Server {int(rng.paretovariate(1.2)) % servers:06d}"
+            stamp = start + i * (365 * 86400 / entries)
+            lines.append(json.dumps({
+                'connection_name': name, 'hostname': '10.0.0.1', 'user': f"admin{rng.randrange(users)}",
+                'timestamp': datetime.fromtimestamp(stamp).strftime('%Y-%m-%d %H:%M:%S')
+            }) + '\n')
+        os.remove(log.path)
+        os.remove(log.segments()[0]) if log.segments() else None
+        chunk = len(lines) // 8
+        for number in range(8):
+            target = log._segment_format.format(number + 1) if number < 7 else log.path
+            with open(target, 'w') as f:
+                f.writelines(lines[number * chunk:(number + 1) * chunk if number < 7 else None])
+        size = sum(os.path.getsize(p) for p in log.segments() + [log.path])
+        print(f"{'History size':<40} {entries} entries, {size / 1024**2:.0f} MB in 8 files")
+
+        t0 = time.perf_counter()
+        log = HistoryLog(log.path)
+        cold = time.perf_counter() - t0
+        print(f"{'Statistics from scratch':<40} {cold * 1000:9.1f} ms   ({entries / cold:,.0f} entries/s)")
+        log.save_stats()
+        for i in range(1000):
+            log.append(f"Server {i % servers:06d}", '10.0.0.1', user='admin')
+        t0 = time.perf_counter()
+        resumed = HistoryLog(log.path)
+        print(f"{'Resume from saved stats (+1000 new)':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+        assert resumed.stats.total == log.stats.total
+        _report("Last 20 entries", _timed(lambda: log.recent(20), 200))
+        _report("Top 10 servers", _timed(lambda: log.stats.most_used(10), 200))
+        _report("Top 10 for one user", _timed(lambda: log.stats.most_used(10, user='admin3'), 200))
+        print(f"{'':<40} top: {log.stats.most_used(3)}")
+
+# Benchmark: bulk import and export in every format
+def bench_bulk(n=100000, existing=10000, rdp_files=2000):
+    """
+    Export n profiles to each format, then import each file into a store
+    already holding `existing` of them (so those come back as
+    duplicates). Timing and peak memory are measured in separate runs
+    because tracemalloc slows everything down.
+    """
+    print("\n--- Bulk Import / Export ---")
+    profiles = make_profiles(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        for ext in ('json', 'jsonl', 'csv', 'rdg'):
+            path = os.path.join(tmp, f'export.{ext}')
+            t0 = time.perf_counter()
+            export_profiles(profiles, path)
+            elapsed = time.perf_counter() - t0
+            print(f"{f'Export {n} to .{ext}':<40} {elapsed * 1000:9.1f} ms"
+                  f"   ({os.path.getsize(path) / 1024**2:.1f} MB)")
+
+        for ext in ('json', 'jsonl', 'csv', 'rdg'):
+            path = os.path.join(tmp, f'export.{ext}')
+            for measure_memory in (False, True):
+                store = ConnectionStore(os.path.join(tmp, f'{ext}-{measure_memory}.json'))
+                store.add_many(profiles[:existing])
+                report = import_profiles(store, path, measure_memory=measure_memory, save=False)
+                if not measure_memory:
+                    print(f"{f'Import .{ext} ({n}, {existing} present)':<40} {report['seconds'] * 1000:9.1f} ms"
+                          f"   ({report['per_second']:,} profiles/s, {report['added']} added,"
+                          f" {report['duplicates']} duplicates)")
+                else:
+                    print(f"{'':<40} peak memory {report['peak_mb']} MB")
+
+        # Before: the whole file loaded, then every profile added
+        path = os.path.join(tmp, 'export.json')
+        tracemalloc.start()
+        store = ConnectionStore(os.path.join(tmp, 'legacy.json'))
+        with open(path, 'r') as f:
+            store.add_many(json.load(f))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{'Before: json.load + add_many, peak':<40} {peak / 1024**2:9.1f} MB   (no validation or dedup)")
+
+        folder = os.path.join(tmp, 'rdp')
+        os.mkdir(folder)
+        for conn in profiles[:rdp_files]:
+            with open(os.path.join(folder, conn['display_name'] + '.rdp'), 'w', encoding='utf-16') as f:
+                f.write(f"full address:s:{conn['hostname']}\nusername:s:{conn['username']}\n")
+        store = ConnectionStore(os.path.join(tmp, 'rdp.json'))
+        report = import_profiles(store, folder, save=False)
+        print(f"{f'Import folder of {rdp_files} .rdp files':<40} {report['seconds'] * 1000:9.1f} ms"
+              f"   ({report['per_second']:,} profiles/s)")
+
+        _report(f"Validate {n} profiles", _timed(lambda: [validate_profile(c) for c in profiles], 3))
+
+# Benchmark: generating .rdp files for every profile
+def bench_rdp_files(n=10000, tag='prod'):
+    """
+    Write .rdp files for n profiles, then again with nothing changed
+    (all cached), with one profile changed, for one tag group with
+    another template, and check the files and the launch command
+    """
+    print("\n--- .rdp File Generation ---")
+    profiles = make_profiles(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = RdpFileCache(os.path.join(tmp, 'rdp_files'), TEMPLATES)
+        for label in (f'First run ({n} files)', 'Nothing changed (all cached)'):
+            t0 = time.perf_counter()
+            result = cache.generate(profiles)
+            print(f"{label:<40} {(time.perf_counter() - t0) * 1000:9.1f} ms"
+                  f"   ({result['written']} written, {result['cached']} cached)")
+
+        profiles[0]['port'] = '3390'
+        t0 = time.perf_counter()
+        result = cache.generate(profiles)
+        print(f"{'One profile changed':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms"
+              f"   ({result['written']} written, {result['cached']} cached)")
+
+        t0 = time.perf_counter()
+        reopened = RdpFileCache(cache.folder, TEMPLATES)
+        result = reopened.generate(profiles)
+        print(f"{'Next session (manifest reloaded)':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms"
+              f"   ({result['cached']} cached)")
+
+        group = [conn for conn in profiles if tag in conn['tags']]
+        t0 = time.perf_counter()
+        result = reopened.generate(group, 'windowed')
+        print(f"{f'Tag {tag} ({len(group)}), windowed template':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms"
+              f"   ({result['written']} written)")
+
+        bad = 0
+        for path in list(result['paths'].values()):
+            with open(path, 'r', encoding='utf-16') as f:
+                bad += bool(check_rdp(f.read()))
+        launched = []
+        command = launch(result['paths'][group[0]['display_name']], launcher=launched.append)
+        print(f"{'Files with problems':<40} {bad} of {len(result['paths'])}")
+        print(f"{'Launch command (stubbed)':<40} {command}")
+
+# Function to build profiles with group paths and many tags
+def make_inventory(n, sites=60, roles=40, apps=300, seed=7):
+    rng = random.Random(seed)
+    envs = ('prod', 'test', 'dev', 'lab')
+    profiles = make_profiles(n)
+    for i, conn in enumerate(profiles):
+        env, site, role = envs[i % len(envs)], f"site{rng.randrange(sites):02d}", f"role{rng.randrange(roles):02d}"
+        conn['group'] = f"{env}/{site}/{role}"
+        conn['tags'] = [f"app:app{rng.randrange(apps):03d}" for _ in range(3)] + [f"owner:team{i % 25}"]
+        if i % 10 == 0:
+            conn['tags'].append('site:lab')
+    return profiles
+
+# Query evaluation without the index: every profile's terms checked per query
+def _legacy_filter(profiles, terms, predicate):
+    return [conn['display_name'] for conn, profile in zip(profiles, terms) if predicate(profile)]
+
+# Benchmark: tag queries over a large inventory
+def bench_tags(n=100000, repeat=20):
+    """
+    Build the bitmap index over n profiles (env/site/role groups plus
+    hundreds of app and owner tags) and time queries against it, and
+    against checking each profile's tags in turn
+    """
+    print("\n--- Tag Queries ---")
+    profiles = make_inventory(n)
+    t0 = time.perf_counter()
+    TagIndex(profiles)
+    elapsed = time.perf_counter() - t0
+    tracemalloc.start()
+    index = TagIndex(profiles)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{f'Build index ({n} profiles)':<40} {elapsed * 1000:9.1f} ms   ({len(index.bitmaps)} bitmaps,"
+          f" {len(index.sparse)} sparse terms, {size / 1024**2:.0f} MB)")
+    # Every profile's terms worked out in advance, so the scan below is
+    # only the cost of checking them
+    terms = [profile_terms(conn) for conn in profiles]
+
+    queries = [
+        ('env:prod AND role:role07 AND NOT site:lab',
+         lambda t: 'env:prod' in t and 'role:role07' in t and 'site:lab' not in t),
+        ('app:app042 OR app:app117',
+         lambda t: 'app:app042' in t or 'app:app117' in t),
+        ('(env:prod OR env:test) AND owner:team3 AND NOT (site:site01 OR site:site02)',
+         lambda t: ('env:prod' in t or 'env:test' in t) and 'owner:team3' in t
+         and not ('site:site01' in t or 'site:site02' in t)),
+        ('NOT env:dev', lambda t: 'env:dev' not in t),
+    ]
+    for query, predicate in queries:
+        names = index.query(query)
+        t0 = time.perf_counter()
+        expected = _legacy_filter(profiles, terms, predicate)
+        legacy = time.perf_counter() - t0
+        assert names == expected
+        print(f"\n{query}")
+        print(f"{'Before: check every profile':<40} {legacy * 1000:9.1f} ms   ({len(names)} matches)")
+        _report("After: bitmap count", _timed(lambda: index.count(query), repeat))
+        _report("After: bitmap + names", _timed(lambda: index.query(query), repeat))
+
+    t0 = time.perf_counter()
+    for conn in profiles[:1000]:
+        index.remove(conn['display_name'])
+        index.add(conn)
+    print(f"\n{'Re-index 1000 changed profiles':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms")
+
+def bench_cli(n=10000, repeat=5):
+    """
+    Time one-off commands (python rdp_manager.py ...) against n saved
+    profiles, from starting Python to the result, next to building the
+    full search index for a single search
+    """
+    print("\n--- Command Line ---")
+    script = os.path.abspath('rdp_manager.py')
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'rdp_connections.json')
+        with open(path, 'w') as f:
+            json.dump(make_profiles(n), f)
+        commands = [
+            ('Python startup (nothing imported)', [sys.executable, '-c', 'pass']),
+            ('search 10.0.1.2', [sys.executable, script, '--format', 'json', 'search', '10.0.1.2']),
+            ('search srever (typo)', [sys.executable, script, 'search', 'srever']),
+            ('list web', [sys.executable, script, 'list', 'web']),
+            ('export out.csv', [sys.executable, script, 'export', os.path.join(tmp, 'out.csv')]),
+        ]
+        for label, command in commands:
+            _report(label, _timed(lambda: subprocess.run(command, cwd=tmp, check=False,
+                                                         stdout=subprocess.DEVNULL), repeat))
+
+        store = ConnectionStore(path)
+        t0 = time.perf_counter()
+        SearchIndex(store).search('10.0.1.2')
+        print(f"{'Before: full index for one search':<40} {(time.perf_counter() - t0) * 1000:9.1f} ms"
+              f"   (in-process, after loading)")
+
+BENCHMARKS = {
+    'import': bench_import,
+    'search': bench_search,
+    'reachability': bench_reachability,
+    'history': bench_history,
+    'bulk': bench_bulk,
+    'rdp': bench_rdp_files,
+    'tags': bench_tags,
+    'cli': bench_cli,
+}
+
+if __name__ == "__main__":
+    # Usage: python benchmarks.py [name ...]  (runs everything by default)
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
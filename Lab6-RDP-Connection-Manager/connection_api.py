@@ -0,0 +1,217 @@
+from datetime import datetime
+
+from connection_store import ConnectionStore, CONNECTIONS_FILE
+
+# Library API: nothing here prints or prompts. Functions return profiles,
+# results and reports and raise ValueError (bad input) or KeyError
+# (unknown connection). Slow imports (asyncio, XML, CSV) happen in the
+# functions that need them, so a one-off command only pays for what it runs.
+
+# Connections file used by get_store()
+_connections_file = CONNECTIONS_FILE
+
+# Saved connections (loaded on first use)
+_store = None
+
+# Connection history log and its statistics (loaded on first use)
+_history = None
+
+# Search index over saved connections (built on first use)
+_search_index = None
+
+# Tag and group bitmap index (built on first query)
+_tag_index = None
+
+# Generated .rdp files (manifest loaded on first use)
+_rdp_files = None
+
+# Latest reachability results (created on first check)
+_reachability = None
+
+# Function to point the API at another connections file
+def set_connections_file(path):
+    """Use `path` instead of rdp_connections.json (drops anything loaded)"""
+    global _connections_file, _store, _search_index, _tag_index
+    _connections_file = path
+    _store = _search_index = _tag_index = None
+
+# Function to get the shared connection store
+def get_store():
+    """Load the connections file on first use"""
+    global _store
+    if _store is None:
+        _store = ConnectionStore(_connections_file)
+    return _store
+
+# Function to get the connection history log
+def get_history():
+    """Open the history log on first use (reads only entries new since last time)"""
+    global _history
+    if _history is None:
+        from history_log import HistoryLog, HISTORY_LOG
+        _history = HistoryLog(HISTORY_LOG)
+    return _history
+
+# Function to get the search index, kept in step with the store
+def get_search_index():
+    """Build the search index on first use, boosted by connection history"""
+    global _search_index
+    if _search_index is None:
+        from connection_search import SearchIndex
+        store = get_store()
+        _search_index = SearchIndex(store, get_history().stats.usage())
+        store.subscribe(_search_index.on_change)
+    return _search_index
+
+# Function to get the tag index, kept in step with the store
+def get_tag_index():
+    """Build the tag/group bitmap index on first use"""
+    global _tag_index
+    if _tag_index is None:
+        from tag_query import TagIndex
+        store = get_store()
+        _tag_index = TagIndex(store)
+        store.subscribe(_tag_index.on_change)
+    return _tag_index
+
+# Function to get the .rdp file cache
+def get_rdp_files():
+    """Load the .rdp file manifest on first use"""
+    global _rdp_files
+    if _rdp_files is None:
+        from rdp_files import RdpFileCache, RDP_FOLDER
+        _rdp_files = RdpFileCache(RDP_FOLDER)
+    return _rdp_files
+
+# Function to get the reachability cache
+def get_reachability():
+    """Latest reachability results, shared by every view"""
+    global _reachability
+    if _reachability is None:
+        from reachability import ReachabilityCache
+        _reachability = ReachabilityCache()
+    return _reachability
+
+# Function to pick connections with a tag query
+def list_connections(query=None):
+    """Connections matching a tag query such as 'env:prod AND NOT site:lab' (all if blank)"""
+    store = get_store()
+    if not query:
+        return store.all()
+    return [store.get(name) for name in get_tag_index().query(query)]
+
+# Function to look up connections by display name
+def get_connections(names):
+    """Profiles for display names; raises KeyError naming the first unknown one"""
+    store = get_store()
+    connections = []
+    for name in names:
+        conn = store.get(name)
+        if conn is None:
+            raise KeyError(name)
+        connections.append(conn)
+    return connections
+
+# Function to search connections
+def search_connections(term, limit=20, fuzzy=True):
+    """
+    Best matches for a search term as [(profile, score)]. Uses the
+    search index if it's built; otherwise only the profiles containing
+    the term are indexed, which is much quicker than building the index.
+    When nothing contains the term and typos are allowed, the full index
+    is built for the near-match search and kept for later searches.
+    """
+    store = get_store()
+    results = None
+    if _search_index is None:
+        from connection_search import search_once
+        results = search_once(store, term, limit, get_history().stats.usage(), fuzzy=False)
+    if not results and (fuzzy or _search_index is not None):
+        results = get_search_index().search(term, limit, fuzzy)
+    return [(store.get(name), score) for name, score in results]
+
+# Function to add a connection
+def add_connection(display_name, hostname, username='', port='3389', tags=(), group='', notes='',
+                   save=True):
+    """Validate and add a profile; raises ValueError if it's invalid or the name is taken"""
+    from import_export import validate_profile
+    if not display_name.strip():
+        raise ValueError("missing display name")
+    conn = validate_profile({'display_name': display_name, 'hostname': hostname, 'username': username,
+                             'port': port, 'tags': list(tags), 'group': group, 'notes': notes})
+    get_store().add(conn)
+    if save:
+        get_store().save()
+    return conn
+
+# Function to remove connections
+def remove_connections(names, save=True):
+    """Delete profiles by display name; returns (removed profiles, names not found)"""
+    store = get_store()
+    removed, missing = [], []
+    for name in names:
+        if name in store:
+            removed.append(store.remove(name))
+        else:
+            missing.append(name)
+    if removed and save:
+        store.save()
+    return removed, missing
+
+# Function to import connections from a file
+def import_connections(path, measure_memory=False):
+    """Import a backup, CSV, .rdp file/folder or .rdg file; returns the import report"""
+    from import_export import import_profiles
+    return import_profiles(get_store(), path, measure_memory=measure_memory)
+
+# Function to export connections to a file
+def export_connections(path, query=None):
+    """Export all connections (or a tag query's matches); format from the extension"""
+    from import_export import export_profiles
+    return export_profiles(list_connections(query) if query else get_store(), path)
+
+# Function to test connections
+def test_connections(connections, force=True, **options):
+    """Check RDP ports (ping when closed); returns {display name: result}"""
+    from reachability import check_connections
+    return check_connections(connections, get_reachability(), force=force, **options)
+
+# Function to log a connection
+def log_connection(connection_name, hostname):
+    """Append a connection to the history log"""
+    get_history().append(connection_name, hostname)
+    if _search_index is not None:
+        _search_index.record_use(connection_name)
+
+# Function to get a connection's .rdp file
+def rdp_file(name, template=None):
+    """Path of the connection's .rdp file, written first if missing or out of date"""
+    conn = get_connections([name])[0]
+    return get_rdp_files().generate([conn], template)['paths'][conn['display_name']]
+
+# Function to open a connection
+def connect(name, template=None, launcher=None):
+    """
+    Start mstsc with the connection's .rdp file and log the connection.
+    Returns the command; `launcher` gets the argument list instead of
+    subprocess.Popen.
+    """
+    from rdp_files import launch
+    conn = get_connections([name])[0]
+    path = rdp_file(name, template)
+    command = launch(path) if launcher is None else launch(path, launcher)
+    log_connection(conn['display_name'], conn['hostname'])
+    return command
+
+# Function to order connections for picking
+def frequent_first(connections):
+    """Most used recently first (frecency), then the rest in saved order"""
+    stats = get_history().stats
+    now = datetime.now().timestamp()
+    return sorted(connections, key=lambda conn: -stats.frecency_now(conn['display_name'], now))
+
+# Function to save anything kept in memory
+def close():
+    """Save history statistics, if they changed, so the next start doesn't re-read the log"""
+    if _history is not None:
+        _history.save_stats()
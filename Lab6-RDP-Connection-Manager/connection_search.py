@@ -0,0 +1,356 @@
+import heapq
+import math
+import time
+from collections import Counter
+from itertools import islice
+
+# Searched fields and how much a match in each counts
+SEARCH_FIELDS = (('display_name', 4.0), ('hostname', 3.0), ('tags', 2.0), ('notes', 1.0))
+
+# Fields checked for near matches (typos)
+FUZZY_FIELDS = 3
+
+# Function to split text into the index keys of a query or field
+def _grams(text, query=False):
+    """
+    Trigrams of the text. Fields are indexed with a leading space so word
+    starts get their own keys (' w', ' we'), which is how one- and
+    two-letter queries match word prefixes. Longer queries match
+    anywhere, so they use their plain trigrams.
+    """
+    if query:
+        if len(text) < 3:
+            return {' ' + text}
+    else:
+        text = ' ' + text
+    grams = {text[i:i + 3] for i in range(len(text) - 2)}
+    if not query:
+        grams.update(' ' + word[:1] for word in text.split())
+    return grams
+
+# Function to get the keys a mistyped query word shares with the intended word
+def _typo_grams(word):
+    """
+    Trigrams of the word and of each variant with one letter dropped or
+    two neighbouring letters swapped, plus its one- and two-letter word
+    starts, so a typo in the first three letters ('wbe01' for 'web01')
+    still shares keys with the right profiles
+    """
+    variants = {word}
+    variants.update(word[:i] + word[i + 1:] for i in range(len(word)))
+    variants.update(word[:i] + word[i + 1] + word[i] + word[i + 2:] for i in range(len(word) - 1))
+    grams = {' ' + word[:1], ' ' + word[:2]}
+    for variant in variants:
+        if len(variant) >= 3:
+            grams |= _grams(variant, query=True)
+    return grams
+
+# Function to compute edit distance, giving up above `limit`
+def bounded_distance(a, b, limit):
+    """
+    Edit distance between a and b counting a swap of two neighbouring
+    letters as one edit, or limit + 1 once it exceeds limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+# Function to get the typo allowance for a query word
+def _allowed_edits(word):
+    return 0 if len(word) <= 3 else (1 if len(word) <= 6 else 2)
+
+# Function to get the searched text of each field of a profile
+def _field_texts(conn):
+    texts = []
+    for field, _weight in SEARCH_FIELDS:
+        value = conn.get(field) or ''
+        texts.append(' '.join(value).lower() if isinstance(value, list) else str(value).lower())
+    return texts
+
+# Function to run one search without keeping an index
+def search_once(connections, query, limit=10, usage=None, fuzzy=True):
+    """
+    Same results as SearchIndex(connections, usage).search(query), for
+    one-off searches (e.g. from the command line): only profiles that
+    contain the query are indexed, so there's no need to index them all.
+    Falls back to the full index when nothing matches and typo-tolerant
+    matching is needed.
+    """
+    needle = ' '.join(query.lower().split())
+    if not needle:
+        return []
+    connections = list(connections)
+    # One lowercased line per profile; a field can't contain '\n', so a
+    # match never spans two fields
+    matches = [conn for conn in connections if needle in '\n'.join(_field_texts(conn))]
+    index = SearchIndex(matches if matches or not fuzzy else connections, usage)
+    return index.search(query, limit, fuzzy)
+
+# Ranked type-ahead search over connection profiles
+class SearchIndex:
+    """
+    Trigram index over display name, hostname, tags and notes.
+
+    A query's trigrams are looked up per field and the posting sets
+    intersected, so only profiles containing every trigram are checked
+    for the substring itself. Matches rank by field (name before
+    hostname before tag before notes), a bonus for matching at the start
+    of a word, and how often and how recently the connection was used.
+    If nothing contains the query, profiles sharing the most
+    trigrams with the query are checked for near matches in names,
+    hostnames and tags: each query word may have 1 typo (4-6 letters) or
+    2 (longer), a swap of two letters counting as one.
+
+    Follows a ConnectionStore through store.subscribe(index.on_change);
+    `usage` is {display name: (connections, last used)}, e.g. from
+    HistoryStats.usage().
+    """
+    def __init__(self, connections=(), usage=None):
+        self.names = []
+        self.texts = []
+        self.ids = {}
+        self.postings = [{} for _ in SEARCH_FIELDS]
+        self.boost = []
+        self.boosted = set()
+        self._by_boost = None
+        self.usage = usage or {}
+        for conn in connections:
+            self.add(conn)
+
+    def _boost(self, name, now=None):
+        count, last = self.usage.get(name, (0, 0.0))
+        if not count:
+            return 0.0
+        age_days = ((now or time.time()) - last) / 86400
+        return min(math.log1p(count) / 2, 1.5) + 0.5 * math.exp(-max(age_days, 0.0) / 7)
+
+    def _set_boost(self, doc, boost):
+        self.boost[doc] = boost
+        self._by_boost = None
+        if boost:
+            self.boosted.add(doc)
+        else:
+            self.boosted.discard(doc)
+
+    def set_usage(self, usage):
+        """Replace the usage counts used to boost frequent and recent connections"""
+        self.usage = usage
+        now = time.time()
+        for doc, name in enumerate(self.names):
+            self._set_boost(doc, self._boost(name, now) if name is not None else 0.0)
+
+    def record_use(self, name, when=None):
+        """Count one more use of a connection"""
+        when = when or time.time()
+        count, last = self.usage.get(name, (0, 0.0))
+        self.usage[name] = (count + 1, max(last, when))
+        doc = self.ids.get(name)
+        if doc is not None:
+            self._set_boost(doc, self._boost(name))
+
+    def add(self, conn):
+        if conn['display_name'] in self.ids:
+            self.remove(conn['display_name'])
+        doc = len(self.names)
+        fields = _field_texts(conn)
+        for text, postings in zip(fields, self.postings):
+            for gram in _grams(text) if text else ():
+                postings.setdefault(gram, set()).add(doc)
+        self.ids[conn['display_name']] = doc
+        self.names.append(conn['display_name'])
+        self.texts.append(tuple(fields))
+        self.boost.append(0.0)
+        self._set_boost(doc, self._boost(conn['display_name']))
+
+    def remove(self, name):
+        doc = self.ids.pop(name, None)
+        if doc is None:
+            return
+        for text, postings in zip(self.texts[doc], self.postings):
+            for gram in _grams(text) if text else ():
+                docs = postings.get(gram)
+                if docs is not None:
+                    docs.discard(doc)
+                    if not docs:
+                        del postings[gram]
+        self.names[doc] = None
+        self.texts[doc] = ('', '', '', '')
+        self._set_boost(doc, 0.0)
+
+    def on_change(self, event, conn):
+        """ConnectionStore subscriber"""
+        if event == 'add':
+            self.add(conn)
+        elif event == 'remove':
+            self.remove(conn['display_name'])
+
+    def _candidates(self, field, grams):
+        # Profiles holding every gram in this field (a superset of the matches)
+        postings = self.postings[field]
+        sets = [postings.get(gram) for gram in grams]
+        if not all(sets):
+            return set()
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def _exact(self, query, limit):
+        """
+        Score substring matches. A match's score is one of a few levels
+        (field weight, +0.5 at a word start) plus its usage boost, so
+        boosted profiles are checked in boost order until none left can
+        reach the top `limit`, and the rest are taken level by level,
+        best first, until `limit` of them are found.
+        """
+        prefix = ' ' + query
+        levels = []
+        for field, (_name, weight) in enumerate(SEARCH_FIELDS):
+            docs = self._candidates(field, _grams(query, query=True))
+            if docs:
+                starts = self._candidates(field, _grams(prefix, query=True)) if len(query) >= 2 else docs
+                levels.append((weight + 0.5, field, starts, True))
+                levels.append((weight, field, docs, False))
+        levels.sort(key=lambda level: -level[0])
+        texts = self.texts
+
+        def matches(doc, field, at_start):
+            text = texts[doc][field]
+            if at_start:
+                return text.startswith(query) or prefix in text
+            return query in text
+
+        # Boosted profiles, most boosted first, until even the best level
+        # plus the next boost can't make the top `limit`
+        if sum(len(level[2]) for level in levels) < len(self.boosted):
+            matched = set().union(*(level[2] for level in levels)) & self.boosted
+            order = sorted(matched, key=self.boost.__getitem__, reverse=True)
+        else:
+            if self._by_boost is None:
+                self._by_boost = sorted(self.boosted, key=self.boost.__getitem__, reverse=True)
+            order = self._by_boost
+        scores = {}
+        best = []
+        top = levels[0][0] if levels else 0.0
+        for doc in order:
+            boost = self.boost[doc]
+            if len(best) >= limit and top + boost <= best[0]:
+                break
+            for level, field, docs, at_start in levels:
+                if doc in docs and matches(doc, field, at_start):
+                    scores[doc] = level
+                    if len(best) < limit:
+                        heapq.heappush(best, level + boost)
+                    else:
+                        heapq.heappushpop(best, level + boost)
+                    break
+        found = 0
+        for level, field, docs, at_start in levels:
+            if found >= limit:
+                break
+            for doc in docs:
+                if doc not in scores and doc not in self.boosted and matches(doc, field, at_start):
+                    scores[doc] = level
+                    found += 1
+                    if found >= limit:
+                        break
+        if len(query) < 3 and len(scores) < limit:
+            self._scan(query, scores)
+        return scores
+
+    def _scan(self, query, scores):
+        # One- and two-letter queries only have word-start keys, which miss
+        # 'dc' in 'nyc-dc-01' or '10' in '192.168.1.100'; when those don't
+        # fill the page, every profile is checked for the substring
+        for doc, fields in enumerate(self.texts):
+            if doc in scores:
+                continue
+            for (_name, weight), text in zip(SEARCH_FIELDS, fields):
+                if query in text:
+                    scores[doc] = weight
+                    break
+
+    def _near(self, query_words, text, cache):
+        # Every query word must be close to (a prefix of) some word in text
+        total = 0
+        for word in query_words:
+            limit = _allowed_edits(word)
+            best = limit + 1
+            for candidate in text.split():
+                key = (word, candidate)
+                distance = cache.get(key)
+                if distance is None:
+                    if candidate.startswith(word):
+                        distance = 0
+                    else:
+                        distance = min(bounded_distance(word, candidate, limit),
+                                       bounded_distance(word, candidate[:len(word)], limit))
+                    cache[key] = distance
+                if distance < best:
+                    best = distance
+                    if not best:
+                        break
+            if best > limit:
+                return None
+            total += best
+        return total
+
+    def _fuzzy(self, query, scores, limit, candidates=300, budget=20000):
+        query_words = query.split()
+        grams = set()
+        for word in query_words:
+            grams |= _typo_grams(word)
+        overlap = Counter()
+        for postings in self.postings[:FUZZY_FIELDS]:
+            found = sorted((postings[gram] for gram in grams if gram in postings), key=len)
+            spent = 0
+            for docs in found:
+                # Rarest keys first; the commonest say the least and cost the
+                # most, so past the budget only part of a key is counted
+                if spent + len(docs) > budget:
+                    if not spent:
+                        overlap.update(islice(docs, budget))
+                    break
+                spent += len(docs)
+                overlap.update(docs)
+        # Most shared keys first; stop once enough near matches are found
+        cache = {}
+        found = 0
+        for doc, _shared in overlap.most_common(candidates):
+            if doc in scores:
+                continue
+            best = None
+            for field in range(FUZZY_FIELDS):
+                distance = self._near(query_words, self.texts[doc][field], cache)
+                if distance is not None:
+                    score = SEARCH_FIELDS[field][1] / 2 - 0.25 * distance
+                    best = score if best is None else max(best, score)
+            if best is not None:
+                scores[doc] = best
+                found += 1
+                if found >= limit:
+                    break
+
+    def search(self, query, limit=10, fuzzy=True):
+        """Return up to `limit` (display name, score) pairs, best first"""
+        query = ' '.join(query.lower().split())
+        if not query:
+            return []
+        scores = self._exact(query, limit)
+        if fuzzy and not scores and len(query) >= 4:
+            self._fuzzy(query, scores, limit)
+        boost = self.boost
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1] + boost[item[0]])
+        return [(self.names[doc], round(score + boost[doc], 2)) for doc, score in best]
+
+    def __len__(self):
+        return len(self.ids)
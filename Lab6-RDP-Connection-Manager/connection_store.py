@@ -0,0 +1,144 @@
+import json
+import os
+import stat
+import tempfile
+
+# Database file for connections
+CONNECTIONS_FILE = "rdp_connections.json"
+
+# Saved connection profiles, loaded once and indexed in memory
+class ConnectionStore:
+    """
+    Keeps every profile in a dict keyed by display name, with indexes
+    from hostname and from tag to display names, so lookups and
+    duplicate checks don't scan the whole list.
+
+    The file is read once. save() writes a temporary file next to it and
+    renames it over the original, so a crash mid-save never leaves a
+    truncated connections file. Profiles keep the order they were added.
+    Subscribers are told about every profile added or removed.
+    """
+    def __init__(self, path=CONNECTIONS_FILE):
+        self.path = path
+        self.connections = {}
+        self.by_host = {}
+        self.by_tag = {}
+        self._subscribers = []
+        self.load()
+
+    def subscribe(self, callback):
+        """Call `callback(event, conn)` on every change ('add', 'remove', or 'reload' with None)"""
+        self._subscribers.append(callback)
+
+    def load(self):
+        """(Re)read the connections file"""
+        self.connections = {}
+        self.by_host = {}
+        self.by_tag = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                for conn in json.load(f):
+                    self._index(conn)
+        for callback in self._subscribers:
+            callback('reload', None)
+
+    def _index(self, conn):
+        name = conn['display_name']
+        self.connections[name] = conn
+        self.by_host.setdefault(conn['hostname'].lower(), set()).add(name)
+        for tag in conn.get('tags') or ():
+            self.by_tag.setdefault(tag.lower(), set()).add(name)
+        for callback in self._subscribers:
+            callback('add', conn)
+
+    def _unindex(self, conn):
+        name = conn['display_name']
+        del self.connections[name]
+        for index, key in [(self.by_host, conn['hostname'].lower())] + \
+                          [(self.by_tag, tag.lower()) for tag in conn.get('tags') or ()]:
+            names = index.get(key)
+            if names is not None:
+                names.discard(name)
+                if not names:
+                    del index[key]
+        for callback in self._subscribers:
+            callback('remove', conn)
+
+    def __len__(self):
+        return len(self.connections)
+
+    def __iter__(self):
+        return iter(self.connections.values())
+
+    def __contains__(self, name):
+        return name in self.connections
+
+    def get(self, name):
+        return self.connections.get(name)
+
+    def all(self):
+        """Every profile, in the order they were added"""
+        return list(self.connections.values())
+
+    def add(self, conn):
+        """Add a profile; raises ValueError if the display name is taken"""
+        if conn['display_name'] in self.connections:
+            raise ValueError(f"Connection '{conn['display_name']}' already exists!")
+        self._index(conn)
+
+    def add_many(self, conns):
+        """Add profiles, skipping taken display names; returns (added, skipped names)"""
+        added, skipped = 0, []
+        for conn in conns:
+            if conn['display_name'] in self.connections:
+                skipped.append(conn['display_name'])
+            else:
+                self._index(conn)
+                added += 1
+        return added, skipped
+
+    def update(self, name, **fields):
+        """Change fields of a profile (including its display name)"""
+        conn = self.connections.get(name)
+        if conn is None:
+            raise KeyError(name)
+        new_name = fields.get('display_name', name)
+        if new_name != name and new_name in self.connections:
+            raise ValueError(f"Connection '{new_name}' already exists!")
+        self._unindex(conn)
+        conn.update(fields)
+        self._index(conn)
+        return conn
+
+    def remove(self, name):
+        """Delete a profile and return it"""
+        conn = self.connections.get(name)
+        if conn is None:
+            raise KeyError(name)
+        self._unindex(conn)
+        return conn
+
+    def find_host(self, hostname):
+        """Profiles for a hostname or IP (case-insensitive)"""
+        return [self.connections[n] for n in self.by_host.get(hostname.lower(), ())]
+
+    def with_tag(self, tag):
+        """Profiles carrying a tag (case-insensitive)"""
+        return [self.connections[n] for n in self.by_tag.get(tag.lower(), ())]
+
+    def save(self):
+        """Write every profile to the file atomically"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.rdp_connections_', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.all(), f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates the file owner-only; keep the original's mode
+            if os.path.exists(self.path):
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(self.path).st_mode))
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,313 @@
+import getpass
+import json
+import os
+import time
+from collections import Counter
+from datetime import datetime
+
+# Connection history log (one JSON object per line)
+HISTORY_LOG = "connection_history.jsonl"
+
+# History file used before the log (a JSON list, imported once)
+LEGACY_HISTORY_FILE = "connection_history.json"
+
+# Start a new log file once the current one reaches this size
+HISTORY_ROTATE_BYTES = 16 * 1024 * 1024
+
+# Half-life (days) of a connection's frecency score
+FRECENCY_HALF_LIFE = 14
+
+_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_decode = json.JSONDecoder().decode
+
+# Local start of the hour (epoch seconds), hour and weekday per hour seen
+_hours = {}
+
+# Function to read a history timestamp quickly
+def _parse_time(text):
+    """
+    Return (epoch seconds, hour, weekday) for 'YYYY-MM-DD HH:MM:SS'.
+    strptime is slow enough to dominate a full history scan, so each
+    hour is parsed once and the minutes and seconds added to it. Clocks
+    change on the hour, so this stays right on daylight saving days.
+    """
+    start = _hours.get(text[:13])
+    if start is None:
+        when = datetime.strptime(text[:13], '%Y-%m-%d %H')
+        start = _hours[text[:13]] = (when.timestamp(), when.hour, when.weekday())
+    minute, second = int(text[14:16]), int(text[17:19])
+    if len(text) != 19 or minute > 59 or second > 59:
+        raise ValueError(f"Invalid timestamp {text!r}")
+    return start[0] + minute * 60 + second, start[1], start[2]
+
+# Function to get the current user name for history entries
+def current_user():
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return os.environ.get('USERNAME', 'unknown')
+
+# Usage analytics built one history entry at a time
+class HistoryStats:
+    """
+    Counts kept up to date per entry (constant time each), so reading
+    them never means scanning the history:
+
+    counts      - connections per display name
+    last_used   - most recent use (epoch seconds) per display name
+    frecency    - uses decayed with a FRECENCY_HALF_LIFE-day half-life,
+                  so a server used daily this week outranks one used a
+                  lot last year
+    users       - connections per user, and per user per display name
+    hours/days  - connections per hour of day and day of week (0 = Monday)
+    """
+    def __init__(self):
+        self.total = 0
+        self.counts = Counter()
+        self.last_used = {}
+        self.frecency = {}
+        self.users = Counter()
+        self.user_counts = {}
+        self.hours = [0] * 24
+        self.days = [0] * 7
+
+    def add(self, entry):
+        try:
+            stamp, hour, weekday = _parse_time(entry['timestamp'])
+            name = entry['connection_name']
+        except (KeyError, TypeError, ValueError):
+            return
+        user = entry.get('user') or 'unknown'
+        self.total += 1
+        self.counts[name] += 1
+        self.users[user] += 1
+        per_user = self.user_counts.get(user)
+        if per_user is None:
+            per_user = self.user_counts[user] = Counter()
+        per_user[name] += 1
+        self.hours[hour] += 1
+        self.days[weekday] += 1
+        # Decay the old score to this entry's time (entries may be slightly out of order)
+        last = self.last_used.get(name)
+        score = self.frecency.get(name, 0.0)
+        if last is not None and stamp >= last:
+            score *= 0.5 ** ((stamp - last) / (FRECENCY_HALF_LIFE * 86400))
+        self.frecency[name] = score + 1.0
+        if last is None or stamp > last:
+            self.last_used[name] = stamp
+
+    def frecency_now(self, name, now=None):
+        last = self.last_used.get(name)
+        if last is None:
+            return 0.0
+        age = max(0.0, (now or time.time()) - last)
+        return self.frecency[name] * 0.5 ** (age / (FRECENCY_HALF_LIFE * 86400))
+
+    def most_used(self, n=10, user=None):
+        """[(display name, connections)] for everyone or one user"""
+        counts = self.counts if user is None else self.user_counts.get(user, Counter())
+        return counts.most_common(n)
+
+    def most_recent(self, n=10):
+        """[(display name, last used epoch seconds)], newest first"""
+        return sorted(self.last_used.items(), key=lambda item: -item[1])[:n]
+
+    def usage(self):
+        """{display name: (connections, last used)} for search ranking"""
+        return {name: (count, self.last_used[name]) for name, count in self.counts.items()}
+
+    def busiest_hours(self, n=3):
+        return [hour for hour in sorted(range(24), key=lambda hour: -self.hours[hour])
+                if self.hours[hour]][:n]
+
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'counts': dict(self.counts),
+            'last_used': self.last_used,
+            'frecency': self.frecency,
+            'users': dict(self.users),
+            'user_counts': {user: dict(counts) for user, counts in self.user_counts.items()},
+            'hours': self.hours,
+            'days': self.days
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.total = data['total']
+        stats.counts = Counter(data['counts'])
+        stats.last_used = data['last_used']
+        stats.frecency = data['frecency']
+        stats.users = Counter(data['users'])
+        stats.user_counts = {user: Counter(counts) for user, counts in data['user_counts'].items()}
+        stats.hours = data['hours']
+        stats.days = data['days']
+        return stats
+
+# Append-only connection history
+class HistoryLog:
+    """
+    Each connection is one line appended to connection_history.jsonl, so
+    logging costs the same with ten entries or ten million and nothing
+    is ever dropped. When the file passes HISTORY_ROTATE_BYTES it is
+    renamed to connection_history.000001.jsonl (then 000002, ...) and a
+    new one started.
+
+    Statistics are saved with the position they cover
+    (connection_history.stats.json); loading reads only the entries
+    logged after that point.
+    """
+    def __init__(self, path=HISTORY_LOG, rotate_bytes=HISTORY_ROTATE_BYTES):
+        self.path = path
+        self.rotate_bytes = rotate_bytes
+        base, ext = os.path.splitext(path)
+        self._segment_format = base + '.{:06d}' + ext
+        self.stats_path = base + '.stats.json'
+        self.stats = HistoryStats()
+        self._position = (0, 0)
+        self._saved_position = None
+        self._migrate()
+        self.load_stats()
+
+    def _migrate(self):
+        # Bring entries over from the old JSON list file once
+        if os.path.exists(self.path) or not os.path.exists(LEGACY_HISTORY_FILE):
+            return
+        with open(LEGACY_HISTORY_FILE, 'r') as f:
+            entries = json.load(f)
+        with open(self.path, 'a') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+        os.replace(LEGACY_HISTORY_FILE, LEGACY_HISTORY_FILE + '.migrated')
+
+    def segments(self):
+        """Rotated log files, oldest first"""
+        segments = []
+        number = 1
+        while os.path.exists(self._segment_format.format(number)):
+            segments.append(self._segment_format.format(number))
+            number += 1
+        return segments
+
+    def append(self, connection_name, hostname, user=None, when=None):
+        """Log one connection and update the statistics"""
+        entry = {
+            'connection_name': connection_name,
+            'hostname': hostname,
+            'user': user or current_user(),
+            'timestamp': (when or datetime.now()).strftime(_TIME_FORMAT)
+        }
+        with open(self.path, 'a') as f:
+            if f.tell() > self._position[1]:
+                # Another process logged since we last read; count those first
+                self._read_from(self.path, self._position[1])
+            f.write(json.dumps(entry) + '\n')
+            size = f.tell()
+        self.stats.add(entry)
+        self._position = (self._position[0], size)
+        if size >= self.rotate_bytes:
+            self.rotate()
+        return entry
+
+    def rotate(self):
+        """Move the current log to the next numbered file"""
+        if not os.path.exists(self.path):
+            return
+        done = len(self.segments())
+        os.replace(self.path, self._segment_format.format(done + 1))
+        if self._position[0] == done:
+            self._position = (done + 1, 0)
+
+    def _read_from(self, filename, offset):
+        with open(filename, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Partly written line: leave it for the next read
+                    break
+                offset += len(line)
+                try:
+                    self.stats.add(_decode(line.decode('utf-8')))
+                except ValueError:
+                    pass
+        return offset
+
+    def load_stats(self):
+        """Load saved statistics and add entries logged since they were saved"""
+        self.stats = HistoryStats()
+        self._position = self._saved_position = (0, 0)
+        if os.path.exists(self.stats_path):
+            try:
+                with open(self.stats_path, 'r') as f:
+                    saved = json.load(f)
+                self.stats = HistoryStats.from_dict(saved['stats'])
+                self._position = self._saved_position = tuple(saved['position'])
+            except (OSError, ValueError, KeyError):
+                # Unreadable: rebuilt from the log and written again
+                self.stats, self._position, self._saved_position = HistoryStats(), (0, 0), None
+        done, offset = self._position
+        segments = self.segments()
+        for number in range(done + 1, len(segments) + 1):
+            self._read_from(segments[number - 1], offset)
+            done, offset = number, 0
+        if os.path.exists(self.path):
+            offset = self._read_from(self.path, offset)
+        self._position = (done, offset)
+        return self.stats
+
+    def save_stats(self):
+        """
+        Save statistics with the log position they cover. Nothing is
+        written when no entries were read or logged since the last save.
+        """
+        if self._position == self._saved_position:
+            return
+        tmp_path = self.stats_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'position': list(self._position), 'stats': self.stats.to_dict()}, f)
+        os.replace(tmp_path, self.stats_path)
+        self._saved_position = self._position
+
+    def entries(self):
+        """Every entry, oldest first"""
+        for filename in self.segments() + [self.path]:
+            if not os.path.exists(filename):
+                continue
+            with open(filename, 'r') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def recent(self, n=20):
+        """The last n entries, newest first, read from the end of the log"""
+        lines = []
+        for filename in [self.path] + self.segments()[::-1]:
+            if not os.path.exists(filename):
+                continue
+            with open(filename, 'rb') as f:
+                end = f.seek(0, os.SEEK_END)
+                block = 8192
+                while True:
+                    start = max(0, end - block)
+                    f.seek(start)
+                    chunk = f.read(end - start).splitlines()
+                    if start == 0 or len(chunk) > n - len(lines):
+                        break
+                    block *= 4
+            if start > 0:
+                # The first line of the chunk may be cut off
+                chunk = chunk[1:]
+            lines.extend(reversed(chunk))
+            if len(lines) >= n:
+                break
+        recent = []
+        for line in lines[:n]:
+            try:
+                recent.append(json.loads(line))
+            except ValueError:
+                continue
+        return recent
@@ -0,0 +1,427 @@
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+# Profiles handed to the store at a time
+IMPORT_BATCH_SIZE = 5000
+
+# CSV column names accepted for each profile field (compared lowercase)
+CSV_COLUMNS = {
+    'display_name': ('display_name', 'display name', 'name', 'server name', 'ci name', 'asset name'),
+    'hostname': ('hostname', 'host', 'fqdn', 'dns name', 'ip', 'ip address', 'address'),
+    'username': ('username', 'user', 'user name', 'login', 'account'),
+    'port': ('port', 'rdp port'),
+    'tags': ('tags', 'tag', 'environment', 'env', 'role', 'category'),
+    'notes': ('notes', 'description', 'comments', 'comment'),
+    'group': ('group', 'group path', 'hierarchy'),
+    'created': ('created', 'created date'),
+}
+
+_HOSTNAME = re.compile(r'^[A-Za-z0-9_.:\[\]-]+$')
+_CONTROL = re.compile(r'[\x00-\x1f\x7f]')
+
+# Function to read a text field of an imported profile
+def _text(field, value):
+    # Line breaks would end up in .rdp files and CSV exports as lines of their own
+    value = '' if value is None else str(value).strip()
+    if _CONTROL.search(value):
+        raise ValueError(f"control character in {field} {value!r}")
+    return value
+
+# Function to check and normalize one imported profile
+def validate_profile(conn, created=None):
+    """Return a clean profile or raise ValueError saying what's wrong"""
+    hostname = str(conn.get('hostname') or '').strip()
+    if not hostname:
+        raise ValueError("missing hostname")
+    if not _HOSTNAME.match(hostname):
+        raise ValueError(f"invalid hostname {hostname!r}")
+    port = _text('port', conn.get('port') or '3389')
+    if not port.isdigit() or not 1 <= int(port) <= 65535:
+        raise ValueError(f"invalid port {port!r}")
+    tags = conn.get('tags') or []
+    if isinstance(tags, str):
+        tags = tags.replace(';', ',').split(',')
+    return {
+        'display_name': _text('display_name', conn.get('display_name') or hostname),
+        'hostname': hostname,
+        'username': _text('username', conn.get('username')),
+        'port': port,
+        'tags': [tag for tag in (_text('tag', tag) for tag in tags) if tag],
+        'notes': _text('notes', conn.get('notes')),
+        'group': '/'.join(part.strip() for part in _text('group', conn.get('group')).split('/') if part.strip()),
+        'created': conn.get('created') or created or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+# Function to hash the server a profile points at
+def target_hash(conn):
+    """8-byte digest of hostname, port and username (case-insensitive host)"""
+    key = f"{conn['hostname'].lower()}\0{conn.get('port') or '3389'}\0{conn.get('username') or ''}"
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+
+# Function to read a JSON backup (a list of profiles)
+def read_json(path, chunk_size=64 * 1024):
+    """
+    Decode the list one profile at a time from a buffer refilled in
+    chunks, so memory grows with one profile, not with the file
+    """
+    decode = json.JSONDecoder().raw_decode
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer, pos, eof = '', 0, False
+
+        def more():
+            # Drop what's been read and append the next chunk
+            nonlocal buffer, pos, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+
+        def next_char():
+            # First character that isn't whitespace ('' at the end of the file)
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return buffer[pos:pos + 1]
+                more()
+
+        if next_char() != '[':
+            raise ValueError("Invalid backup file format!")
+        pos += 1
+        first = True
+        while True:
+            char = next_char()
+            if char == ']' and first:
+                return
+            if not first:
+                if char == ']':
+                    return
+                if char != ',':
+                    raise ValueError(f"Expected ',' or ']' in {path}, found {char or 'end of file'!r}")
+                pos += 1
+                next_char()
+            # A value may run past the buffer: read on until it decodes
+            # and doesn't end right at the buffer's end
+            while True:
+                try:
+                    value, end = decode(buffer, pos)
+                except ValueError:
+                    if eof:
+                        raise
+                    more()
+                    continue
+                if end < len(buffer) or eof:
+                    break
+                more()
+            pos = end
+            first = False
+            yield value
+
+# Function to read JSON Lines (one profile per line)
+def read_jsonl(path):
+    """A line that isn't valid JSON is yielded as a ValueError (counted invalid), not raised"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    yield ValueError(f"line {number}: {e}")
+
+# Function to read a CMDB-style CSV export
+def read_csv(path):
+    """Columns are matched by common names (see CSV_COLUMNS)"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower() for name in next(reader, [])]
+        columns = {}
+        for field, aliases in CSV_COLUMNS.items():
+            matches = [i for i, name in enumerate(header) if name in aliases]
+            if matches:
+                columns[field] = matches
+        if 'hostname' not in columns:
+            raise ValueError(f"No hostname column in {path} (expected one of {CSV_COLUMNS['hostname']})")
+        for row in reader:
+            conn = {}
+            for field, indexes in columns.items():
+                values = [row[i].strip() for i in indexes if i < len(row) and row[i].strip()]
+                if field == 'tags':
+                    conn['tags'] = ','.join(values)
+                elif values:
+                    conn[field] = values[0]
+            yield conn
+
+# Function to read one .rdp file
+def parse_rdp(path):
+    """Profile from 'full address', 'username' and 'server port' settings"""
+    settings = {}
+    with open(path, 'rb') as f:
+        raw = f.read()
+    # mstsc saves .rdp files as UTF-16
+    text = raw.decode('utf-16') if raw.startswith((b'\xff\xfe', b'\xfe\xff')) else raw.decode('utf-8', 'replace')
+    for line in text.splitlines():
+        parts = line.split(':', 2)
+        if len(parts) == 3:
+            settings[parts[0].strip().lower()] = parts[2].strip()
+    address = settings.get('full address', '')
+    port = settings.get('server port')
+    if address.count(':') == 1:
+        address, port = address.split(':')
+    return {
+        'display_name': os.path.splitext(os.path.basename(path))[0],
+        'hostname': address,
+        'username': settings.get('username', ''),
+        'port': port or '3389',
+        'notes': f"Imported from {os.path.basename(path)}"
+    }
+
+# Function to read .rdp files (one file or a folder of them)
+def read_rdp(path):
+    if os.path.isdir(path):
+        for entry in sorted(os.scandir(path), key=lambda e: e.name):
+            if entry.name.lower().endswith('.rdp') and entry.is_file():
+                yield parse_rdp(entry.path)
+    else:
+        yield parse_rdp(path)
+
+# Function to read a Remote Desktop Connection Manager (.rdg) file
+def read_rdg(path):
+    """
+    Stream servers out of an RDCMan file with iterparse; each server is
+    freed as soon as it has been read, so memory stays flat however
+    large the file is. Group names become tags, and the nesting becomes
+    the profile's group path (e.g. prod/nyc/web).
+    """
+    groups = []
+    open_elements = []
+    server = None
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            open_elements.append(element)
+            if tag == 'group':
+                groups.append(None)
+            elif tag == 'server':
+                server = {}
+            continue
+        open_elements.pop()
+        if server is not None and tag != 'server':
+            # Collect (parent, tag) -> text, e.g. ('properties', 'name')
+            if element.text and element.text.strip():
+                server[(open_elements[-1].tag, tag)] = element.text.strip()
+        elif tag == 'name' and groups and groups[-1] is None:
+            # First name inside a group is the group's own name
+            groups[-1] = (element.text or '').strip()
+        elif tag == 'server':
+            hostname = server.get(('properties', 'name')) or server.get(('server', 'name'), '')
+            yield {
+                'display_name': (server.get(('properties', 'displayName'))
+                                 or server.get(('server', 'displayName')) or hostname),
+                'hostname': hostname,
+                'username': server.get(('logonCredentials', 'userName'), ''),
+                'port': server.get(('connectionSettings', 'port'), '3389'),
+                'tags': [group for group in groups if group],
+                'group': '/'.join(group for group in groups if group),
+                'notes': server.get(('properties', 'comment')) or server.get(('server', 'comment'), '')
+            }
+            server = None
+            # Drop the server and anything before it from its parent, or a
+            # group of 100k servers would keep 100k empty elements alive
+            del open_elements[-1][:]
+        elif tag == 'group':
+            groups.pop()
+            if open_elements:
+                del open_elements[-1][:]
+
+READERS = {'.json': read_json, '.jsonl': read_jsonl, '.csv': read_csv, '.rdp': read_rdp, '.rdg': read_rdg}
+
+# Function to pick a reader from the file name
+def reader_for(path):
+    if os.path.isdir(path):
+        return read_rdp
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in READERS:
+        raise ValueError(f"Unsupported file type '{ext}' (use {', '.join(READERS)} or a folder of .rdp files)")
+    return READERS[ext]
+
+# Function to import profiles into a store
+def import_profiles(store, path, batch_size=IMPORT_BATCH_SIZE, measure_memory=False, save=True):
+    """
+    Stream profiles from `path`, validate them and add them to the store
+    in batches, then save once. A profile is skipped if its display name
+    is taken or it points at the same host, port and user as one already
+    present (checked against a set of 8-byte hashes). Returns a report
+    dict with counts, the first errors, elapsed time and rate.
+
+    If the file itself can't be read to the end (truncated XML, bad
+    encoding, a JSON backup that doesn't parse), the import is all or
+    nothing: profiles already added are removed again, nothing is
+    saved, and the report's 'aborted' says why. Only an unsupported
+    file type raises (ValueError).
+    """
+    reader = reader_for(path)
+    if measure_memory:
+        tracemalloc.start()
+    try:
+        started = time.perf_counter()
+        seen = {target_hash(conn) for conn in store}
+        report = {'read': 0, 'added': 0, 'duplicates': 0, 'invalid': 0, 'errors': [], 'aborted': None}
+        batch = []
+        added_names = []
+        created = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        def invalid(message):
+            report['invalid'] += 1
+            if len(report['errors']) < 20:
+                report['errors'].append(f"entry {report['read']}: {message}")
+
+        def flush():
+            added, skipped = store.add_many(batch)
+            skipped = set(skipped)
+            added_names.extend(conn['display_name'] for conn in batch if conn['display_name'] not in skipped)
+            report['added'] += added
+            report['duplicates'] += len(skipped)
+            batch.clear()
+
+        try:
+            for raw in reader(path):
+                report['read'] += 1
+                if isinstance(raw, ValueError):
+                    invalid(raw)
+                    continue
+                try:
+                    conn = validate_profile(raw, created)
+                except (ValueError, AttributeError) as e:
+                    invalid(e)
+                    continue
+                digest = target_hash(conn)
+                if digest in seen:
+                    report['duplicates'] += 1
+                    continue
+                seen.add(digest)
+                batch.append(conn)
+                if len(batch) >= batch_size:
+                    flush()
+            flush()
+        # SyntaxError covers xml.etree's ParseError; UnicodeDecodeError
+        # and JSON errors are ValueErrors
+        except (OSError, ValueError, SyntaxError, csv.Error) as e:
+            for name in added_names:
+                store.remove(name)
+            report['aborted'] = f"{type(e).__name__} after {report['read']} entries: {e}"
+            report['added'] = 0
+        if save and report['added']:
+            store.save()
+
+        report['seconds'] = round(time.perf_counter() - started, 3)
+        report['per_second'] = round(report['read'] / report['seconds']) if report['seconds'] else None
+        if measure_memory:
+            report['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024**2, 1)
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+    return report
+
+# Function to write profiles as a JSON list
+def write_json(connections, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for i, conn in enumerate(connections):
+            f.write((',\n    ' if i else '\n    ') + json.dumps(conn))
+        f.write('\n]\n')
+
+# Function to write profiles as JSON Lines
+def write_jsonl(connections, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for conn in connections:
+            f.write(json.dumps(conn) + '\n')
+
+# Function to write profiles as CSV
+def write_csv(connections, path):
+    fields = ['display_name', 'hostname', 'username', 'port', 'tags', 'group', 'notes', 'created']
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for conn in connections:
+            writer.writerow([';'.join(conn.get('tags') or ()) if field == 'tags' else conn.get(field, '')
+                             for field in fields])
+
+# Function to write one server element of an .rdg file
+def _write_server(f, conn, indent):
+    pad = ' ' * indent
+    f.write(f'{pad}<server>\n{pad}  <properties>\n'
+            f'{pad}    <displayName>{escape(conn["display_name"])}</displayName>\n'
+            f'{pad}    <name>{escape(conn["hostname"])}</name>\n')
+    if conn.get('notes'):
+        f.write(f'{pad}    <comment>{escape(conn["notes"])}</comment>\n')
+    f.write(f'{pad}  </properties>\n')
+    if conn.get('username'):
+        f.write(f'{pad}  <logonCredentials inherit="None">\n'
+                f'{pad}    <userName>{escape(conn["username"])}</userName>\n'
+                f'{pad}  </logonCredentials>\n')
+    if str(conn.get('port') or '3389') != '3389':
+        f.write(f'{pad}  <connectionSettings inherit="None">\n'
+                f'{pad}    <port>{escape(str(conn["port"]))}</port>\n'
+                f'{pad}  </connectionSettings>\n')
+    f.write(f'{pad}</server>\n')
+
+# Function to write a group and the groups inside it to an .rdg file
+def _write_group(f, name, node, indent):
+    pad = ' ' * indent
+    f.write(f'{pad}<group>\n{pad}  <properties>\n{pad}    <name>{escape(name)}</name>\n{pad}  </properties>\n')
+    for conn in node['servers']:
+        _write_server(f, conn, indent + 2)
+    for child, child_node in node['groups'].items():
+        _write_group(f, child, child_node, indent + 2)
+    f.write(f'{pad}</group>\n')
+
+# Function to write profiles as an RDCMan (.rdg) file
+def write_rdg(connections, path):
+    """
+    Servers nested by their group path (prod/nyc/web becomes three
+    groups), or grouped by their first tag if they have no group
+    """
+    tree = {'servers': [], 'groups': {}}
+    for conn in connections:
+        path_parts = [part for part in (conn.get('group') or '').split('/') if part.strip()]
+        if not path_parts and conn.get('tags'):
+            path_parts = conn['tags'][:1]
+        node = tree
+        for part in path_parts:
+            node = node['groups'].setdefault(part.strip(), {'servers': [], 'groups': {}})
+        node['servers'].append(conn)
+    name = escape(os.path.splitext(os.path.basename(path))[0])
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<RDCMan programVersion="2.7" schemaVersion="3">\n')
+        f.write(f'  <file>\n    <properties>\n      <name>{name}</name>\n    </properties>\n')
+        for conn in tree['servers']:
+            _write_server(f, conn, 4)
+        for group, node in tree['groups'].items():
+            _write_group(f, group, node, 4)
+        f.write('  </file>\n</RDCMan>\n')
+
+WRITERS = {'.json': write_json, '.jsonl': write_jsonl, '.csv': write_csv, '.rdg': write_rdg}
+
+# Function to export profiles to a file
+def export_profiles(connections, path):
+    """Write profiles in the format given by the file extension; returns the count"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in WRITERS:
+        raise ValueError(f"Unsupported export type '{ext}' (use {', '.join(WRITERS)})")
+    count = 0
+
+    def counted():
+        nonlocal count
+        for conn in connections:
+            count += 1
+            yield conn
+    WRITERS[ext](counted(), path)
+    return count
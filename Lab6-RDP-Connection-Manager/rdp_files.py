@@ -0,0 +1,271 @@
+import hashlib
+import json
+import os
+import re
+import subprocess
+
+# Folder generated .rdp files are written to
+RDP_FOLDER = "rdp_files"
+
+# Folder of extra templates (.rdp files whose values may use {hostname} etc.)
+TEMPLATE_FOLDER = "rdp_templates"
+
+# Built-in templates: .rdp settings as (name, type, value); {field} is
+# replaced with the profile's value
+TEMPLATES = {
+    'default': [
+        ('full address', 's', '{hostname}:{port}'),
+        ('username', 's', '{username}'),
+        ('screen mode id', 'i', '2'),
+        ('use multimon', 'i', '0'),
+        ('session bpp', 'i', '32'),
+        ('audiomode', 'i', '0'),
+        ('redirectclipboard', 'i', '1'),
+        ('redirectprinters', 'i', '0'),
+        ('autoreconnection enabled', 'i', '1'),
+        ('authentication level', 'i', '2'),
+        ('prompt for credentials', 'i', '0'),
+        ('negotiate security layer', 'i', '1'),
+    ],
+    'windowed': [
+        ('full address', 's', '{hostname}:{port}'),
+        ('username', 's', '{username}'),
+        ('screen mode id', 'i', '1'),
+        ('desktopwidth', 'i', '1600'),
+        ('desktopheight', 'i', '900'),
+        ('smart sizing', 'i', '1'),
+        ('session bpp', 'i', '32'),
+        ('redirectclipboard', 'i', '1'),
+        ('autoreconnection enabled', 'i', '1'),
+        ('authentication level', 'i', '2'),
+    ],
+    'gateway': [
+        ('full address', 's', '{hostname}:{port}'),
+        ('username', 's', '{username}'),
+        ('screen mode id', 'i', '2'),
+        ('session bpp', 'i', '32'),
+        ('redirectclipboard', 'i', '1'),
+        ('authentication level', 'i', '2'),
+        ('gatewayhostname', 's', '{gateway}'),
+        ('gatewayusagemethod', 'i', '1'),
+        ('gatewaycredentialssource', 'i', '4'),
+        ('gatewayprofileusagemethod', 'i', '1'),
+        ('promptcredentialonce', 'i', '1'),
+    ],
+}
+
+# Profile fields a template can use
+TEMPLATE_FIELDS = ('display_name', 'hostname', 'port', 'username', 'gateway')
+
+_SETTING = re.compile(r'^[a-z0-9 :]+:[isb]:.*$', re.IGNORECASE)
+_UNSAFE = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+_CONTROL = re.compile(r'[\x00-\x1f\x7f]')
+
+# Function to read templates from .rdp files in a folder
+def load_templates(folder=TEMPLATE_FOLDER):
+    """Built-in templates plus one per .rdp file in `folder` (named after the file)"""
+    templates = dict(TEMPLATES)
+    if os.path.isdir(folder):
+        for entry in sorted(os.scandir(folder), key=lambda e: e.name):
+            if not entry.name.lower().endswith('.rdp'):
+                continue
+            with open(entry.path, 'rb') as f:
+                raw = f.read()
+            text = raw.decode('utf-16') if raw.startswith((b'\xff\xfe', b'\xfe\xff')) else raw.decode('utf-8')
+            settings = []
+            for line in text.splitlines():
+                parts = line.split(':', 2)
+                if len(parts) == 3:
+                    settings.append((parts[0].strip(), parts[1].strip(), parts[2].strip()))
+            templates[os.path.splitext(entry.name)[0]] = settings
+    return templates
+
+# Function to check that text is a well-formed .rdp file
+def check_rdp(text):
+    """Return a list of problems (empty when every line is 'name:type:value' and an address is set)"""
+    problems = []
+    names = set()
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line:
+            continue
+        if not _SETTING.match(line):
+            problems.append(f"line {number}: not name:type:value ({line!r})")
+            continue
+        name, kind, value = line.split(':', 2)
+        if name in names:
+            problems.append(f"line {number}: '{name}' set twice")
+        names.add(name)
+        if kind == 'i' and not value.lstrip('-').isdigit():
+            problems.append(f"line {number}: '{name}' needs a number, got {value!r}")
+    if 'full address' not in names:
+        problems.append("no 'full address'")
+    return problems
+
+# Function to make a display name safe as a file name
+def safe_filename(name):
+    return _UNSAFE.sub('_', name).strip(' .') or 'connection'
+
+# Generated .rdp files, re-rendered only when a profile or template changes
+class RdpFileCache:
+    """
+    Writes one .rdp file per profile into `folder`. Each file is
+    recorded in a manifest (.manifest.json) with a hash of everything
+    that goes into it: the template's settings, the profile fields the
+    template uses and the profile's own `rdp_settings` overrides. If
+    the hash still matches and the file is there, the profile is not
+    rendered or written again.
+
+    A profile picks its template with a `template` field (default
+    'default') and may override settings with `rdp_settings`, e.g.
+    {"desktopwidth": "1920"}. Files are written as UTF-16, like mstsc.
+    """
+    def __init__(self, folder=RDP_FOLDER, templates=None):
+        self.folder = folder
+        self.templates = templates if templates is not None else load_templates()
+        self.manifest_path = os.path.join(folder, '.manifest.json')
+        self._compiled = {}
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r') as f:
+                    self.manifest = json.load(f)
+            except ValueError:
+                self.manifest = {}
+        # File names are kept casefolded: on Windows 'Web.rdp' and
+        # 'web.rdp' are the same file
+        self._files = {entry[1].casefold() for entry in self.manifest.values()}
+        # Files actually in the folder (listed once, not stat'ed per profile)
+        self._present = {name.casefold() for name in os.listdir(folder)} if os.path.isdir(folder) else set()
+
+    def _compile(self, name):
+        # (setting name, line prefix, value, value uses fields) per
+        # setting, and a fingerprint of the template for the cache key
+        compiled = self._compiled.get(name)
+        if compiled is None:
+            if name not in self.templates:
+                raise ValueError(f"Unknown template '{name}' (have {', '.join(sorted(self.templates))})")
+            settings = self.templates[name]
+            lines = [(key, f"{key}:{kind}:", value, '{' in value) for key, kind, value in settings]
+            fingerprint = hashlib.blake2b(json.dumps(settings).encode('utf-8'), digest_size=8).hexdigest()
+            compiled = self._compiled[name] = (lines, fingerprint)
+        return compiled
+
+    def key(self, conn, template=None):
+        """Hash of the inputs to a profile's .rdp file"""
+        name = template or conn.get('template') or 'default'
+        _lines, fingerprint = self._compile(name)
+        inputs = [fingerprint] + [str(conn.get(field) or '') for field in TEMPLATE_FIELDS]
+        overrides = conn.get('rdp_settings')
+        if overrides:
+            inputs.append(json.dumps(sorted(overrides.items())))
+        return hashlib.blake2b('\0'.join(inputs).encode('utf-8'), digest_size=16).hexdigest()
+
+    def render(self, conn, template=None):
+        """
+        .rdp file text for a profile. Raises ValueError if a field or an
+        override holds a line break or another control character, which
+        would add settings of its own to the file.
+        """
+        lines, _fingerprint = self._compile(template or conn.get('template') or 'default')
+        fields = {field: str(conn.get(field) or '') for field in TEMPLATE_FIELDS}
+        fields['port'] = fields['port'] or '3389'
+        overrides = dict(conn.get('rdp_settings') or {})
+        for field, value in fields.items():
+            if _CONTROL.search(value):
+                raise ValueError(f"{field} of '{conn.get('display_name')}' contains a control character")
+        for name, value in overrides.items():
+            if ':' in str(name) or _CONTROL.search(f"{name}{value}"):
+                raise ValueError(f"invalid rdp_settings entry {name!r} in '{conn.get('display_name')}'")
+        out = []
+        for name, prefix, value, uses_fields in lines:
+            if overrides and name in overrides:
+                value, uses_fields = str(overrides.pop(name)), False
+            out.append(prefix + (value.format_map(fields) if uses_fields else value))
+        for name, value in overrides.items():
+            out.append(f"{name}:{'i' if str(value).lstrip('-').isdigit() else 's'}:{value}")
+        return '\r\n'.join(out) + '\r\n'
+
+    def _filename(self, name, key):
+        entry = self.manifest.get(name)
+        if entry is not None:
+            return entry[1]
+        base = safe_filename(name)
+        filename, number = base + '.rdp', 1
+        while filename.casefold() in self._files:
+            # Another display name maps to the same file name (ignoring case)
+            filename = f"{base}-{key[:8]}.rdp" if number == 1 else f"{base}-{key[:8]}-{number}.rdp"
+            number += 1
+        return filename
+
+    def path(self, conn, template=None):
+        """Path of a profile's .rdp file, writing it first if it's missing or out of date"""
+        return self.generate([conn], template)['paths'][conn['display_name']]
+
+    def generate(self, connections, template=None):
+        """
+        Make sure every profile has an up-to-date .rdp file. Returns
+        {'written': n, 'cached': n, 'paths': {display name: path}}.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        result = {'written': 0, 'cached': 0, 'paths': {}}
+        folder = self.folder + os.sep
+        for conn in connections:
+            name = conn['display_name']
+            key = self.key(conn, template)
+            entry = self.manifest.get(name)
+            if entry is not None and entry[0] == key and entry[1].casefold() in self._present:
+                result['cached'] += 1
+            else:
+                filename = self._filename(name, key)
+                # Rendered before opening, so a rejected profile leaves no empty file
+                data = self.render(conn, template).encode('utf-16-le')
+                # UTF-16 with a byte order mark, as mstsc saves them
+                with open(folder + filename, 'wb') as f:
+                    f.write(b'\xff\xfe' + data)
+                self.manifest[name] = entry = [key, filename]
+                self._files.add(filename.casefold())
+                self._present.add(filename.casefold())
+                result['written'] += 1
+            result['paths'][name] = folder + entry[1]
+        if result['written']:
+            self.save()
+        return result
+
+    def prune(self, names):
+        """Delete files of profiles not in `names`; returns how many"""
+        names = set(names)
+        removed = 0
+        for name in [n for n in self.manifest if n not in names]:
+            _key, filename = self.manifest.pop(name)
+            self._files.discard(filename.casefold())
+            self._present.discard(filename.casefold())
+            try:
+                os.remove(os.path.join(self.folder, filename))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        if removed:
+            self.save()
+        return removed
+
+    def save(self):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+# Function to build the command that opens an .rdp file
+def launch_command(path):
+    """mstsc and the file as an argument list (never through a shell)"""
+    return ['mstsc', os.path.abspath(path)]
+
+# Function to open an .rdp file
+def launch(path, launcher=subprocess.Popen):
+    """
+    Start mstsc with the file. `launcher` receives the argument list, so
+    tests (or other platforms) can pass their own instead of Popen.
+    """
+    command = launch_command(path)
+    launcher(command)
+    return command
@@ -1,61 +1,24 @@
 import json
 import os
-import subprocess
+import sys
 from datetime import datetime
 import platform
-
-# Database file for connections
-CONNECTIONS_FILE = "rdp_connections.json"
-HISTORY_FILE = "connection_history.json"
+from connection_api import (get_store, get_history, get_tag_index, get_rdp_files,
+                            get_reachability, list_connections, frequent_first)
+import connection_api as api
+from tag_query import GROUP_LEVELS
 
 # Function to load connections
 def load_connections():
-    """Load saved RDP connections from file"""
-    if os.path.exists(CONNECTIONS_FILE):
-        with open(CONNECTIONS_FILE, 'r') as f:
-            return json.load(f)
-    return []
+    """Return saved RDP connections as a list"""
+    return get_store().all()
 
 # Function to save connections
-def save_connections(connections):
+def save_connections():
     """Save RDP connections to file"""
-    with open(CONNECTIONS_FILE, 'w') as f:
-        json.dump(connections, f, indent=4)
+    get_store().save()
     print("\nConnections saved successfully!")
 
-# Function to load connection history
-def load_history():
-    """Load connection history from file"""
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, 'r') as f:
-            return json.load(f)
-    return []
-
-# Function to save connection history
-def save_history(history):
-    """Save connection history to file"""
-    with open(HISTORY_FILE, 'w') as f:
-        json.dump(history, f, indent=4)
-
-# Function to log connection
-def log_connection(connection_name, hostname):
-    """Log a connection to history"""
-    history = load_history()
-    
-    log_entry = {
-        'connection_name': connection_name,
-        'hostname': hostname,
-        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
-    
-    history.append(log_entry)
-    
-    # Keep only last 50 entries
-    if len(history) > 50:
-        history = history[-50:]
-    
-    save_history(history)
-
 # Function to add a new connection
 def add_connection():
     """Add a new RDP connection profile"""
@@ -65,17 +28,18 @@ def add_connection():
     hostname = input("Hostname or IP Address: ").strip()
     username = input("Username: ").strip()
     port = input("Port (default 3389): ").strip() or "3389"
-    tags = input("Tags (comma-separated, e.g., production,web): ").strip()
+    tags = input("Tags (comma-separated, e.g., production,web or env:prod): ").strip()
+    group = input(f"Group ({'/'.join(GROUP_LEVELS)}, e.g., prod/nyc/web; optional): ").strip().strip('/')
     notes = input("Notes (optional): ").strip()
     
     if not display_name or not hostname:
         print("\nERROR: Display name and hostname are required!")
         return
     
-    connections = load_connections()
+    store = get_store()
     
     # Check for duplicate
-    if any(conn['display_name'] == display_name for conn in connections):
+    if display_name in store:
         print(f"\nERROR: Connection '{display_name}' already exists!")
         return
     
@@ -85,12 +49,13 @@ def add_connection():
         'username': username,
         'port': port,
         'tags': [tag.strip() for tag in tags.split(',') if tag.strip()],
+        'group': group,
         'notes': notes,
         'created': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
     
-    connections.append(new_connection)
-    save_connections(connections)
+    store.add(new_connection)
+    save_connections()
     
     print(f"\nSUCCESS: Connection '{display_name}' added!")
     print(f"Hostname: {hostname}")
@@ -109,15 +74,11 @@ def connect_rdp(connection):
         print("\nERROR: RDP is only available on Windows systems")
         return
     
-    # Create RDP command
-    rdp_command = f"mstsc /v:{connection['hostname']}:{connection['port']}"
-    
     try:
-        # Launch RDP
-        subprocess.Popen(rdp_command, shell=True)
-        
-        # Log the connection
-        log_connection(connection['display_name'], connection['hostname'])
+        # Open a generated .rdp file (rewritten only if the profile changed);
+        # mstsc gets an argument list, never a shell command line
+        # (the connection is logged to history once mstsc has started)
+        api.connect(connection['display_name'])
         
         print("\nRDP session launched!")
         print("Note: You may need to enter your password in the RDP window")
@@ -127,7 +88,7 @@ def connect_rdp(connection):
 # Function to quick connect
 def quick_connect():
     """Select and connect to a saved connection"""
-    connections = load_connections()
+    connections = frequent_first(load_connections())
     
     if not connections:
         print("\nNo saved connections found. Add a connection first!")
@@ -137,9 +98,13 @@ def quick_connect():
     print("\nSaved Connections:")
     print("="*80)
     
+    # Show the last known status now; stale entries are re-checked in the background
+    from reachability import status_label
+    reachability = get_reachability()
+    reachability.refresh_in_background(connections)
     for idx, conn in enumerate(connections, 1):
         tags_str = ', '.join(conn['tags']) if conn['tags'] else 'None'
-        print(f"{idx}. {conn['display_name']}")
+        print(f"{idx}. {conn['display_name']} [{status_label(reachability.get(conn, stale=True))}]")
         print(f"   Host: {conn['hostname']} | User: {conn['username']} | Tags: {tags_str}")
         print("-"*80)
     
@@ -170,12 +135,18 @@ def view_connections():
     print("="*80)
     print(f"Total Connections: {len(connections)}\n")
     
+    from reachability import status_label
+    reachability = get_reachability()
+    reachability.refresh_in_background(connections)
     for idx, conn in enumerate(connections, 1):
         print(f"{idx}. {conn['display_name']}")
         print(f"   Hostname: {conn['hostname']}")
         print(f"   Username: {conn['username']}")
         print(f"   Port: {conn['port']}")
+        print(f"   Status: {status_label(reachability.get(conn, stale=True))}")
         print(f"   Tags: {', '.join(conn['tags']) if conn['tags'] else 'None'}")
+        if conn.get('group'):
+            print(f"   Group: {conn['group']}")
         if conn['notes']:
             print(f"   Notes: {conn['notes']}")
         print(f"   Created: {conn['created']}")
@@ -185,28 +156,22 @@ def view_connections():
 
 # Function to search connections
 def search_connections():
-    """Search connections by name, hostname, or tags"""
-    connections = load_connections()
+    """Search connections by name, hostname, tags or notes, best matches first"""
+    store = get_store()
     
-    if not connections:
+    if not store:
         print("\nNo saved connections found.")
         return
     
     print("\n--- Search Connections ---")
-    search_term = input("Enter search term (name, IP, or tag): ").strip().lower()
+    search_term = input("Enter search term (name, IP, tag or notes): ").strip().lower()
     
     if not search_term:
         print("\nNo search term entered.")
         return
     
-    results = []
-    
-    for conn in connections:
-        # Search in display name, hostname, and tags
-        if (search_term in conn['display_name'].lower() or
-            search_term in conn['hostname'].lower() or
-            any(search_term in tag.lower() for tag in conn['tags'])):
-            results.append(conn)
+    # Ranked matches, tolerating small typos, frequently used servers first
+    results = [conn for conn, _score in api.search_connections(search_term, limit=20)]
     
     if not results:
         print(f"\nNo connections found matching '{search_term}'")
@@ -254,8 +219,8 @@ def delete_connection():
             return
         
         if 1 <= choice <= len(connections):
-            deleted = connections.pop(choice - 1)
-            save_connections(connections)
+            deleted = get_store().remove(connections[choice - 1]['display_name'])
+            save_connections()
             print(f"\nSUCCESS: Connection '{deleted['display_name']}' deleted!")
         else:
             print("\nInvalid selection!")
@@ -264,85 +229,98 @@ def delete_connection():
 
 # Function to view connection history
 def view_history():
-    """Display connection history"""
-    history = load_history()
+    """Display recent connections and usage statistics"""
+    history = get_history()
+    stats = history.stats
     
-    if not history:
+    if not stats.total:
         print("\nNo connection history found.")
         return
     
     print("\n" + "="*80)
     print("CONNECTION HISTORY")
     print("="*80)
-    print(f"Total Connections: {len(history)}\n")
+    print(f"Total Connections: {stats.total}\n")
+    
+    # Show last 20 entries (read from the end of the log)
+    for entry in history.recent(20):
+        user = f" by {entry['user']}" if entry.get('user') else ""
+        print(f"[{entry['timestamp']}] {entry['connection_name']} ({entry['hostname']}){user}")
     
-    # Show last 20 entries
-    recent = history[-20:]
-    recent.reverse()
+    print("\nMost Used:")
+    for name, count in stats.most_used(5):
+        print(f"  {name}: {count}")
     
-    for entry in recent:
-        print(f"[{entry['timestamp']}] {entry['connection_name']} ({entry['hostname']})")
+    if len(stats.users) > 1:
+        print("\nBy User:")
+        for user, count in stats.users.most_common(5):
+            top = stats.most_used(1, user=user)
+            print(f"  {user}: {count} (mostly {top[0][0]})")
+    
+    hours = ', '.join(f"{hour:02d}:00" for hour in stats.busiest_hours())
+    days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+    busiest_day = days[max(range(7), key=lambda day: stats.days[day])]
+    print(f"\nBusiest Hours: {hours} | Busiest Day: {busiest_day}")
     
     print("="*80)
     
 # Function to export connections
 def export_connections():
     """Export connections to a backup file"""
-    connections = load_connections()
+    store = get_store()
     
-    if not connections:
+    if not store:
         print("\nNo connections to export.")
         return
     
-    filename = f"rdp_connections_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    print("\nFormats: json (default), jsonl, csv, rdg (Remote Desktop Connection Manager)")
+    fmt = input("Export format: ").strip().lower().lstrip('.') or 'json'
+    filename = f"rdp_connections_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
     
     try:
-        with open(filename, 'w') as f:
-            json.dump(connections, f, indent=4)
+        # Written one profile at a time, never built up as one big string
+        count = api.export_connections(filename)
         
         print(f"\nSUCCESS: Connections exported to {filename}")
-        print(f"Total connections exported: {len(connections)}")
+        print(f"Total connections exported: {count}")
     except Exception as e:
         print(f"\nERROR: Failed to export - {str(e)}")
 
 # Function to import connections
 def import_connections():
-    """Import connections from a backup file"""
+    """Import connections from a backup, CSV, .rdp or .rdg file"""
     print("\n--- Import Connections ---")
-    filename = input("Enter backup file name: ").strip()
+    print("Accepts .json/.jsonl backups, CSV (CMDB exports), .rdp files or a folder of them, and .rdg files")
+    filename = input("Enter file or folder name: ").strip()
     
     if not os.path.exists(filename):
         print(f"\nERROR: File '{filename}' not found!")
         return
     
+    # Tracing allocations slows the import, so it's only done on request
+    measure = input("Measure peak memory (slower import)? (y/n): ").strip().lower() == 'y'
+    
     try:
-        with open(filename, 'r') as f:
-            imported = json.load(f)
-        
-        if not isinstance(imported, list):
-            print("\nERROR: Invalid backup file format!")
-            return
-        
-        connections = load_connections()
+        # Streamed, validated and de-duplicated, then saved once
+        report = api.import_connections(filename, measure_memory=measure)
         
-        added = 0
-        skipped = 0
+        for error in report['errors']:
+            print(f"INVALID: {error}")
+        if report['invalid'] > len(report['errors']):
+            print(f"... and {report['invalid'] - len(report['errors'])} more invalid")
         
-        for conn in imported:
-            # Check if connection already exists
-            if any(c['display_name'] == conn['display_name'] for c in connections):
-                print(f"SKIPPED: {conn['display_name']} (already exists)")
-                skipped += 1
-            else:
-                connections.append(conn)
-                print(f"ADDED: {conn['display_name']}")
-                added += 1
-        
-        save_connections(connections)
+        if report['aborted']:
+            print(f"\nERROR: Import stopped ({report['aborted']})")
+            print("Nothing was imported.")
+            return
         
         print(f"\nImport complete!")
-        print(f"Added: {added}")
-        print(f"Skipped: {skipped}")
+        print(f"Read: {report['read']}")
+        print(f"Added: {report['added']}")
+        print(f"Skipped: {report['duplicates']} duplicate(s), {report['invalid']} invalid")
+        print(f"Time: {report['seconds']}s ({report['per_second']} profiles/s)")
+        if measure:
+            print(f"Peak memory: {report['peak_mb']} MB")
     
     except Exception as e:
         print(f"\nERROR: Failed to import - {str(e)}")
@@ -350,6 +328,8 @@ def import_connections():
 # Function to test connection
 def test_connection():
     """Test if a server is reachable"""
+    from reachability import status_label
+    
     connections = load_connections()
     
     if not connections:
@@ -370,27 +350,139 @@ def test_connection():
         
         if 1 <= choice <= len(connections):
             conn = connections[choice - 1]
-            print(f"\nTesting connection to {conn['hostname']}...")
+            print(f"\nTesting connection to {conn['hostname']}:{conn['port']}...")
             
-            # Ping test
-            param = '-n' if platform.system().lower() == 'windows' else '-c'
-            command = ['ping', param, '2', conn['hostname']]
+            # RDP port first, ping only if the port doesn't answer
+            result = api.test_connections([conn])[conn['display_name']]
             
-            result = subprocess.run(command, capture_output=True, text=True, timeout=10)
-            
-            if result.returncode == 0:
-                print(f"SUCCESS: {conn['hostname']} is reachable!")
-            else:
-                print(f"FAILED: {conn['hostname']} is not reachable")
+            outcome = "SUCCESS" if result['status'] == 'up' else "FAILED"
+            print(f"{outcome}: {conn['hostname']}:{conn['port']} - {status_label(result)}")
         else:
             print("\nInvalid selection!")
     except ValueError:
         print("\nInvalid input!")
-    except subprocess.TimeoutExpired:
-        print("\nTIMEOUT: Connection test timed out")
     except Exception as e:
         print(f"\nERROR: {str(e)}")
 
+# Function to test every connection at once
+def test_all_connections():
+    """Check all connections (or those matching a tag query) concurrently"""
+    store = get_store()
+    
+    if not store:
+        print("\nNo saved connections found.")
+        return
+    
+    print("\n--- Test All Connections ---")
+    query = input("Tag query (blank for all, e.g., env:prod AND NOT site:lab): ").strip()
+    try:
+        connections = list_connections(query)
+    except ValueError as e:
+        print(f"\nERROR: Invalid tag query - {str(e)}")
+        return
+    
+    if not connections:
+        print(f"\nNo connections match '{query}'.")
+        return
+    
+    print(f"\nTesting {len(connections)} connection(s)...")
+    from reachability import summarize, status_label
+    start = datetime.now()
+    results = api.test_connections(connections)
+    elapsed = (datetime.now() - start).total_seconds()
+    
+    summary = summarize(results)
+    print(f"\nChecked in {elapsed:.1f}s: {summary['up']} up, {summary['no-rdp']} without RDP, "
+          f"{summary['down']} down")
+    
+    failed = [(name, result) for name, result in results.items() if result['status'] != 'up']
+    if failed:
+        print("="*80)
+        for name, result in failed[:50]:
+            print(f"{name}: {status_label(result)}")
+        if len(failed) > 50:
+            print(f"... and {len(failed) - 50} more")
+        print("="*80)
+
+# Function to write .rdp files for a group of connections
+def generate_rdp_files():
+    """Write .rdp files for all connections or a tag query's matches, from a template"""
+    store = get_store()
+    
+    if not store:
+        print("\nNo saved connections found.")
+        return
+    
+    print("\n--- Generate .rdp Files ---")
+    query = input("Tag query (blank for all, e.g., env:prod AND NOT site:lab): ").strip()
+    try:
+        connections = list_connections(query)
+    except ValueError as e:
+        print(f"\nERROR: Invalid tag query - {str(e)}")
+        return
+    
+    if not connections:
+        print(f"\nNo connections match '{query}'.")
+        return
+    
+    rdp_files = get_rdp_files()
+    print(f"Templates: {', '.join(sorted(rdp_files.templates))}")
+    template = input("Template (blank for each connection's own, or default): ").strip() or None
+    
+    try:
+        start = datetime.now()
+        result = rdp_files.generate(connections, template)
+        elapsed = (datetime.now() - start).total_seconds()
+        if not query:
+            # Remove files of deleted connections
+            rdp_files.prune(store.connections)
+        
+        print(f"\nSUCCESS: {len(connections)} .rdp file(s) in {os.path.abspath(rdp_files.folder)}")
+        print(f"Written: {result['written']} | Unchanged: {result['cached']} | Time: {elapsed:.2f}s")
+    except Exception as e:
+        print(f"\nERROR: Failed to generate .rdp files - {str(e)}")
+
+# Function to list connections matching a tag query
+def filter_connections():
+    """Filter connections with a boolean tag/group query"""
+    index = get_tag_index()
+    
+    if not index:
+        print("\nNo saved connections found.")
+        return
+    
+    print("\n--- Filter by Tag Query ---")
+    print("Terms: tags (web), key:value tags (env:prod), group levels "
+          f"({', '.join(level + ':' for level in GROUP_LEVELS)}), group:prod/nyc, key:* and prefix*")
+    print("Combine with AND, OR, NOT and parentheses")
+    for level in GROUP_LEVELS:
+        values = sorted(index.values(level).items(), key=lambda item: -item[1])[:8]
+        if values:
+            print(f"  {level}: {', '.join(f'{value} ({count})' for value, count in values)}")
+    query = input("\nQuery: ").strip()
+    
+    if not query:
+        return
+    
+    try:
+        start = datetime.now()
+        names = index.query(query)
+        elapsed = (datetime.now() - start).total_seconds() * 1000
+    except ValueError as e:
+        print(f"\nERROR: Invalid tag query - {str(e)}")
+        return
+    
+    print(f"\n{len(names)} of {len(index)} connection(s) match ({elapsed:.1f} ms)")
+    print("="*80)
+    store = get_store()
+    for idx, name in enumerate(names[:50], 1):
+        conn = store.get(name)
+        print(f"{idx}. {conn['display_name']} ({conn['hostname']})")
+        print(f"   Group: {conn.get('group') or 'None'} | Tags: {', '.join(conn['tags']) if conn['tags'] else 'None'}")
+    if len(names) > 50:
+        print(f"... and {len(names) - 50} more")
+    print("="*80)
+
 # Main menu
 def show_menu():
     print("\n" + "="*60)
@@ -405,7 +497,10 @@ def show_menu():
     print("7. Test Connection")
     print("8. Export Connections")
     print("9. Import Connections")
-    print("10. Exit")
+    print("10. Test All Connections")
+    print("11. Generate .rdp Files")
+    print("12. Filter by Tag Query")
+    print("13. Exit")
     print("-"*60)
 
 # Main program
@@ -417,7 +512,7 @@ def main():
     
     while True:
         show_menu()
-        choice = input("\nSelect an option (1-10): ").strip()
+        choice = input("\nSelect an option (1-13): ").strip()
         
         if choice == '1':
             add_connection()
@@ -447,15 +542,187 @@ def main():
             import_connections()
         
         elif choice == '10':
+            test_all_connections()
+        
+        elif choice == '11':
+            generate_rdp_files()
+        
+        elif choice == '12':
+            filter_connections()
+        
+        elif choice == '13':
+            api.close()
             print("\nThank you for using RDP Connection Manager!")
             print("Exiting...\n")
             break
         
         else:
-            print("\nInvalid option. Please select 1-10.")
+            print("\nInvalid option. Please select 1-13.")
         
-        if choice != '10':
+        if choice != '13':
             input("\nPress Enter to continue...")
 
+# Function to build the command-line parser
+def build_parser():
+    import argparse
+    
+    parser = argparse.ArgumentParser(
+        prog='rdp_manager.py',
+        description="RDP connection manager. Run without arguments for the interactive menu.")
+    parser.add_argument('--format', choices=['text', 'json', 'jsonl'], default='text',
+                        help="output format (default: text)")
+    parser.add_argument('--connections', default=None,
+                        help="connections file (default: rdp_connections.json)")
+    
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    p = sub.add_parser('list', help="list connections, optionally matching a tag query")
+    p.add_argument('query', nargs='?', help="tag query, e.g. 'env:prod AND NOT site:lab'")
+    
+    p = sub.add_parser('search', help="search names, hostnames, tags and notes")
+    p.add_argument('term')
+    p.add_argument('-n', '--limit', type=int, default=20)
+    p.add_argument('--exact', action='store_true', help="no typo-tolerant matches")
+    
+    p = sub.add_parser('add', help="add a connection")
+    p.add_argument('display_name')
+    p.add_argument('hostname')
+    p.add_argument('-u', '--username', default='')
+    p.add_argument('-p', '--port', default='3389')
+    p.add_argument('-t', '--tags', default='', help="comma-separated, e.g. web,env:prod")
+    p.add_argument('-g', '--group', default='', help="env/site/role path, e.g. prod/nyc/web")
+    p.add_argument('--notes', default='')
+    
+    p = sub.add_parser('rm', help="delete connections")
+    p.add_argument('names', nargs='+')
+    
+    p = sub.add_parser('import', help="import a .json/.jsonl/.csv/.rdg file, an .rdp file or a folder of them")
+    p.add_argument('path')
+    
+    p = sub.add_parser('export', help="export to .json/.jsonl/.csv/.rdg (format from the extension)")
+    p.add_argument('path')
+    p.add_argument('-q', '--query', help="only connections matching this tag query")
+    
+    p = sub.add_parser('test', help="check connections' RDP ports")
+    p.add_argument('names', nargs='*', help="connections to test (default: all)")
+    p.add_argument('-q', '--query', help="test connections matching this tag query")
+    p.add_argument('--timeout', type=float, default=None, help="seconds per check (default: 2)")
+    p.add_argument('--no-ping', action='store_true', help="don't ping hosts whose port is closed")
+    
+    p = sub.add_parser('connect', help="open a connection in mstsc")
+    p.add_argument('name')
+    p.add_argument('--template', default=None, help="use this .rdp template")
+    p.add_argument('--dry-run', action='store_true', help="write the .rdp file and print the command only")
+    
+    return parser
+
+# Function to print a command's result
+def _output(args, payload, lines, records=None):
+    """`records` are the JSON Lines records when they aren't the payload's items"""
+    if args.format == 'json':
+        print(json.dumps(payload, indent=4))
+    elif args.format == 'jsonl':
+        if records is None:
+            records = payload if isinstance(payload, list) else [payload]
+        for record in records:
+            print(json.dumps(record))
+    else:
+        for line in lines:
+            print(line)
+
+# Non-interactive entry point
+def cli(argv):
+    """
+    Run one command and return the process exit code (0 = success,
+    1 = a connection failed or wasn't found, 2 = bad arguments)
+    """
+    import csv
+    
+    args = build_parser().parse_args(argv)
+    if args.connections:
+        api.set_connections_file(args.connections)
+    
+    try:
+        return run_command(args)
+    # A file that can't be parsed (SyntaxError covers XML's ParseError)
+    except (SyntaxError, csv.Error) as e:
+        print(f"ERROR: {type(e).__name__}: {str(e)}", file=sys.stderr)
+        return 1
+    except KeyError as e:
+        print(f"ERROR: Connection {e} not found", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(f"ERROR: {str(e)}", file=sys.stderr)
+        return 2
+    except OSError as e:
+        print(f"ERROR: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        api.close()
+
+# Function to run one parsed command
+def run_command(args):
+    if args.command == 'list':
+        connections = list_connections(args.query)
+        _output(args, connections, [
+            f"{c['display_name']:<30} {c['hostname'] + ':' + c['port']:<30} {c.get('group') or '-':<20} "
+            f"{','.join(c['tags'])}" for c in connections])
+    
+    elif args.command == 'search':
+        results = api.search_connections(args.term, args.limit, fuzzy=not args.exact)
+        _output(args, [dict(conn, score=score) for conn, score in results], [
+            f"{score:6.2f}  {conn['display_name']:<30} {conn['hostname']}" for conn, score in results])
+        return 0 if results else 1
+    
+    elif args.command == 'add':
+        conn = api.add_connection(args.display_name, args.hostname, args.username, args.port,
+                                  [tag.strip() for tag in args.tags.split(',') if tag.strip()],
+                                  args.group, args.notes)
+        _output(args, conn, [f"Added {conn['display_name']} ({conn['hostname']}:{conn['port']})"])
+    
+    elif args.command == 'rm':
+        removed, missing = api.remove_connections(args.names)
+        _output(args, {'removed': [c['display_name'] for c in removed], 'missing': missing},
+                [f"Deleted {c['display_name']}" for c in removed] +
+                [f"Not found: {name}" for name in missing])
+        return 1 if missing else 0
+    
+    elif args.command == 'import':
+        if not os.path.exists(args.path):
+            raise ValueError(f"File '{args.path}' not found")
+        report = api.import_connections(args.path)
+        if report['aborted']:
+            summary = f"Import stopped ({report['aborted']}); nothing was imported"
+        else:
+            summary = (f"Read {report['read']}, added {report['added']}, skipped {report['duplicates']} "
+                       f"duplicate(s) and {report['invalid']} invalid in {report['seconds']}s")
+        _output(args, report, [f"INVALID: {error}" for error in report['errors']] + [summary])
+        return 1 if report['aborted'] else 0
+    
+    elif args.command == 'export':
+        count = api.export_connections(args.path, args.query)
+        _output(args, {'path': args.path, 'count': count}, [f"Exported {count} connection(s) to {args.path}"])
+    
+    elif args.command == 'test':
+        from reachability import status_label, CHECK_TIMEOUT
+        connections = api.get_connections(args.names) if args.names else list_connections(args.query)
+        results = api.test_connections(connections, timeout=args.timeout or CHECK_TIMEOUT,
+                                       icmp=not args.no_ping)
+        _output(args, results, [f"{name:<30} {status_label(result)}" for name, result in results.items()],
+                [dict(name=name, **result) for name, result in results.items()])
+        return 0 if all(result['status'] == 'up' for result in results.values()) else 1
+    
+    elif args.command == 'connect':
+        if args.dry_run:
+            from rdp_files import launch_command
+            command = launch_command(api.rdp_file(args.name, args.template))
+        else:
+            command = api.connect(args.name, args.template)
+        _output(args, {'command': command, 'launched': not args.dry_run}, [' '.join(command)])
+    
+    return 0
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(cli(sys.argv[1:]))
     main()
\ No newline at end of file
@@ -0,0 +1,175 @@
+import asyncio
+import platform
+import threading
+import time
+
+# Seconds a reachability result stays fresh
+REACHABILITY_TTL = 120
+
+# Seconds to wait for a TCP connect or ping reply
+CHECK_TIMEOUT = 2.0
+
+# Connections probed at the same time (each holds one socket)
+CHECK_CONCURRENCY = 256
+
+# Pings run at the same time (each is a subprocess)
+PING_CONCURRENCY = 16
+
+# Error for a port that actively refused: the host answered, so it's up
+REFUSED = "connection refused"
+
+# Function to try a TCP connection to the RDP port
+async def probe_tcp(host, port, timeout=CHECK_TIMEOUT):
+    """Return (ok, latency_ms, error)"""
+    start = time.perf_counter()
+    try:
+        _reader, writer = await asyncio.wait_for(asyncio.open_connection(host, int(port)), timeout)
+    except asyncio.TimeoutError:
+        return False, None, "timed out"
+    except ConnectionRefusedError:
+        return False, None, REFUSED
+    except OSError as e:
+        # strerror rather than os.strerror(errno): DNS failures (gaierror)
+        # have negative codes os.strerror doesn't know
+        return False, None, e.strerror or str(e)
+    except ValueError as e:
+        return False, None, str(e)
+    latency = round((time.perf_counter() - start) * 1000, 1)
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True, latency, None
+
+# Function to ping a host once
+async def probe_icmp(host, timeout=CHECK_TIMEOUT):
+    """Return True/False, or None when ping is not available"""
+    if platform.system().lower() == 'windows':
+        command = ['ping', '-n', '1', '-w', str(int(timeout * 1000)), host]
+    else:
+        command = ['ping', '-c', '1', '-W', str(max(1, int(timeout))), host]
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+    except OSError:
+        return None
+    try:
+        return await asyncio.wait_for(process.wait(), timeout + 1) == 0
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return False
+
+# Reachability results shared by every view
+class ReachabilityCache:
+    """
+    Latest result per (hostname, port), each fresh for `ttl` seconds.
+    A result is a dict:
+
+    status     - 'up' (RDP port open), 'no-rdp' (port refused, or host
+                 answers ping but the port is closed) or 'down'
+    latency_ms - TCP connect time when up
+    error      - why the TCP connect failed
+    ping       - ping result when the port timed out or the host was
+                 unreachable (None if not run)
+    checked    - time.time() of the check
+    """
+    def __init__(self, ttl=REACHABILITY_TTL):
+        self.ttl = ttl
+        self.results = {}
+        self._lock = threading.Lock()
+        self._refreshing = None
+
+    @staticmethod
+    def key(conn):
+        return conn['hostname'].lower(), str(conn.get('port') or 3389)
+
+    def get(self, conn, stale=False):
+        """Fresh result for a connection, or None (stale=True returns old ones too)"""
+        with self._lock:
+            entry = self.results.get(self.key(conn))
+        if entry is None:
+            return None
+        result, checked_at = entry
+        if not stale and time.monotonic() - checked_at > self.ttl:
+            return None
+        return result
+
+    def put(self, key, result):
+        with self._lock:
+            self.results[key] = (result, time.monotonic())
+
+    def stale(self, connections):
+        """Targets among `connections` with no fresh result"""
+        now = time.monotonic()
+        with self._lock:
+            return {self.key(c) for c in connections
+                    if now - self.results.get(self.key(c), (None, -1e18))[1] > self.ttl}
+
+    def refresh_in_background(self, connections, **options):
+        """Check stale targets on a thread unless a refresh is already running"""
+        if self._refreshing is not None and self._refreshing.is_alive():
+            return self._refreshing
+        self._refreshing = threading.Thread(target=check_connections, args=(connections, self),
+                                            kwargs=options, name='reachability', daemon=True)
+        self._refreshing.start()
+        return self._refreshing
+
+# Function to check every target concurrently
+async def _check_targets(targets, cache, timeout, concurrency, icmp):
+    connect_slots = asyncio.Semaphore(concurrency)
+    ping_slots = asyncio.Semaphore(PING_CONCURRENCY)
+
+    async def check(target):
+        host, port = target
+        async with connect_slots:
+            ok, latency, error = await probe_tcp(host, port, timeout)
+        result = {'status': 'up' if ok else 'down', 'latency_ms': latency,
+                  'error': error, 'ping': None, 'checked': time.time()}
+        if error == REFUSED:
+            # Refused means something answered: up, but not serving RDP
+            result['status'] = 'no-rdp'
+        elif not ok and icmp:
+            async with ping_slots:
+                result['ping'] = await probe_icmp(host, timeout)
+            if result['ping']:
+                result['status'] = 'no-rdp'
+        cache.put(target, result)
+
+    await asyncio.gather(*(check(target) for target in targets))
+
+# Function to check many connections at once
+def check_connections(connections, cache, timeout=CHECK_TIMEOUT, concurrency=CHECK_CONCURRENCY,
+                      icmp=True, force=False):
+    """
+    Check the RDP port of every connection (each hostname/port once),
+    skipping targets with a fresh cached result unless force=True. When
+    the port refuses the connection the host is up but not serving RDP;
+    when it times out or the host is unreachable, a ping tells the two
+    apart. Returns {display name: result}.
+    """
+    connections = list(connections)
+    targets = {cache.key(c) for c in connections} if force else cache.stale(connections)
+    if targets:
+        asyncio.run(_check_targets(targets, cache, timeout, concurrency, icmp))
+    return {c['display_name']: cache.get(c, stale=True) for c in connections}
+
+# Function to summarize check results
+def summarize(results):
+    """Count of connections per status"""
+    summary = {'up': 0, 'no-rdp': 0, 'down': 0}
+    for result in results.values():
+        if result is not None:
+            summary[result['status']] += 1
+    return summary
+
+# Function to describe a result in one short label
+def status_label(result):
+    if result is None:
+        return "unknown"
+    if result['status'] == 'up':
+        return f"UP ({result['latency_ms']} ms)"
+    if result['status'] == 'no-rdp':
+        return f"NO RDP ({'port refused' if result['error'] == REFUSED else 'host answers ping'})"
+    return f"DOWN ({result['error']})"
@@ -0,0 +1,292 @@
+import re
+from array import array
+from functools import lru_cache
+
+# What each level of a profile's group path means: "prod/nyc/web" is
+# env:prod, site:nyc, role:web
+GROUP_LEVELS = ('env', 'site', 'role')
+
+_TOKEN = re.compile(r'\(|\)|[^\s()]+')
+_KEYWORDS = ('AND', 'OR', 'NOT')
+
+# Bit positions set in each byte value, for turning a bitmap into ids
+_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+# Function to list the index terms of one tag (cached: tags repeat a lot)
+@lru_cache(maxsize=65536)
+def _tag_terms(tag):
+    tag = tag.strip().lower()
+    if not tag:
+        return ()
+    terms = [tag]
+    key, sep, value = tag.partition(':')
+    if sep and value:
+        terms.append(key + ':*')
+        parts = value.split('/')
+        for depth in range(1, len(parts)):
+            terms.append(f"{key}:{'/'.join(parts[:depth])}")
+    return tuple(terms)
+
+# Function to list the index terms of a group path (cached like tags)
+@lru_cache(maxsize=65536)
+def _group_terms(group):
+    parts = [part.strip() for part in group.lower().split('/') if part.strip()]
+    if not parts:
+        return ()
+    terms = ['group:*']
+    for depth, part in enumerate(parts):
+        terms.append('group:' + '/'.join(parts[:depth + 1]))
+        if depth < len(GROUP_LEVELS):
+            terms.append(f"{GROUP_LEVELS[depth]}:{part}")
+            terms.append(f"{GROUP_LEVELS[depth]}:*")
+    return tuple(terms)
+
+# Function to list the index terms of a profile
+def profile_terms(conn):
+    """
+    Lowercase terms a profile can be queried by:
+
+    tags          - each tag as written ('web', 'env:prod'); a 'key:value'
+                    tag also gives 'key:*', and a value with slashes
+                    ('site:eu/london') every parent ('site:eu')
+    group         - a path like 'prod/nyc/web' gives 'group:prod',
+                    'group:prod/nyc', 'group:prod/nyc/web', plus one
+                    term per level in GROUP_LEVELS ('env:prod', ...)
+    """
+    terms = set()
+    for tag in conn.get('tags') or ():
+        terms.update(_tag_terms(tag))
+    if conn.get('group'):
+        terms.update(_group_terms(conn['group']))
+    return terms
+
+# Function to parse a tag query
+def parse_query(text):
+    """
+    Parse e.g. 'env:prod AND role:web AND NOT site:lab' into a tree of
+    ('and', a, b), ('or', a, b), ('not', a) and ('term', 'env:prod')
+    nodes. NOT binds tightest, then AND, then OR; terms side by side
+    are ANDed; parentheses group; 'key:*' means any value and a
+    trailing * matches a prefix ('site:lon*'). Keywords are
+    case-insensitive, terms are lowercased. Raises ValueError.
+    """
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        raise ValueError("Empty query")
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def keyword(token):
+        return token is not None and token.upper() in _KEYWORDS and token.upper()
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        node = parse_and()
+        while keyword(peek()) == 'OR':
+            take()
+            node = ('or', node, parse_and())
+        return node
+
+    def parse_and():
+        node = parse_not()
+        while True:
+            token = peek()
+            if keyword(token) == 'AND':
+                take()
+            elif token is None or token == ')' or keyword(token) == 'OR':
+                return node
+            node = ('and', node, parse_not())
+
+    def parse_not():
+        token = peek()
+        if token is None:
+            raise ValueError("Query ends where a term was expected")
+        if keyword(token) == 'NOT':
+            take()
+            return ('not', parse_not())
+        if token == '(':
+            take()
+            node = parse_or()
+            if peek() != ')':
+                raise ValueError("Missing ')'")
+            take()
+            return node
+        if token == ')' or keyword(token):
+            raise ValueError(f"Expected a term, got '{token}'")
+        return ('term', take().lower())
+
+    tree = parse_or()
+    if position != len(tokens):
+        raise ValueError(f"Unexpected '{tokens[position]}'")
+    return tree
+
+# Bitmap index from tag terms to profiles
+class TagIndex:
+    """
+    One bitmap (a Python int, bit n = profile n) per term from
+    profile_terms(). A query is evaluated with &, | and ~ on whole
+    bitmaps, so 'env:prod AND role:web AND NOT site:lab' over 100k
+    profiles is a handful of big-integer operations instead of a pass
+    over every profile.
+
+    A bitmap costs one bit per profile however rare the term, so terms
+    on fewer than 1 in 256 profiles (most full group paths, one-off
+    tags) are kept as arrays of profile numbers instead, 4 bytes per
+    match, and turned into a bitmap only when a query uses them.
+
+    Follows a ConnectionStore through store.subscribe(index.on_change).
+    """
+    def __init__(self, connections=()):
+        self.names = []
+        self.profiles = []
+        self.ids = {}
+        self.bitmaps = {}
+        self.sparse = {}
+        self.all = 0
+        self._build(connections)
+
+    def _is_sparse(self, count):
+        # Bitmaps for terms on at least 1 in 256 profiles (at most 8x the
+        # size of an array of their numbers); rarer terms stay arrays
+        return count * 256 < len(self.names)
+
+    def _build(self, connections):
+        # Set bits in bytearrays and convert once; OR-ing into a growing
+        # int per profile would copy the whole bitmap every time
+        positions = {}
+        for conn in connections:
+            doc = len(self.names)
+            self.ids[conn['display_name']] = doc
+            self.names.append(conn['display_name'])
+            self.profiles.append(conn)
+            for term in profile_terms(conn):
+                docs = positions.get(term)
+                if docs is None:
+                    positions[term] = array('I', (doc,))
+                else:
+                    docs.append(doc)
+        for term, docs in positions.items():
+            if self._is_sparse(len(docs)):
+                self.sparse[term] = docs
+            else:
+                self.bitmaps[term] = self._to_bitmap(docs)
+        self.all = (1 << len(self.names)) - 1
+
+    def _to_bitmap(self, docs):
+        bits = bytearray((len(self.names) + 7) // 8)
+        for doc in docs:
+            bits[doc >> 3] |= 1 << (doc & 7)
+        return int.from_bytes(bits, 'little')
+
+    def add(self, conn):
+        if conn['display_name'] in self.ids:
+            self.remove(conn['display_name'])
+        doc = len(self.names)
+        bit = 1 << doc
+        self.ids[conn['display_name']] = doc
+        self.names.append(conn['display_name'])
+        self.profiles.append(conn)
+        for term in profile_terms(conn):
+            bitmap = self.bitmaps.get(term)
+            if bitmap is not None:
+                self.bitmaps[term] = bitmap | bit
+                continue
+            docs = self.sparse.get(term)
+            if docs is None:
+                self.sparse[term] = array('I', (doc,))
+            else:
+                docs.append(doc)
+                if not self._is_sparse(len(docs)):
+                    self.bitmaps[term] = self._to_bitmap(self.sparse.pop(term))
+        self.all |= bit
+
+    def remove(self, name):
+        doc = self.ids.pop(name, None)
+        if doc is None:
+            return
+        mask = ~(1 << doc)
+        for term in profile_terms(self.profiles[doc]):
+            if term in self.bitmaps:
+                bitmap = self.bitmaps[term] & mask
+                if bitmap:
+                    self.bitmaps[term] = bitmap
+                else:
+                    del self.bitmaps[term]
+            elif term in self.sparse:
+                docs = self.sparse[term]
+                docs.remove(doc)
+                if not docs:
+                    del self.sparse[term]
+        self.names[doc] = None
+        self.profiles[doc] = None
+        self.all &= mask
+
+    def on_change(self, event, conn):
+        """ConnectionStore subscriber (profiles are removed before they change)"""
+        if event == 'add':
+            self.add(conn)
+        elif event == 'remove':
+            self.remove(conn['display_name'])
+
+    def _bitmap(self, term):
+        bitmap = self.bitmaps.get(term)
+        if bitmap is not None:
+            return bitmap
+        docs = self.sparse.get(term)
+        return self._to_bitmap(docs) if docs is not None else 0
+
+    def _term(self, term):
+        if term.endswith('*') and not term.endswith(':*'):
+            prefix = term[:-1]
+            bitmap = 0
+            for key in [key for key in self.bitmaps if key.startswith(prefix)] + \
+                       [key for key in self.sparse if key.startswith(prefix)]:
+                bitmap |= self._bitmap(key)
+            return bitmap
+        return self._bitmap(term)
+
+    def evaluate(self, query):
+        """Bitmap of the profiles matching a query (text or parse_query() tree)"""
+        tree = parse_query(query) if isinstance(query, str) else query
+        kind = tree[0]
+        if kind == 'term':
+            return self._term(tree[1])
+        if kind == 'not':
+            return self.all & ~self.evaluate(tree[1])
+        left = self.evaluate(tree[1])
+        if kind == 'and':
+            # Nothing left to narrow down
+            return left & self.evaluate(tree[2]) if left else 0
+        return left | self.evaluate(tree[2])
+
+    def count(self, query):
+        return bin(self.evaluate(query)).count('1')
+
+    def query(self, query):
+        """Display names matching a query, in the order profiles were added"""
+        bitmap = self.evaluate(query)
+        names = self.names
+        matches = []
+        for index, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')):
+            if byte:
+                base = index << 3
+                matches.extend(names[base + bit] for bit in _BITS[byte])
+        return matches
+
+    def values(self, key):
+        """Values used with a key, e.g. values('site') -> {'nyc': 120, ...}"""
+        prefix = key.lower() + ':'
+        values = {term[len(prefix):]: bin(bitmap).count('1') for term, bitmap in self.bitmaps.items()
+                  if term.startswith(prefix) and term != prefix + '*'}
+        values.update((term[len(prefix):], len(docs)) for term, docs in self.sparse.items()
+                      if term.startswith(prefix) and term != prefix + '*')
+        return values
+
+    def __len__(self):
+        return len(self.ids)
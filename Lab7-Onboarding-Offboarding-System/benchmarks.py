@@ -0,0 +1,162 @@
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from employee_store import EmployeeStore, AssetStore
+
+FIRST_NAMES = ('Jim', 'Mary', 'Ann', 'Bob', 'Li', 'Sara', 'Omar', 'Ivan', 'Priya', 'Kofi', 'Elena', 'Tom')
+LAST_NAMES = ('Roberts', 'Orero', 'Lee', 'Smith', 'Chen', 'Garcia', 'Khan', 'Petrov', 'Shah', 'Mensah')
+DEPARTMENTS = ('IT', 'HR', 'Finance', 'Sales', 'Marketing', 'Legal', 'Operations', 'Support')
+ASSET_TYPES = ('Laptop', 'Phone', 'Monitor', 'Keyboard & Mouse', 'Headset')
+
+def make_employees(n, assets_each=5):
+    """n employees (every 5th inactive) and assets_each assets per employee"""
+    employees, assets = [], []
+    for i in range(n):
+        employee_id = f"EMP{str(i + 1).zfill(3)}"
+        first = FIRST_NAMES[i % len(FIRST_NAMES)]
+        last = f"{LAST_NAMES[i // len(FIRST_NAMES) % len(LAST_NAMES)]}{i}"
+        email = f"{first.lower()}.{last.lower()}@company.com"
+        status = 'Inactive' if i % 5 == 0 else 'Active'
+        own = []
+        for j in range(assets_each):
+            own.append({
+                'asset_type': ASSET_TYPES[j % len(ASSET_TYPES)],
+                'serial_number': f"SN{i:08d}{j:02d}",
+                'assigned_to': employee_id,
+                'assigned_date': "2026-01-01",
+                'status': 'Returned' if status == 'Inactive' else 'Assigned'
+            })
+        employees.append({
+            'employee_id': employee_id,
+            'first_name': first,
+            'last_name': last,
+            'full_name': f"{first} {last}",
+            'email': email,
+            'department': DEPARTMENTS[i % len(DEPARTMENTS)],
+            'title': "Analyst",
+            'manager': f"Manager {i % 500}",
+            'start_date': "2026-01-01",
+            'status': status,
+            'accounts': {'active_directory': f"{first.lower()}.{last.lower()}", 'email': email,
+                         'vpn': f"{first.lower()}{last.lower()}", 'status': status},
+            'assets': own,
+            'access_groups': ['Department Access', 'Email & Calendar'],
+            'onboarded_date': "2026-01-01 09:00:00"
+        })
+        assets.extend(dict(asset) for asset in own)
+    return employees, assets
+
+def _timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+def _report(label, samples):
+    print(f"{label:<40} median {statistics.median(samples) * 1000:9.3f} ms"
+          f"   max {max(samples) * 1000:9.3f} ms   (n={len(samples)})")
+
+def _once(label, func, note=''):
+    t0 = time.perf_counter()
+    result = func()
+    print(f"{label:<40} {(time.perf_counter() - t0) * 1000:9.1f} ms   {note}")
+    return result
+
+# Old generate_employee_id(), view_employee_details() search and
+# offboarding asset update, for comparison
+def _legacy_next_id(employees):
+    last_id = max([int(emp['employee_id'][3:]) for emp in employees])
+    return f"EMP{str(last_id + 1).zfill(3)}"
+
+def _legacy_find(employees, search):
+    return [emp for emp in employees if
+            search in emp['full_name'].lower() or
+            search in emp['employee_id'].lower()]
+
+def _legacy_update_assets(all_assets, employee):
+    for emp_asset in employee['assets']:
+        for asset in all_assets:
+            if asset['serial_number'] == emp_asset['serial_number']:
+                asset['status'] = emp_asset['status']
+
+def bench_directory(n=200000, assets_each=5, repeat=20):
+    """
+    Load n employees and n * assets_each assets into the stores, then
+    time the menu's lookups against the old scans of every record
+    """
+    print("\n--- Employee and Asset Stores ---")
+    employees, assets = make_employees(n, assets_each)
+    with tempfile.TemporaryDirectory() as tmp:
+        employees_file = os.path.join(tmp, 'employees.json')
+        assets_file = os.path.join(tmp, 'assets.json')
+        with open(employees_file, 'w') as f:
+            json.dump(employees, f)
+        with open(assets_file, 'w') as f:
+            json.dump(assets, f)
+
+        # The old code read the file again for every menu action
+        _once(f"Read employees.json ({n})", lambda: json.load(open(employees_file)),
+              "(old: every action)")
+        store = _once(f"Load EmployeeStore ({n})", lambda: EmployeeStore(employees_file), "(once per session)")
+        inventory = _once(f"Load AssetStore ({len(assets)})", lambda: AssetStore(assets_file),
+                          "(once per session)")
+
+        listed = store.all()
+        print("\nNext employee ID")
+        assert _legacy_next_id(listed) == store.next_id()
+        _report("Before: max() over all employees", _timed(lambda: _legacy_next_id(listed), 5))
+        _report("After: tracked highest ID", _timed(store.next_id, repeat))
+
+        target = listed[n // 2]
+        for label, search in (('ID', target['employee_id'].lower()),
+                              ('full name', target['full_name'].lower()),
+                              ('email', target['email'])):
+            print(f"\nFind by {label} ({search})")
+            expected = _legacy_find(listed, search)
+            found = store.find(search)
+            assert target in found and (label == 'email' or found == expected)
+            _report("Before: substring scan", _timed(lambda: _legacy_find(listed, search), 5))
+            _report("After: index lookup", _timed(lambda: store.find(search), repeat))
+        print("\nFind by the start of a name word (roberts1234)")
+        assert store.find('roberts1234') == _legacy_find(listed, 'roberts1234')
+        _report("Before: substring scan", _timed(lambda: _legacy_find(listed, 'roberts1234'), 5))
+        _report("After: sorted word prefixes", _timed(lambda: store.find('roberts1234'), repeat))
+        print("\nFind by the middle of a name (oberts1234)")
+        _report("Fallback: substring scan", _timed(lambda: store.find('oberts1234'), 5))
+
+        print(f"\nOffboarding: update {assets_each} assets")
+        asset_list = inventory.all()
+        _report(f"Before: nested loop ({len(asset_list)} assets)",
+                _timed(lambda: _legacy_update_assets(asset_list, target), 3))
+        _report("After: lookup by serial number", _timed(lambda: [
+            inventory.update(asset['serial_number'], status='Returned') for asset in target['assets']], repeat))
+        _report("Status change re-indexed", _timed(lambda: store.update(target['employee_id'],
+                                                                        status='Inactive'), repeat))
+
+        print("\nReports")
+        _report("Before: filter every record", _timed(lambda: (
+            [e for e in listed if e['status'] == 'Active'],
+            [a for a in asset_list if a['status'] == 'Assigned']), 3))
+        _report("After: index counts", _timed(lambda: (
+            store.count('Active'), store.departments('Active'), inventory.count('Assigned')), repeat))
+        _report("Directory: active employees", _timed(lambda: store.with_status('Active'), 3))
+
+        print()
+        _once("Save employees (atomic)", store.save)
+        _once("Save assets (atomic)", inventory.save)
+
+BENCHMARKS = {
+    'directory': bench_directory,
+}
+
+if __name__ == "__main__":
+    # Usage: python benchmarks.py [name ...]  (runs everything by default)
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
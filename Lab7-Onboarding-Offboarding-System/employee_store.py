@@ -0,0 +1,326 @@
+import bisect
+import gc
+import json
+import os
+import stat
+import tempfile
+from datetime import datetime
+
+# Database files
+EMPLOYEES_FILE = "employees.json"
+ASSETS_FILE = "assets.json"
+
+# Function to write records to a JSON file atomically
+def save_records(path, records):
+    """
+    Write to a temporary file next to `path` and rename it over the
+    original, so a crash mid-save never leaves a truncated file. The
+    file is a JSON list with one record per line: json.dump(indent=4)
+    can't use the C encoder and was several times slower.
+
+    mkstemp creates the file readable only by its owner, so it's given
+    the original's permissions before the rename.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '_', suffix='.tmp', dir=directory)
+    try:
+        if os.path.exists(path):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        with os.fdopen(fd, 'w') as f:
+            f.write('[\n' + ',\n'.join(json.dumps(record) for record in records) + '\n]\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+# Function to read a list of records from a JSON file
+def load_records(path):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            return json.load(f)
+    return []
+
+# Function to load and index records with garbage collection paused
+def _load_into(store, path):
+    # Every record adds dicts and sets the collector would otherwise
+    # keep re-scanning while nothing can be garbage yet
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for record in load_records(path):
+            store._index(record)
+    finally:
+        if enabled:
+            gc.enable()
+
+# Function to get the number of an employee ID ('EMP042' -> 42)
+def id_number(employee_id):
+    digits = employee_id[3:]
+    return int(digits) if digits.isdigit() else 0
+
+# Employee records, loaded once and indexed in memory
+class EmployeeStore:
+    """
+    Keeps every employee in a dict keyed by employee ID, with indexes
+    from email, department, manager, status and name words to employee
+    IDs, so lookups, filters and counts don't scan the whole directory.
+    The highest ID number is tracked as employees are added, so the
+    next ID is known without looking at every record.
+
+    Email, manager and name keys are lowercase; departments and statuses
+    are kept as entered, as reports show them. Employees keep the order
+    they were added.
+    """
+    def __init__(self, path=EMPLOYEES_FILE):
+        self.path = path
+        self.load()
+
+    def load(self):
+        """(Re)read the employees file"""
+        self.employees = {}
+        self.by_email = {}
+        self.by_department = {}
+        self.by_manager = {}
+        self.by_status = {}
+        self.by_word = {}
+        self._words = None
+        self.counts = {}
+        self.last_number = 0
+        _load_into(self, self.path)
+
+    def _keys(self, emp):
+        # (index, key) pairs an employee is filed under
+        keys = [(self.by_email, emp.get('email', '').lower()),
+                (self.by_department, emp.get('department', '')),
+                (self.by_manager, (emp.get('manager') or '').lower()),
+                (self.by_status, emp.get('status', ''))]
+        keys.extend((self.by_word, word) for word in set(emp.get('full_name', '').lower().split()))
+        return keys
+
+    def _index(self, emp):
+        employee_id = emp['employee_id']
+        self.employees[employee_id] = emp
+        for index, key in self._keys(emp):
+            ids = index.get(key)
+            if ids is None:
+                ids = index[key] = set()
+                if index is self.by_word:
+                    self._words = None
+            ids.add(employee_id)
+        key = (emp.get('department', ''), emp.get('status', ''))
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.last_number = max(self.last_number, id_number(employee_id))
+
+    def _unindex(self, emp):
+        # The record itself stays put, so employees keep their order
+        employee_id = emp['employee_id']
+        for index, key in self._keys(emp):
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(employee_id)
+                if not ids:
+                    del index[key]
+                    if index is self.by_word:
+                        self._words = None
+        key = (emp.get('department', ''), emp.get('status', ''))
+        self.counts[key] -= 1
+        if not self.counts[key]:
+            del self.counts[key]
+
+    def __len__(self):
+        return len(self.employees)
+
+    def __iter__(self):
+        return iter(self.employees.values())
+
+    def __contains__(self, employee_id):
+        return employee_id in self.employees
+
+    def get(self, employee_id):
+        return self.employees.get(employee_id.upper())
+
+    def all(self):
+        """Every employee, in the order they were added"""
+        return list(self.employees.values())
+
+    def next_id(self):
+        """Employee ID for the next new hire (EMP001, EMP002, ...)"""
+        return f"EMP{str(self.last_number + 1).zfill(3)}"
+
+    def add(self, emp):
+        """Add an employee; raises ValueError if the employee ID is taken"""
+        if emp['employee_id'] in self.employees:
+            raise ValueError(f"Employee ID '{emp['employee_id']}' already exists!")
+        self._index(emp)
+
+    def update(self, employee_id, **fields):
+        """Change fields of an employee, keeping the indexes in step"""
+        emp = self.employees.get(employee_id)
+        if emp is None:
+            raise KeyError(employee_id)
+        self._unindex(emp)
+        emp.update(fields)
+        self._index(emp)
+        return emp
+
+    def _select(self, ids):
+        # Employees for a set of IDs, in the order they were added:
+        # a large share is picked out in stored order, a few are sorted
+        if len(ids) * 8 > len(self.employees):
+            return [emp for employee_id, emp in self.employees.items() if employee_id in ids]
+        return sorted((self.employees[i] for i in ids), key=lambda emp: id_number(emp['employee_id']))
+
+    def with_status(self, status):
+        """Employees with a status ('Active', 'Inactive')"""
+        return self._select(self.by_status.get(status, ()))
+
+    def count(self, status):
+        return len(self.by_status.get(status, ()))
+
+    def find_email(self, email):
+        """Employees with an email address (case-insensitive)"""
+        return self._select(self.by_email.get(email.strip().lower(), ()))
+
+    def reports_to(self, manager):
+        """Employees whose manager is `manager` (case-insensitive)"""
+        return self._select(self.by_manager.get(manager.strip().lower(), ()))
+
+    def departments(self, status=None):
+        """{department: number of employees}, optionally only those with a status"""
+        if status is None:
+            return {dept: len(ids) for dept, ids in self.by_department.items()}
+        return {dept: count for (dept, dept_status), count in self.counts.items() if dept_status == status}
+
+    def _prefixed(self, prefix):
+        # Employees with a name word starting with `prefix`, from the
+        # sorted list of name words (rebuilt after words come or go)
+        if self._words is None:
+            self._words = sorted(self.by_word)
+        words = self._words
+        start = bisect.bisect_left(words, prefix)
+        end = bisect.bisect_left(words, prefix + '\uffff', start)
+        if end - start == 1:
+            return self.by_word[words[start]]
+        return set().union(*(self.by_word[word] for word in words[start:end]))
+
+    def find(self, text):
+        """
+        Employees matching an employee ID, an email address or the
+        starts of name words ('jim' finds Jim and Jimmy, 'jim rob' finds
+        Jim Roberts), from the indexes. Only when none of those match
+        are names and IDs scanned for the text as a substring ('oberts'),
+        as before.
+        """
+        text = text.strip().lower()
+        if not text:
+            return []
+        emp = self.employees.get(text.upper())
+        if emp is not None:
+            return [emp]
+        matches = self.by_email.get(text)
+        if matches:
+            return self._select(matches)
+        # Smallest set first, so 'jim roberts' doesn't copy every Jim
+        postings = sorted((self._prefixed(word) for word in set(text.split())), key=len)
+        matches = postings[0].intersection(*postings[1:])
+        if matches:
+            return self._select(matches)
+        return [emp for emp in self.employees.values()
+                if text in emp['full_name'].lower() or text in emp['employee_id'].lower()]
+
+    def save(self):
+        """Write every employee to the file atomically"""
+        save_records(self.path, self.all())
+
+# Asset records, loaded once and indexed by serial number
+class AssetStore:
+    """
+    Keeps every asset in a dict keyed by serial number, with indexes
+    from employee ID and from status to serial numbers, so an
+    employee's assets and the asset statistics don't scan the inventory.
+    Assets keep the order they were added.
+    """
+    def __init__(self, path=ASSETS_FILE):
+        self.path = path
+        self.load()
+
+    def load(self):
+        """(Re)read the assets file"""
+        self.assets = {}
+        self.by_employee = {}
+        self.by_status = {}
+        self.position = {}
+        _load_into(self, self.path)
+
+    def _index(self, asset):
+        serial = asset['serial_number']
+        self.assets[serial] = asset
+        self.position.setdefault(serial, len(self.position))
+        self.by_employee.setdefault(asset.get('assigned_to'), set()).add(serial)
+        self.by_status.setdefault(asset.get('status'), set()).add(serial)
+
+    def _unindex(self, asset):
+        serial = asset['serial_number']
+        for index, key in ((self.by_employee, asset.get('assigned_to')), (self.by_status, asset.get('status'))):
+            serials = index.get(key)
+            if serials is not None:
+                serials.discard(serial)
+                if not serials:
+                    del index[key]
+
+    def __len__(self):
+        return len(self.assets)
+
+    def __iter__(self):
+        return iter(self.assets.values())
+
+    def __contains__(self, serial):
+        return serial in self.assets
+
+    def get(self, serial):
+        return self.assets.get(serial)
+
+    def all(self):
+        """Every asset, in the order they were added"""
+        return list(self.assets.values())
+
+    def new_serial(self):
+        """Unused serial number from the current time (SN20260207070936, then -2, -3, ...)"""
+        serial = f"SN{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        candidate, suffix = serial, 1
+        while candidate in self.assets:
+            suffix += 1
+            candidate = f"{serial}-{suffix}"
+        return candidate
+
+    def add(self, asset):
+        """Add an asset; raises ValueError if the serial number is taken"""
+        if asset['serial_number'] in self.assets:
+            raise ValueError(f"Serial number '{asset['serial_number']}' already exists!")
+        self._index(asset)
+
+    def update(self, serial, **fields):
+        """Change fields of an asset, keeping the indexes in step"""
+        asset = self.assets.get(serial)
+        if asset is None:
+            raise KeyError(serial)
+        self._unindex(asset)
+        asset.update(fields)
+        self._index(asset)
+        return asset
+
+    def for_employee(self, employee_id):
+        """Assets assigned to an employee, in the order they were added"""
+        serials = self.by_employee.get(employee_id, ())
+        if len(serials) * 8 > len(self.assets):
+            return [asset for serial, asset in self.assets.items() if serial in serials]
+        return [self.assets[serial] for serial in sorted(serials, key=self.position.__getitem__)]
+
+    def count(self, status):
+        return len(self.by_status.get(status, ()))
+
+    def save(self):
+        """Write every asset to the file atomically"""
+        save_records(self.path, self.all())
@@ -1,39 +1,32 @@
 import json
 import os
 from datetime import datetime
+from employee_store import EmployeeStore, AssetStore, EMPLOYEES_FILE, ASSETS_FILE
 
 # Database files
-EMPLOYEES_FILE = "employees.json"
-ASSETS_FILE = "assets.json"
 AUDIT_LOG_FILE = "audit_log.json"
 
-# Function to load employees
-def load_employees():
-    """Load employee database"""
-    if os.path.exists(EMPLOYEES_FILE):
-        with open(EMPLOYEES_FILE, 'r') as f:
-            return json.load(f)
-    return []
+# Employee directory (loaded on first use)
+_employee_store = None
 
-# Function to save employees
-def save_employees(employees):
-    """Save employee database"""
-    with open(EMPLOYEES_FILE, 'w') as f:
-        json.dump(employees, f, indent=4)
+# Asset inventory (loaded on first use)
+_asset_store = None
 
-# Function to load assets
-def load_assets():
-    """Load asset database"""
-    if os.path.exists(ASSETS_FILE):
-        with open(ASSETS_FILE, 'r') as f:
-            return json.load(f)
-    return []
+# Function to get the shared employee store
+def get_employee_store():
+    """Load employees.json once per session"""
+    global _employee_store
+    if _employee_store is None:
+        _employee_store = EmployeeStore(EMPLOYEES_FILE)
+    return _employee_store
 
-# Function to save assets
-def save_assets(assets):
-    """Save asset database"""
-    with open(ASSETS_FILE, 'w') as f:
-        json.dump(assets, f, indent=4)
+# Function to get the shared asset store
+def get_asset_store():
+    """Load assets.json once per session"""
+    global _asset_store
+    if _asset_store is None:
+        _asset_store = AssetStore(ASSETS_FILE)
+    return _asset_store
 
 # Function to log audit entry
 def log_audit(action, employee_name, details):
@@ -58,13 +51,9 @@ def log_audit(action, employee_name, details):
         json.dump(logs, f, indent=4)
 
 # Function to generate employee ID
-def generate_employee_id(employees):
-    """Generate unique employee ID"""
-    if not employees:
-        return "EMP001"
-    
-    last_id = max([int(emp['employee_id'][3:]) for emp in employees])
-    return f"EMP{str(last_id + 1).zfill(3)}"
+def generate_employee_id():
+    """Generate unique employee ID (one more than the highest so far)"""
+    return get_employee_store().next_id()
 
 # Function to onboard new employee
 def onboard_employee():
@@ -91,8 +80,13 @@ def onboard_employee():
     
     full_name = f"{first_name} {last_name}"
     
-    employees = load_employees()
-    employee_id = generate_employee_id(employees)
+    employees = get_employee_store()
+    if any(emp['status'] == 'Active' for emp in employees.find_email(email)):
+        print(f"\nERROR: An active employee already uses {email}!")
+        return
+    
+    all_assets = get_asset_store()
+    employee_id = generate_employee_id()
     
     # Step 2: Account Creation
     print("\nSTEP 2: Account Creation")
@@ -136,7 +130,7 @@ def onboard_employee():
             choice = choice.strip()
             if choice in asset_map:
                 asset_name = asset_map[choice]
-                serial = f"SN{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                serial = all_assets.new_serial()
                 
                 asset = {
                     'asset_type': asset_name,
@@ -147,6 +141,8 @@ def onboard_employee():
                 }
                 
                 assigned_assets.append(asset)
+                # A copy, so changes to the employee's list go through the store
+                all_assets.add(dict(asset))
                 print(f"  {asset_name} (SN: {serial}) - ASSIGNED")
     
     # Step 4: Access Provisioning
@@ -195,13 +191,12 @@ def onboard_employee():
         'onboarded_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
     
-    employees.append(new_employee)
-    save_employees(employees)
+    employees.add(new_employee)
+    employees.save()
     
     # Save assets
-    all_assets = load_assets()
-    all_assets.extend(assigned_assets)
-    save_assets(all_assets)
+    if assigned_assets:
+        all_assets.save()
     
     # Log audit
     log_audit('ONBOARDING', full_name, f"Employee onboarded - ID: {employee_id}")
@@ -222,9 +217,9 @@ def onboard_employee():
 # Function to offboard employee
 def offboard_employee():
     """Complete offboarding workflow for departing employee"""
-    employees = load_employees()
+    employees = get_employee_store()
     
-    active_employees = [emp for emp in employees if emp['status'] == 'Active']
+    active_employees = employees.with_status('Active')
     
     if not active_employees:
         print("\nNo active employees found.")
@@ -309,25 +304,26 @@ def offboard_employee():
         notes = input("Additional Notes (optional): ").strip()
         
         # Update employee record
-        employee['status'] = 'Inactive'
-        employee['last_day'] = last_day
-        employee['exit_reason'] = exit_reason
-        employee['exit_notes'] = notes
-        employee['offboarded_date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        employees.update(employee['employee_id'],
+                         status='Inactive',
+                         last_day=last_day,
+                         exit_reason=exit_reason,
+                         exit_notes=notes,
+                         offboarded_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         
         # Save changes
-        save_employees(employees)
+        employees.save()
         
-        # Update assets
-        all_assets = load_assets()
+        # Update assets (looked up by serial number)
+        all_assets = get_asset_store()
         for emp_asset in employee['assets']:
-            for asset in all_assets:
-                if asset['serial_number'] == emp_asset['serial_number']:
-                    asset['status'] = emp_asset['status']
-                    if 'return_date' in emp_asset:
-                        asset['return_date'] = emp_asset['return_date']
+            if emp_asset['serial_number'] in all_assets:
+                changes = {'status': emp_asset['status']}
+                if 'return_date' in emp_asset:
+                    changes['return_date'] = emp_asset['return_date']
+                all_assets.update(emp_asset['serial_number'], **changes)
         
-        save_assets(all_assets)
+        all_assets.save()
         
         # Log audit
         log_audit('OFFBOARDING', employee['full_name'], f"Employee offboarded - ID: {employee['employee_id']}")
@@ -354,9 +350,9 @@ def offboard_employee():
 # Function to view employee directory
 def view_employee_directory():
     """Display all employees"""
-    employees = load_employees()
+    employees = get_employee_store()
     
-    if not employees:
+    if not len(employees):
         print("\nNo employees found.")
         return
     
@@ -372,11 +368,11 @@ def view_employee_directory():
     filter_choice = input("\nSelect filter (1-3): ").strip()
     
     if filter_choice == '2':
-        filtered = [emp for emp in employees if emp['status'] == 'Active']
+        filtered = employees.with_status('Active')
     elif filter_choice == '3':
-        filtered = [emp for emp in employees if emp['status'] == 'Inactive']
+        filtered = employees.with_status('Inactive')
     else:
-        filtered = employees
+        filtered = employees.all()
     
     if not filtered:
         print("\nNo employees found matching filter.")
@@ -405,19 +401,17 @@ def view_employee_directory():
 # Function to view employee details
 def view_employee_details():
     """View detailed information for a specific employee"""
-    employees = load_employees()
+    employees = get_employee_store()
     
-    if not employees:
+    if not len(employees):
         print("\nNo employees found.")
         return
     
     print("\n--- View Employee Details ---")
     
-    search = input("Enter employee name or ID: ").strip().lower()
+    search = input("Enter employee name, ID or email: ").strip().lower()
     
-    results = [emp for emp in employees if 
-               search in emp['full_name'].lower() or 
-               search in emp['employee_id'].lower()]
+    results = employees.find(search)
     
     if not results:
         print(f"\nNo employees found matching '{search}'")
@@ -441,7 +435,7 @@ def view_employee_details():
             print("\nInvalid input!")
             return
     else:
-        employee = results
+        employee = results[0]
     
     # Display detailed information
     print("\n" + "="*80)
@@ -484,9 +478,9 @@ def view_employee_details():
 # Function to generate reports
 def generate_reports():
     """Generate onboarding/offboarding reports"""
-    employees = load_employees()
+    employees = get_employee_store()
     
-    if not employees:
+    if not len(employees):
         print("\nNo employee data available.")
         return
     
@@ -494,34 +488,28 @@ def generate_reports():
     print("EMPLOYEE LIFECYCLE REPORTS")
     print("="*80)
     
-    active = [emp for emp in employees if emp['status'] == 'Active']
-    inactive = [emp for emp in employees if emp['status'] == 'Inactive']
+    active = employees.count('Active')
+    inactive = employees.count('Inactive')
     
     print(f"\nTotal Employees: {len(employees)}")
-    print(f"Active: {len(active)}")
-    print(f"Inactive: {len(inactive)}")
+    print(f"Active: {active}")
+    print(f"Inactive: {inactive}")
     
     # Department breakdown
-    departments = {}
-    for emp in active:
-        dept = emp['department']
-        departments[dept] = departments.get(dept, 0) + 1
+    departments = employees.departments('Active')
     
     print("\nActive Employees by Department:")
     for dept, count in departments.items():
         print(f"  {dept}: {count}")
     
     # Asset statistics
-    all_assets = load_assets()
-    assigned = [a for a in all_assets if a['status'] == 'Assigned']
-    returned = [a for a in all_assets if a['status'] == 'Returned']
-    pending = [a for a in all_assets if a['status'] == 'Pending Return']
+    all_assets = get_asset_store()
     
     print(f"\nAsset Statistics:")
     print(f"  Total Assets: {len(all_assets)}")
-    print(f"  Assigned: {len(assigned)}")
-    print(f"  Returned: {len(returned)}")
-    print(f"  Pending Return: {len(pending)}")
+    print(f"  Assigned: {all_assets.count('Assigned')}")
+    print(f"  Returned: {all_assets.count('Returned')}")
+    print(f"  Pending Return: {all_assets.count('Pending Return')}")
     
     # Recent activity
     if os.path.exists(AUDIT_LOG_FILE):
@@ -548,8 +536,8 @@ def generate_reports():
             f.write("="*80 + "\n")
             f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
             f.write(f"Total Employees: {len(employees)}\n")
-            f.write(f"Active: {len(active)}\n")
-            f.write(f"Inactive: {len(inactive)}\n\n")
+            f.write(f"Active: {active}\n")
+            f.write(f"Inactive: {inactive}\n\n")
             f.write("Active Employees by Department:\n")
             for dept, count in departments.items():
                 f.write(f"  {dept}: {count}\n")